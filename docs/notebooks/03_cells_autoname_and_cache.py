@@ -201,6 +201,22 @@ gf.clear_cache()
 
 print_cache()  # cache is now empty
 
+# `gf.cell.cache_info()` reports how many cells were returned from the cache (hits), how many had to be built (misses) and the time spent building each cell function.
+#
+# You can bound the number of cells kept in memory with `gf.set_cache_maxsize` or `cache_maxsize` in your `config.yml`. The least recently used cells are evicted, except the ones that are referenced by other cached cells or by a Component that is still in use. A cell that you only keep in a variable can be evicted and built again, so add it to a Component before you build many other cells.
+
+print(gf.cell.cache_info())
+
+# You can also store cells on disk, so the next python session loads them instead of building them again.
+#
+# ```python
+# gf.get_active_pdk().cell_decorator_settings.disk_cache_dirpath = gf.PATH.gdslib / "cells"
+# ```
+#
+# Each cell is stored once and references the entries of the cells it contains.
+# The disk cache is invalidated when the source code of the module defining the cell function, the PDK name or `Pdk.version` change.
+# Bump `Pdk.version` when you change helper functions defined in other modules.
+
 # ## Validate argument types
 #
 # By default, also `@cell` validates arguments based on their type annotations.
@@ -345,6 +345,35 @@ route = gf.routing.get_route_astar(
 c.add(route.references)
 c
 
+# %% [markdown]
+# `get_routes_astar` routes many nets one after the other on the same obstacle grid. Each route becomes an obstacle for the following nets.
+
+# %%
+c = gf.Component("get_routes_astar")
+obstacle = c << gf.components.rectangle(size=(20, 6))
+obstacle.move((40, -3))
+
+ports1 = [
+    gf.Port(f"in{i}", center=(0, 10 * i), width=0.5, orientation=0, layer=(1, 0))
+    for i in range(-2, 3)
+]
+ports2 = [
+    gf.Port(f"out{i}", center=(100, 10 * i), width=0.5, orientation=180, layer=(1, 0))
+    for i in range(-2, 3)
+]
+routes = gf.routing.get_routes_astar(
+    component=c,
+    ports1=ports1,
+    ports2=ports2,
+    resolution=2,
+    distance=2,
+    cross_section="metal1",
+    width=1,
+)
+for route in routes:
+    c.add(route.references)
+c
+
 # %% [markdown]
 # ## get_bundle
 #
@@ -32,6 +32,7 @@ from gdsfactory.cell import cell
 from gdsfactory.cell import declarative_cell
 from gdsfactory.cell import cell_without_validator
 from gdsfactory.cell import clear_cache
+from gdsfactory.cell import set_cache_maxsize
 from gdsfactory.show import show
 from gdsfactory.read.import_gds import import_gds
 from gdsfactory.cross_section import CrossSection, Section, xsection
@@ -116,6 +117,7 @@ __all__ = (
     "declarative_cell",
     "cell_without_validator",
     "clear_cache",
+    "set_cache_maxsize",
     "components",
     "compose",
     "cross_section",
@@ -5,6 +5,7 @@ from gdsfactory.component import Component
 from gdsfactory.component_layout import _parse_layer
 from gdsfactory.generic_tech import LAYER
 from gdsfactory.geometry.functions import polygon_grow
+from gdsfactory.pdk import get_layer
 from gdsfactory.typings import Layers
 
 
@@ -27,8 +28,9 @@ def add_keepout(
     """
     c = Component()
     c << component
+    layer_to_polygons = component.get_polygons(by_spec=True, as_array=False)
     for layer in target_layers:
-        polygons = component.get_polygons(by_spec=layer, as_array=False)
+        polygons = layer_to_polygons.get(get_layer(layer))
         if polygons:
             for ko_layer in keepout_layers:
                 ko_layer = _parse_layer(ko_layer)
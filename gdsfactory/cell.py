@@ -4,19 +4,35 @@ from __future__ import annotations
 import functools
 import hashlib
 import inspect
-from dataclasses import dataclass
+import time
+import types
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from dataclasses import dataclass, field
 from functools import wraps
-from typing import Any, Callable, Dict, Optional, Tuple, TypeVar, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Type,
+)
 
 import toolz
 from pydantic import BaseModel, validate_arguments
 
 from gdsfactory.component import Component
+from gdsfactory.config import CONF
+from gdsfactory.cross_section import CrossSection
 from gdsfactory.name import clean_name, get_name_short
 from gdsfactory.serialization import clean_dict, clean_value_name
 
-CACHE: Dict[str, Component] = {}
-
 INFO_VERSION = 2
 
 _F = TypeVar("_F", bound=Callable)
@@ -26,10 +42,304 @@ class CellReturnTypeError(ValueError):
     pass
 
 
+@dataclass
+class CacheInfo:
+    """Component CACHE statistics.
+
+    Args:
+        hits: number of cells returned from the cache.
+        misses: number of cells that had to be built.
+        evictions: number of cells evicted to stay below maxsize.
+        currsize: number of cells currently in the cache.
+        maxsize: maximum number of cells (None means unbounded).
+        build_time: total seconds spent building cells, per function name.
+        build_count: number of builds, per function name.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    currsize: int
+    maxsize: Optional[int]
+    build_time: Dict[str, float] = field(default_factory=dict)
+    build_count: Dict[str, int] = field(default_factory=dict)
+
+
+class ComponentCache(MutableMapping):
+    """Component cache for the @cell decorator.
+
+    Maps cell names to Components in least recently used order,
+    keeps an index of Component ids so alias checks are O(1)
+    and optionally evicts the least recently used cells above maxsize.
+
+    Cells that are referenced by another cached cell or by a live Component
+    are never evicted, so no parent ends up pointing to a cell with a name
+    that can be built again. Only unpinned cells are kept in the eviction order,
+    so evicting a cell is O(1) however many cells are pinned.
+    With a maxsize, a Component pins its cells until it is garbage collected.
+    Cells that are only held in variables can still be evicted.
+
+    Args:
+        maxsize: maximum number of cells. None for an unbounded cache.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, Component] = OrderedDict()
+        self._evictable: OrderedDict[str, None] = OrderedDict()
+        self._ids: Dict[int, List[str]] = {}
+        self._parents: Dict[int, int] = {}
+        self._holders: Dict[int, Dict[int, weakref.ref]] = {}
+        self._released: List[Tuple[int, int]] = []
+        self._cell_names: Dict[str, Component] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Resets hits, misses, evictions and build time counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_time: Dict[str, float] = {}
+        self.build_count: Dict[str, int] = {}
+
+    def __getitem__(self, name: str) -> Component:
+        return self._data[name]
+
+    def __setitem__(self, name: str, component: Component) -> None:
+        if name in self._data:
+            self._remove(name)
+        self._data[name] = component
+        key = id(component)
+        self._ids.setdefault(key, []).append(name)
+        self._cell_names[component.name] = component
+        for child in self._children(component):
+            child_key = id(child)
+            if child_key in self._ids:
+                count = self._parents.get(child_key, 0)
+                self._parents[child_key] = count + 1
+                if not count:
+                    self._update_evictable(child_key)
+        # the new cell is not evicted before its caller can reference it
+        self._evict()
+        self._update_evictable(key)
+
+    def __delitem__(self, name: str) -> None:
+        self._remove(name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._data
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(maxsize={self.maxsize}, currsize={len(self)})"
+        )
+
+    def clear(self) -> None:
+        """Removes all cells. Statistics are kept."""
+        self._data.clear()
+        self._evictable.clear()
+        self._ids.clear()
+        self._parents.clear()
+        self._holders.clear()
+        self._released.clear()
+        self._cell_names.clear()
+
+    def invalidate(self, names: Iterable[str]) -> List[str]:
+        """Removes cells and every cached cell that references them.
+
+        Cells that reference them through uncached components are also removed.
+        Returns the names of the removed cells.
+        """
+        dependents: Dict[int, List[str]] = {}
+        for name, component in self._data.items():
+            for child in self._cached_children(component):
+                dependents.setdefault(id(child), []).append(name)
+
+        removed: Dict[str, None] = {}
+        stack = [name for name in names if name in self._data]
+        while stack:
+            name = stack.pop()
+            if name in removed:
+                continue
+            removed[name] = None
+            key = id(self._data[name])
+            stack.extend(self._ids[key])
+            stack.extend(dependents.get(key, []))
+
+        for name in removed:
+            self._remove(name)
+        return list(removed)
+
+    def contains_component(self, component: Component) -> bool:
+        """Returns True if the component is cached under any name."""
+        return id(component) in self._ids
+
+    def get_cache_key(self, component: Component) -> Optional[str]:
+        """Returns the name the component is cached under, if any."""
+        names = self._ids.get(id(component))
+        return names[0] if names else None
+
+    def get_by_cell_name(self, cell_name: str) -> Optional[Component]:
+        """Returns the cached component with a Component.name, if any."""
+        return self._cell_names.get(cell_name)
+
+    def lookup(self, name: str) -> Optional[Component]:
+        """Returns cached component and records a hit, or None and records a miss."""
+        component = self._data.get(name)
+        if component is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(name)
+        if name in self._evictable:
+            self._evictable.move_to_end(name)
+        return component
+
+    def pin(self, component: Component, holder: Component) -> None:
+        """Keeps a cached component while holder references it.
+
+        The pin is released when holder is garbage collected.
+        Unbounded caches never evict, so they do not track pins.
+        """
+        if self.maxsize is None:
+            return
+        self._release_pins()
+        key = id(component)
+        if key not in self._ids:
+            return
+        holders = self._holders.setdefault(key, {})
+        holder_key = id(holder)
+        ref = holders.get(holder_key)
+        if ref is not None and ref() is holder:
+            return
+        holders[holder_key] = weakref.ref(
+            holder, lambda _, keys=(key, holder_key): self._released.append(keys)
+        )
+        if len(holders) == 1:
+            self._update_evictable(key)
+
+    def record_build(self, function_name: str, seconds: float) -> None:
+        """Adds the time spent building a cell to the function statistics."""
+        self.build_time[function_name] = (
+            self.build_time.get(function_name, 0.0) + seconds
+        )
+        self.build_count[function_name] = self.build_count.get(function_name, 0) + 1
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            currsize=len(self),
+            maxsize=self.maxsize,
+            build_time=dict(self.build_time),
+            build_count=dict(self.build_count),
+        )
+
+    @staticmethod
+    def _children(component: Component) -> Iterator[Component]:
+        seen = set()
+        for ref in component.references:
+            child = ref.parent
+            if id(child) not in seen:
+                seen.add(id(child))
+                yield child
+
+    def _cached_children(self, component: Component) -> Iterator[Component]:
+        """Yields the nearest cached cells below a component."""
+        seen = set()
+        stack = list(self._children(component))
+        while stack:
+            child = stack.pop()
+            if id(child) in seen:
+                continue
+            seen.add(id(child))
+            if id(child) in self._ids:
+                yield child
+            else:
+                stack.extend(self._children(child))
+
+    def _update_evictable(self, key: int) -> None:
+        """Moves the names of a cached component in or out of the eviction order."""
+        names = self._ids.get(key, ())
+        if self._parents.get(key) or self._holders.get(key):
+            for name in names:
+                self._evictable.pop(name, None)
+        else:
+            for name in names:
+                if name not in self._evictable:
+                    self._evictable[name] = None
+
+    def _release_pins(self) -> None:
+        """Releases the pins of garbage collected holders."""
+        while self._released:
+            key, holder_key = self._released.pop()
+            holders = self._holders.get(key)
+            ref = holders.get(holder_key) if holders else None
+            if ref is None or ref() is not None:
+                continue
+            del holders[holder_key]
+            if not holders:
+                del self._holders[key]
+                self._update_evictable(key)
+
+    def _remove(self, name: str) -> Component:
+        component = self._data.pop(name)
+        self._evictable.pop(name, None)
+        key = id(component)
+        self._ids[key].remove(name)
+        if not self._ids[key]:
+            del self._ids[key]
+            self._parents.pop(key, None)
+            self._holders.pop(key, None)
+            if self._cell_names.get(component.name) is component:
+                del self._cell_names[component.name]
+        for child in self._children(component):
+            child_key = id(child)
+            count = self._parents.get(child_key, 0)
+            if count > 1:
+                self._parents[child_key] = count - 1
+            elif count:
+                del self._parents[child_key]
+                self._update_evictable(child_key)
+        return component
+
+    def _evict(self) -> None:
+        self._release_pins()
+        if self.maxsize is None:
+            return
+        while len(self._data) > self.maxsize and self._evictable:
+            self._remove(next(iter(self._evictable)))
+            self.evictions += 1
+
+
+CACHE = ComponentCache(maxsize=CONF.get("cache_maxsize", None))
+
+
 def clear_cache() -> None:
     """Clears Component CACHE."""
-    global CACHE
-    CACHE = {}
+    CACHE.clear()
+
+
+def set_cache_maxsize(maxsize: Optional[int]) -> None:
+    """Sets the maximum number of cells in CACHE (None for unbounded).
+
+    Args:
+        maxsize: least recently used cells above maxsize are evicted.
+    """
+    CACHE.maxsize = maxsize
+    CACHE._evict()
+
+
+def cache_info() -> CacheInfo:
+    """Returns CACHE hits, misses, evictions and build time per function."""
+    return CACHE.info()
 
 
 def print_cache() -> None:
@@ -64,13 +374,96 @@ class Settings(BaseModel):
     child: Optional[Dict[str, Any]] = None
 
 
+_CELL_KWARGS = frozenset(
+    [
+        "with_hash",
+        "autoname",
+        "name",
+        "cache",
+        "flatten",
+        "info",
+        "prefix",
+        "max_name_length",
+        "decorator",
+    ]
+)
+_MAX_FAST_KEYS = 100_000
+
+
+class _NoFastKey(Exception):
+    """Raised for arguments that can not be part of a fast cache key."""
+
+
+def _freeze(value: Any) -> Any:
+    """Returns a hashable key that identifies how value is serialized in a cell name.
+
+    Only types whose name does not depend on mutable state are supported.
+    The type is part of the key as 3 and 3.0 give different names.
+    """
+    value_type = type(value)
+    if value_type in (str, int, float, bool) or value is None:
+        return value_type, value
+    if value_type is tuple:
+        return tuple, tuple(_freeze(v) for v in value)
+    if value_type is types.FunctionType:
+        return value
+    if value_type is functools.partial:
+        return (
+            functools.partial,
+            _freeze(value.func),
+            _freeze(value.args),
+            tuple(sorted((k, _freeze(v)) for k, v in value.keywords.items())),
+        )
+    if value_type is Component and value._locked:
+        return value
+    if isinstance(value, CrossSection) and value._frozen:
+        return value
+    raise _NoFastKey
+
+
+def _get_fast_key(settings, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+    """Returns a hashable key of the cell name inputs or None if not supported."""
+    if not settings.cache or not _CELL_KWARGS.isdisjoint(kwargs):
+        return None
+    try:
+        return (
+            settings.with_hash,
+            settings.name,
+            settings.prefix,
+            settings.max_name_length,
+            tuple(_freeze(arg) for arg in args),
+            tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())),
+        )
+    except (_NoFastKey, TypeError):
+        return None
+
+
 def cell_without_validator(func: _F) -> _F:
     """Decorator for Component functions.
 
     Similar to cell decorator but does not enforce argument types.
 
     I recommend using @cell instead.
+
+    The signature and defaults of func are read once. Calls with hashable
+    arguments remember the cell name they map to, so a cache hit returns
+    the Component without computing the name again.
     """
+    sig = inspect.signature(func)
+    parameter_names = list(sig.parameters.keys())
+    default = {
+        p.name: p.default
+        for p in sig.parameters.values()
+        if p.default != inspect._empty
+    }
+    check_kwargs = (
+        "args" not in sig.parameters
+        and "kwargs" not in sig.parameters
+        and "settings" not in sig.parameters
+    )
+    # list of default args as strings, computed on the first miss
+    default_args: List[str] = []
+    names: Dict[Any, str] = {}
 
     @functools.wraps(func)
     def _cell(*args, **kwargs):
@@ -79,6 +472,12 @@ def cell_without_validator(func: _F) -> _F:
         active_pdk = get_active_pdk()
         cell_decorator_settings = active_pdk.cell_decorator_settings
 
+        fast_key = _get_fast_key(cell_decorator_settings, args, kwargs)
+        if fast_key is not None:
+            name = names.get(fast_key)
+            if name is not None and name in CACHE:
+                return CACHE.lookup(name)
+
         with_hash = kwargs.pop("with_hash", cell_decorator_settings.with_hash)
         autoname = kwargs.pop("autoname", cell_decorator_settings.autoname)
         name = kwargs.pop("name", cell_decorator_settings.name)
@@ -95,34 +494,24 @@ def cell_without_validator(func: _F) -> _F:
             "max_name_length", cell_decorator_settings.max_name_length
         )
 
-        sig = inspect.signature(func)
-        args_as_kwargs = dict(zip(sig.parameters.keys(), args))
+        args_as_kwargs = dict(zip(parameter_names, args))
         args_as_kwargs.update(kwargs)
 
-        default = {
-            p.name: p.default
-            for p in sig.parameters.values()
-            if p.default != inspect._empty
-        }
-
         changed = args_as_kwargs
         full = default.copy()
         full.update(**args_as_kwargs)
 
-        default2 = default.copy()
-        changed2 = changed.copy()
-
-        # list of default args as strings
-        default_args_list = [
-            f"{key}={clean_value_name(default2[key])}" for key in sorted(default.keys())
-        ]
+        if not default_args:
+            default_args.extend(
+                f"{key}={clean_value_name(default[key])}" for key in sorted(default)
+            )
         # list of explicitly passed args as strings
         passed_args_list = [
-            f"{key}={clean_value_name(changed2[key])}" for key in sorted(changed.keys())
+            f"{key}={clean_value_name(changed[key])}" for key in sorted(changed.keys())
         ]
 
         # get only the args which are explicitly passed and different from defaults
-        changed_arg_set = set(passed_args_list).difference(default_args_list)
+        changed_arg_set = set(passed_args_list).difference(default_args)
         changed_arg_list = sorted(changed_arg_set)
 
         # if any args were different from default, append a hash of those args.
@@ -151,33 +540,47 @@ def cell_without_validator(func: _F) -> _F:
         decorator = kwargs.pop("decorator", default_decorator)
         name = get_name_short(name, max_name_length=max_name_length)
 
-        if (
-            "args" not in sig.parameters
-            and "kwargs" not in sig.parameters
-            and "settings" not in sig.parameters
-        ):
+        if check_kwargs:
             for key in kwargs:
-                if key not in sig.parameters.keys():
+                if key not in sig.parameters:
                     raise TypeError(
                         f"{func.__name__!r}() got invalid argument {key!r}\n"
-                        f"valid arguments are {list(sig.parameters.keys())}"
+                        f"valid arguments are {parameter_names}"
                     )
 
-        if cache and name in CACHE:
-            # print(f"CACHE LOAD {name} {func.__name__}({named_args_string})")
-            return CACHE[name]
-        # print(f"BUILD {name} {func.__name__}({named_args_string})")
+        if fast_key is not None:
+            if len(names) >= _MAX_FAST_KEYS:
+                names.clear()
+            names[fast_key] = name
+
+        disk_cache = disk_cache_key = None
+        if cache:
+            component = CACHE.lookup(name)
+            if component is not None:
+                return component
+
+            if cell_decorator_settings.disk_cache_dirpath:
+                from gdsfactory.disk_cache import DiskCache
+
+                disk_cache = DiskCache(cell_decorator_settings.disk_cache_dirpath)
+                disk_cache_key = disk_cache.get_key(name, func)
+                component = disk_cache.load(disk_cache_key) if disk_cache_key else None
+                if component is not None:
+                    CACHE[name] = component
+                    return component
 
         if not callable(func):
             raise ValueError(
                 f"{func!r} is not callable! @cell decorator is only for functions"
             )
 
+        t0 = time.perf_counter()
         component = func(*args, **kwargs)
+        CACHE.record_build(func.__name__, time.perf_counter() - t0)
 
         # if the component is already in the cache, but under a different alias,
         # make sure we use a copy, so we don't run into mutability errors
-        if id(component) in [id(v) for v in CACHE.values()]:
+        if CACHE.contains_component(component):
             component = component.copy()
 
         metadata_child = (
@@ -231,6 +634,8 @@ def cell_without_validator(func: _F) -> _F:
 
         component.lock()
         CACHE[name] = component
+        if disk_cache_key and not hasattr(component, "imported_gds"):
+            disk_cache.save(disk_cache_key, component, func=func)
         return component
 
     return _cell
@@ -298,6 +703,10 @@ def cell(func: _F) -> _F:
     return cell_without_validator(validate_arguments(func))
 
 
+cell.cache_info = cache_info
+cell.cache_clear = clear_cache
+
+
 def declarative_cell(cls: Type[Any]) -> Callable[..., Component]:
     """
     TODO:
@@ -425,6 +834,37 @@ def straight_with_pins(**kwargs) -> Component:
     return c
 
 
+def test_cache_info() -> None:
+    clear_cache()
+    CACHE.reset_stats()
+    wg(length=5)
+    wg(length=5)
+    info = cache_info()
+    assert info.hits == 1, info.hits
+    assert info.misses == 1, info.misses
+    assert info.build_count["wg"] == 1, info.build_count
+
+
+def test_cache_maxsize() -> None:
+    clear_cache()
+    maxsize = CACHE.maxsize
+    try:
+        set_cache_maxsize(2)
+        c1 = wg(length=11)
+        c2 = wg2()
+        child = c2.references[0].parent
+        assert not CACHE.contains_component(c1)
+        assert CACHE.contains_component(c2)
+        assert CACHE.contains_component(child)
+
+        wg(length=12)
+        assert CACHE.contains_component(child), "referenced cells are kept"
+        assert len(CACHE) == 2, len(CACHE)
+    finally:
+        set_cache_maxsize(maxsize)
+        clear_cache()
+
+
 def test_hashes() -> None:
     import gdsfactory as gf
 
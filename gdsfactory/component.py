@@ -32,6 +32,7 @@ from gdsfactory.component_layout import (
     _GeometryHelper,
     _parse_layer,
     get_polygons,
+    get_polygons_buffers,
 )
 from gdsfactory.component_reference import ComponentReference, Coordinate, SizeInfo
 from gdsfactory.config import CONF, logger, GDSDIR_TEMP
@@ -68,10 +69,126 @@ class MutabilityError(ValueError):
     pass
 
 
-def _get_dependencies(component, references_set) -> None:
+def _get_dependencies(component, dependencies: Dict[int, Component]) -> None:
+    """Adds unique Components referenced by component, children before parents.
+
+    Each unique cell of the hierarchy is visited once and the cached
+    dependencies of locked cells are reused without walking them again.
+    """
     for ref in component.references:
-        references_set.add(ref.ref_cell)
-        _get_dependencies(ref.ref_cell, references_set)
+        child = ref.ref_cell
+        if id(child) in dependencies:
+            continue
+        cached = child._get_cached("dependencies")
+        if cached is not None:
+            for c in cached:
+                dependencies.setdefault(id(c), c)
+        else:
+            _get_dependencies(child, dependencies)
+        dependencies[id(child)] = child
+
+
+def _get_layers(component, layers_by_id: Dict[int, frozenset]) -> frozenset:
+    """Returns the layers of a component from its own shapes and its children.
+
+    Each unique cell is visited once and the layers of locked cells are cached.
+    """
+    layers = component._get_cached("layers")
+    if layers is not None:
+        return layers
+
+    layers = {(polygon.layer, polygon.datatype) for polygon in component.polygons}
+    for path in component.paths:
+        layers.update(zip(path.layers, path.datatypes))
+
+    for ref in component.references:
+        child = ref.parent
+        if id(child) not in layers_by_id:
+            layers_by_id[id(child)] = _get_layers(child, layers_by_id)
+        layers.update(layers_by_id[id(child)])
+
+    layers = frozenset(layers)
+    if component._is_frozen():
+        component._set_cached("layers", layers)
+    return layers
+
+
+def _hash_polygons(
+    buffers: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]], precision: float
+):
+    """Returns the SHA1 of the sorted polygon hashes of each layer.
+
+    The vertices of each layer are rounded in one NumPy operation
+    and each polygon is hashed from a slice of the rounded buffer.
+    """
+    final_hash = hashlib.sha1()
+    layers = sorted(buffers, key=lambda layer: (layer[1], layer[0]))
+    for layer in layers:
+        points, offsets = buffers[layer]
+        data = memoryview(_rnd(points, precision).tobytes())
+        size = 2 * np.dtype(np.int64).itemsize
+        # strip trailing null bytes as NumPy bytes arrays did for the sorted hashes
+        polygon_hashes = sorted(
+            hashlib.sha1(data[start * size : stop * size]).digest().rstrip(b"\0")
+            for start, stop in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+        )
+        final_hash.update(hashlib.sha1(np.array(layer, dtype=np.int64)).digest())
+        for polygon_hash in polygon_hashes:
+            final_hash.update(polygon_hash)
+    return final_hash
+
+
+def _hash_reference(ref, child_hash: str, precision: float) -> bytes:
+    """Returns the SHA1 of a reference from its cell hash and transformation."""
+    reference = ref._reference
+    repetition = reference.repetition
+    transformation = [
+        *reference.origin,
+        np.rad2deg(reference.rotation) % 360,
+        reference.magnification,
+        reference.x_reflection,
+    ]
+    if repetition.size > 1:
+        transformation.extend([repetition.columns or 0, repetition.rows or 0])
+        for vector in [repetition.spacing, repetition.v1, repetition.v2]:
+            transformation.extend(vector or (0, 0))
+    ref_hash = hashlib.sha1(child_hash.encode())
+    ref_hash.update(_rnd(np.array(transformation, dtype=float), precision))
+    if repetition.offsets is not None:
+        ref_hash.update(_rnd(repetition.offsets, precision))
+    for offsets in [repetition.x_offsets, repetition.y_offsets]:
+        if offsets is not None:
+            ref_hash.update(_rnd(offsets, precision))
+    return ref_hash.digest()
+
+
+def _hash_geometry(component, precision: float, hashes: Dict[int, str]) -> str:
+    """Returns the hierarchical geometry hash of a component.
+
+    Each unique cell is hashed once and the hash of locked cells is cached.
+    """
+    key = f"hash_geometry_{precision}"
+    cached = component._get_cached(key)
+    if cached is not None:
+        return cached
+
+    final_hash = _hash_polygons(
+        get_polygons_buffers(component, depth=0), precision=precision
+    )
+    if component.references:
+        ref_hashes = []
+        for ref in component.references:
+            child = ref.parent
+            if id(child) not in hashes:
+                hashes[id(child)] = _hash_geometry(child, precision, hashes)
+            ref_hashes.append(_hash_reference(ref, hashes[id(child)], precision))
+        for ref_hash in sorted(ref_hashes):
+            final_hash.update(ref_hash)
+
+    digest = final_hash.hexdigest()
+    if component._is_frozen():
+        component._set_cached(key, digest)
+    return digest
 
 
 mutability_error_message = """
@@ -153,6 +270,9 @@ class Component(_GeometryHelper):
             child: dict info from the children, if any.
     """
 
+    # bumped on every change to a locked component, invalidating all cached values
+    _cache_epoch_global = 0
+
     def __init__(
         self,
         name: str = "Unnamed",
@@ -169,6 +289,8 @@ class Component(_GeometryHelper):
 
         self.settings: Dict[str, Any] = {}
         self._locked = False
+        self._cache: Dict[str, Any] = {}
+        self._cache_epoch = -1
         self._get_child_name = False
         self._reference_names_counter = Counter()
         self._reference_names_used = set()
@@ -286,19 +408,77 @@ class Component(_GeometryHelper):
             as_shapely=as_shapely,
         )
 
+    def get_polygons_buffers(
+        self, depth: Optional[int] = None, include_paths: bool = True
+    ) -> Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]:
+        """Returns polygon vertices per layer as contiguous NumPy buffers.
+
+        Polygon i of a layer is points[offsets[i]:offsets[i + 1]].
+
+        Args:
+            depth: number of reference levels to include. None includes all.
+            include_paths: If True, polygonal representation of paths are also included.
+
+        Returns:
+            dict of (layer, datatype) to (points [N][2], offsets [npolygons + 1]).
+        """
+        return get_polygons_buffers(
+            instance=self, depth=depth, include_paths=include_paths
+        )
+
     def get_dependencies(self, recursive: bool = False) -> List[Component]:
         """Return a list of Components referenced by this Component.
 
         Args:
-            recursive: If True returns dependencies recursively.
+            recursive: If True returns dependencies recursively,
+                with each cell listed after the cells it references.
 
         """
         if not recursive:
             return list({ref.parent for ref in self.references})
 
-        references_set = set()
-        _get_dependencies(self, references_set=references_set)
-        return list(references_set)
+        cached = self._get_cached("dependencies")
+        if cached is not None:
+            return list(cached)
+
+        dependencies = {}
+        _get_dependencies(self, dependencies=dependencies)
+
+        # the hierarchy of a locked component only changes if a cell below is unlocked
+        if self._locked and all(c._locked for c in dependencies.values()):
+            self._set_cached("dependencies", tuple(dependencies.values()))
+        return list(dependencies.values())
+
+    def _get_cached(self, key: str) -> Any:
+        """Returns a value cached on this locked component or None."""
+        if self._locked and self._cache_epoch == Component._cache_epoch_global:
+            return self._cache.get(key)
+        return None
+
+    def _set_cached(self, key: str, value: Any) -> None:
+        """Caches a value derived from the geometry of a locked component."""
+        if not self._locked:
+            return
+        if self._cache_epoch != Component._cache_epoch_global:
+            self._cache = {}
+            self._cache_epoch = Component._cache_epoch_global
+        self._cache[key] = value
+
+    def _is_frozen(self) -> bool:
+        """Returns True if the component and all the cells it references are locked."""
+        if not self._locked:
+            return False
+        self.get_dependencies(recursive=True)
+        return self._get_cached("dependencies") is not None
+
+    @staticmethod
+    def _invalidate_caches() -> None:
+        """Invalidates the cached values of all components.
+
+        Called when a locked component or a reference inside it changes,
+        as the change also affects every component that references it.
+        """
+        Component._cache_epoch_global += 1
 
     def get_component_spec(self):
         return (
@@ -325,6 +505,7 @@ class Component(_GeometryHelper):
     def unlock(self) -> None:
         """Only do this if you know what you are doing."""
         self._locked = False
+        self._invalidate_caches()
 
     def lock(self) -> None:
         """Makes sure components can't add new elements or move existing ones.
@@ -426,10 +607,15 @@ class Component(_GeometryHelper):
 
         it snaps to 3 decimals in um (0.001um = 1nm precision)
         """
-        bbox = self._cell.bounding_box()
+        bbox = self._get_cached("bbox")
         if bbox is None:
-            bbox = ((0, 0), (0, 0))
-        return np.round(bbox, 3)
+            bbox = self._cell.bounding_box()
+            if bbox is None:
+                bbox = ((0, 0), (0, 0))
+            bbox = np.round(bbox, 3)
+            if self._is_frozen():
+                self._set_cached("bbox", bbox)
+        return bbox.copy()
 
     @property
     def ports_layer(self) -> Dict[str, str]:
@@ -970,6 +1156,8 @@ class Component(_GeometryHelper):
             paths=True,
             labels=include_labels,
         )
+        if component._locked:
+            component._invalidate_caches()
         return component
 
     def extract(
@@ -1087,6 +1275,9 @@ class Component(_GeometryHelper):
                 # Convert to form [[1,2],[3,4],[5,6]]
                 points = np.column_stack(points)
             layer, datatype = _parse_layer(layer)
+            # gdstk reads a list of complex numbers faster than a 2D array
+            points = np.ascontiguousarray(points, dtype=np.float64)
+            points = points.view(np.complex128).ravel().tolist()
             polygon = Polygon(points, layer=layer, datatype=datatype)
             self._add_polygons(polygon)
             return polygon
@@ -1132,7 +1323,12 @@ class Component(_GeometryHelper):
     @property
     def size_info(self) -> SizeInfo:
         """Size info of the component."""
-        return SizeInfo(self.bbox)
+        size_info = self._get_cached("size_info")
+        if size_info is None:
+            size_info = SizeInfo(self.bbox)
+            if self._is_frozen():
+                self._set_cached("size_info", size_info)
+        return size_info
 
     def get_setting(self, setting: str) -> Union[str, int, float]:
         return (
@@ -1351,6 +1547,11 @@ class Component(_GeometryHelper):
     ) -> None:
         component = reference.parent
         reference.owner = self
+        if component._locked:
+            from gdsfactory.cell import CACHE
+
+            # cached cells are not evicted while they are referenced
+            CACHE.pin(component, self)
 
         if alias is None:
             if reference.name is not None:
@@ -1385,8 +1586,7 @@ class Component(_GeometryHelper):
             import gdsfactory as gf
             gf.components.straight().get_layers() == {(1, 0), (111, 0)}
         """
-        polygons = self._cell.get_polygons(depth=None)
-        return {(polygon.layer, polygon.datatype) for polygon in polygons}
+        return set(_get_layers(self, {}))
 
     def get_layer_names(self) -> List[Tuple[int, int]]:
         """Return layer names used in the design.
@@ -1571,6 +1771,8 @@ class Component(_GeometryHelper):
             layers_excluded: list of layers to exclude.
             layer_views: layer_views colors loaded from Klayout.
             min_aspect: minimum aspect ratio.
+            min_pixels: instances smaller than this number of pixels are drawn as
+                their bounding box. 0 draws all the polygons.
         """
         from gdsfactory.quickplotter import quickplot
 
@@ -1620,23 +1822,29 @@ class Component(_GeometryHelper):
         layer_views: Optional[LayerViews] = None,
         min_aspect: float = 0.25,
         padding: float = 0.5,
+        min_pixels: float = 2,
     ):
         """Plot component in holoviews.
 
+        The visible window is drawn again on zoom, with one multi-polygon per
+        layer and the instances smaller than min_pixels drawn as boxes.
+
         Args:
             layers_excluded: list of layers to exclude.
             layer_views: layer_views colors loaded from Klayout.
             min_aspect: minimum aspect ratio.
             padding: around bounding box.
+            min_pixels: instances smaller than this number of pixels are drawn as
+                their bounding box. 0 draws all the polygons.
 
         Returns:
-            Holoviews Overlay to display all polygons.
+            Holoviews DynamicMap to display all polygons.
         """
         from gdsfactory.add_pins import get_pin_triangle_polygon_tip
-        from gdsfactory.generic_tech import LAYER_VIEWS
+        from gdsfactory.pdk import get_layer_views
+        from gdsfactory.quickplotter import LodRenderer
 
-        if layer_views is None:
-            layer_views = LAYER_VIEWS
+        layer_views = layer_views or get_layer_views()
 
         try:
             import holoviews as hv
@@ -1659,33 +1867,61 @@ class Component(_GeometryHelper):
         )
         b = np.hstack((center - dx, center + dx))
 
-        plots_to_overlay = []
         layers_excluded = [] if layers_excluded is None else layers_excluded
+        tuple_to_layer_view = {
+            layer_view.layer: layer_view
+            for layer_view in layer_views.get_layer_views().values()
+        }
+        renderer = LodRenderer(self, min_pixels=min_pixels)
+        frame_width = 500
+
+        def _plot_polygons(x_range=None, y_range=None):
+            xmin, xmax = (b[0], b[2]) if x_range is None else x_range
+            ymin, ymax = (b[1], b[3]) if y_range is None else y_range
+            dx, dy = (xmax - xmin) / 2, (ymax - ymin) / 2
+            buffers, boxes = renderer.render(
+                (xmin - dx, ymin - dy, xmax + dx, ymax + dy),
+                pixel_size=(xmax - xmin) / frame_width,
+            )
+            polygons = [(layer, buffers[layer]) for layer in sorted(buffers)]
+            if len(boxes):
+                polygons.append(
+                    ("boxes", (boxes.reshape(-1, 2), np.full(len(boxes), 4)))
+                )
 
-        for layer, polygon in self.get_polygons(by_spec=True).items():
-            if layer in layers_excluded:
-                continue
-
-            try:
-                layer_view = layer_views.get_from_tuple(layer)
-            except ValueError:
-                layers = list(layer_views.get_layer_views().keys())
-                warnings.warn(f"{layer!r} not defined in {layers}", stacklevel=3)
-                layer_view = LayerView(layer=layer)
-            # TODO: Match up options with LayerViews
-            plots_to_overlay.append(
-                hv.Polygons(polygon, label=str(layer_view.name)).opts(
-                    data_aspect=1,
-                    frame_width=500,
-                    ylim=(b[1], b[3]),
-                    xlim=(b[0], b[2]),
-                    fill_color=layer_view.fill_color.as_rgb() or "",
-                    line_color=layer_view.frame_color.as_rgb() or "",
-                    fill_alpha=layer_view.get_alpha() or "",
-                    line_alpha=layer_view.get_alpha() or "",
-                    tools=["hover"],
+            plots = []
+            for layer, (points, lengths) in polygons:
+                if layer in layers_excluded:
+                    continue
+                if layer == "boxes":
+                    layer_view = LayerView(name="boxes", color="gray")
+                elif layer in tuple_to_layer_view:
+                    layer_view = tuple_to_layer_view[layer]
+                else:
+                    layers = list(tuple_to_layer_view)
+                    warnings.warn(f"{layer!r} not defined in {layers}", stacklevel=3)
+                    layer_view = LayerView(layer=layer)
+
+                # one multi-polygon per layer, with polygons separated by NaN
+                points = np.insert(points, np.cumsum(lengths)[:-1], np.nan, axis=0)
+                # TODO: Match up options with LayerViews
+                plots.append(
+                    hv.Polygons(
+                        [{"x": points[:, 0], "y": points[:, 1]}],
+                        label=str(layer_view.name),
+                    ).opts(
+                        data_aspect=1,
+                        frame_width=frame_width,
+                        fill_color=layer_view.fill_color.as_rgb() or "",
+                        line_color=layer_view.frame_color.as_rgb() or "",
+                        fill_alpha=layer_view.get_alpha() or "",
+                        line_alpha=layer_view.get_alpha() or "",
+                        tools=["hover"],
+                    )
                 )
-            )
+            return hv.Overlay(plots)
+
+        plots_to_overlay = []
         for name, port in self.ports.items():
             name = str(name)
             polygon, ptip = get_pin_triangle_polygon_tip(port=port)
@@ -1698,13 +1934,13 @@ class Component(_GeometryHelper):
                     ylim=(b[1], b[3]),
                     xlim=(b[0], b[2]),
                     color="red",
-                    line_alpha=layer_view.get_alpha() or "",
                     tools=["hover"],
                 )
                 * hv.Text(ptip[0], ptip[1], name)
             )
 
-        return hv.Overlay(plots_to_overlay).opts(
+        polygons = hv.DynamicMap(_plot_polygons, streams=[hv.streams.RangeXY()])
+        return (polygons * hv.Overlay(plots_to_overlay)).opts(
             show_legend=True, shared_axes=False, ylim=(b[1], b[3]), xlim=(b[0], b[2])
         )
 
@@ -1826,8 +2062,11 @@ class Component(_GeometryHelper):
         write_settings = default_settings.copy(update=explicit_gds_settings)
         oasis_settings = default_oasis_settings.copy(update=explicit_oas_settings)
 
+        dependencies = self.get_dependencies(recursive=True)
         _check_uncached_components(
-            component=self, mode=write_settings.on_uncached_component
+            component=self,
+            mode=write_settings.on_uncached_component,
+            dependencies=dependencies,
         )
 
         if write_settings.flatten_invalid_refs:
@@ -1845,7 +2084,11 @@ class Component(_GeometryHelper):
         gdsdir = gdspath.parent
         gdsdir.mkdir(exist_ok=True, parents=True)
 
-        cells = top_cell.get_dependencies(recursive=True)
+        cells = (
+            dependencies
+            if top_cell is self
+            else top_cell.get_dependencies(recursive=True)
+        )
         cell_names = [cell.name for cell in list(cells)]
         cell_names_unique = set(cell_names)
 
@@ -1870,6 +2113,7 @@ class Component(_GeometryHelper):
                     f"on_duplicate_cell: {write_settings.on_duplicate_cell!r} not in (None, warn, error, overwrite)"
                 )
 
+        cells = [cell if isinstance(cell, gdstk.Cell) else cell._cell for cell in cells]
         all_cells = [top_cell._cell] + sorted(cells, key=lambda cc: cc.name)
 
         no_name_cells = [
@@ -1888,8 +2132,8 @@ class Component(_GeometryHelper):
         lib = gdstk.Library(
             unit=write_settings.unit, precision=write_settings.precision
         )
-        lib.add(top_cell._cell)
-        lib.add(*top_cell._cell.dependencies(True))
+        # gdstk.Cell.dependencies walks every instance path (exponential in depth)
+        lib.add(*all_cells)
 
         if with_oasis:
             lib.write_oas(gdspath, **oasis_settings.dict())
@@ -2186,37 +2430,34 @@ class Component(_GeometryHelper):
             else:
                 self._cell.remove(item)
 
+        if self._locked:
+            self._invalidate_caches()
         self._bb_valid = False
         return self
 
-    def hash_geometry(self, precision: float = 1e-4) -> str:
+    def hash_geometry(self, precision: float = 1e-4, flat: bool = False) -> str:
         """Returns an SHA1 hash of the geometry in the Component.
 
         For each layer, each polygon is individually hashed and then the polygon hashes
         are sorted, to ensure the hash stays constant regardless of the ordering
         the polygons.  Similarly, the layers are sorted by (layer, datatype).
 
+        By default the hash is hierarchical: each unique cell is hashed once from
+        its own polygons, the hashes of the cells it references and the reference
+        transformations, and the result is cached on locked components.
+        Cells without references hash the same in both modes.
+
         Args:
             precision: Rounding precision for the the objects in the Component.
                 For instance, a precision of 1e-2 will round a point at
                 (0.124, 1.748) to (0.12, 1.75).
+            flat: hashes the flattened polygons, so the hash does not depend
+                on how the geometry is split into cells.
 
         """
-        polygons_by_spec = self.get_polygons(by_spec=True, as_array=False)
-        layers = np.array(list(polygons_by_spec.keys()))
-        sorted_layers = layers[np.lexsort((layers[:, 0], layers[:, 1]))]
-
-        final_hash = hashlib.sha1()
-        for layer in sorted_layers:
-            layer_hash = hashlib.sha1(layer.astype(np.int64)).digest()
-            polygons = polygons_by_spec[tuple(layer)]
-            polygons = [_rnd(p.points, precision) for p in polygons]
-            polygon_hashes = np.sort([hashlib.sha1(p).digest() for p in polygons])
-            final_hash.update(layer_hash)
-            for ph in polygon_hashes:
-                final_hash.update(ph)
-
-        return final_hash.hexdigest()
+        if flat:
+            return _hash_polygons(self.get_polygons_buffers(), precision).hexdigest()
+        return _hash_geometry(self, precision, {})
 
     def get_labels(
         self, apply_repetitions=True, depth: Optional[int] = None, layer=None
@@ -2244,6 +2485,8 @@ class Component(_GeometryHelper):
     def remove_labels(self) -> None:
         """Remove labels."""
         self._cell.remove(*self.labels)
+        if self._locked:
+            self._invalidate_caches()
 
     # Deprecated
     def get_info(self):
@@ -2306,6 +2549,9 @@ class Component(_GeometryHelper):
                             new_datatypes[layer_number] = new_layer[1]
                     path.set_layers(*new_layers)
                     path.set_datatypes(*new_datatypes)
+
+        # the polygons of the (locked) dependencies are remapped in place
+        self._invalidate_caches()
         return component
 
     def to_3d(
@@ -2705,7 +2951,7 @@ def flatten_invalid_refs_recursive(
     return component
 
 
-def _check_uncached_components(component, mode):
+def _check_uncached_components(component, mode, dependencies=None):
     valid_modes = ["warn", "error", "ignore"]
 
     if mode == "ignore":
@@ -2715,7 +2961,10 @@ def _check_uncached_components(component, mode):
             f"{mode} is not a valid value for on_uncached_component. Try one of these: {valid_modes}."
         )
 
-    for sub_component in component.get_dependencies(recursive=True):
+    if dependencies is None:
+        dependencies = component.get_dependencies(recursive=True)
+
+    for sub_component in dependencies:
         if not sub_component._locked:
             message = (
                 f"Component {sub_component.name!r} was NOT properly locked. "
@@ -58,26 +58,18 @@ def get_polygons(
     import gdsfactory as gf
 
     if hasattr(instance, "_cell"):
-        layers = instance.get_layers()
         gdstk_instance = instance._cell
 
     else:
-        layers = instance.parent.get_layers()
         gdstk_instance = instance._reference
 
     if not by_spec:
         polygons = gdstk_instance.get_polygons(depth=depth, include_paths=include_paths)
 
     elif by_spec is True:
-        polygons = {
-            layer: gdstk_instance.get_polygons(
-                depth=depth,
-                layer=layer[0],
-                datatype=layer[1],
-                include_paths=include_paths,
-            )
-            for layer in layers
-        }
+        polygons = _get_polygons_by_spec(
+            instance, depth=depth, include_paths=include_paths
+        )
 
     else:
         by_spec = gf.get_layer(by_spec)
@@ -104,6 +96,61 @@ def get_polygons(
     return layer_to_polygons
 
 
+def _get_polygons_by_spec(
+    instance, depth: Optional[int] = None, include_paths: bool = True
+) -> Dict[Tuple[int, int], List[Polygon]]:
+    """Returns polygons grouped by (layer, datatype) with one hierarchy traversal.
+
+    Every layer of the instance is a key, even if it has no polygons up to depth.
+    """
+    if hasattr(instance, "_cell"):
+        gdstk_instance = instance._cell
+        layers = instance.get_layers()
+    else:
+        gdstk_instance = instance._reference
+        layers = instance.parent.get_layers()
+
+    polygons: Dict[Tuple[int, int], List[Polygon]] = {layer: [] for layer in layers}
+    for polygon in gdstk_instance.get_polygons(
+        depth=depth, include_paths=include_paths
+    ):
+        layer = (polygon.layer, polygon.datatype)
+        if layer in polygons:
+            polygons[layer].append(polygon)
+        else:
+            polygons[layer] = [polygon]
+    return polygons
+
+
+def get_polygons_buffers(
+    instance, depth: Optional[int] = None, include_paths: bool = True
+) -> Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]:
+    """Returns polygon vertices per layer as contiguous NumPy buffers.
+
+    Polygon i of a layer is points[offsets[i]:offsets[i + 1]].
+
+    Args:
+        instance: Component or ComponentReference.
+        depth: number of reference levels to include. None includes all.
+        include_paths: If True, polygonal representation of paths are also included.
+
+    Returns:
+        dict of (layer, datatype) to (points [N][2], offsets [npolygons + 1]).
+    """
+    buffers = {}
+    for layer, polygons in _get_polygons_by_spec(
+        instance, depth=depth, include_paths=include_paths
+    ).items():
+        points = [polygon.points for polygon in polygons]
+        offsets = np.zeros(len(points) + 1, dtype=np.int64)
+        np.cumsum([len(p) for p in points], out=offsets[1:])
+        buffers[layer] = (
+            np.concatenate(points) if points else np.zeros((0, 2)),
+            offsets,
+        )
+    return buffers
+
+
 def _parse_layer(layer):
     """Check if the variable layer is a Layer object, a 2-element list like \
     [0, 1] representing layer = 0 and datatype = 1, or just a layer number.
@@ -185,6 +185,7 @@ class ComponentReference(_GeometryHelper):
         self._local_ports = {
             name: port._copy() for name, port in component.ports.items()
         }
+        self._ports_key = None
         self.visual_label = visual_label
         # self.uid = str(uuid.uuid4())[:8]
 
@@ -223,6 +224,7 @@ class ComponentReference(_GeometryHelper):
     @origin.setter
     def origin(self, value) -> None:
         self._reference.origin = snap_to_grid(value)
+        self._transform_changed()
 
     @property
     def magnification(self) -> float:
@@ -231,6 +233,7 @@ class ComponentReference(_GeometryHelper):
     @magnification.setter
     def magnification(self, value) -> None:
         self._reference.magnification = value
+        self._transform_changed()
 
     @property
     def rotation(self) -> float:
@@ -239,6 +242,7 @@ class ComponentReference(_GeometryHelper):
     @rotation.setter
     def rotation(self, value) -> None:
         self._reference.rotation = np.deg2rad(value)
+        self._transform_changed()
 
     @property
     def x_reflection(self) -> bool:
@@ -247,10 +251,17 @@ class ComponentReference(_GeometryHelper):
     @x_reflection.setter
     def x_reflection(self, value) -> None:
         self._reference.x_reflection = value
+        self._transform_changed()
 
     def _set_ref_cell(self, value) -> None:
         self._ref_cell = value
         self._reference.cell = value._cell
+        self._transform_changed()
+
+    def _transform_changed(self) -> None:
+        """Invalidates cached geometry when a reference in a locked Component moves."""
+        if self._owner is not None and self._owner._locked:
+            self._owner._invalidate_caches()
 
     @ref_cell.setter
     def ref_cell(self, value) -> None:
@@ -483,11 +494,12 @@ class ComponentReference(_GeometryHelper):
 
     def __getitem__(self, key):
         """Access reference ports."""
-        if key not in self.ports:
-            ports = list(self.ports.keys())
+        ports = self._get_local_ports()
+        if key not in ports:
+            ports = list(ports.keys())
             raise ValueError(f"{key!r} not in {ports}")
 
-        return self.ports[key]
+        return self._copy_port(ports[key])
 
     @property
     def ports(self) -> Dict[str, Port]:
@@ -495,30 +507,61 @@ class ComponentReference(_GeometryHelper):
 
         of the ports dict which is correctly rotated and translated.
         """
-        for name, port in self.parent.ports.items():
-            port = self.parent.ports[name]
-            new_center, new_orientation = self._transform_port(
-                port.center,
-                port.orientation,
-                self.origin,
-                self.rotation,
-                self.x_reflection,
-            )
+        return {
+            name: self._copy_port(port)
+            for name, port in self._get_local_ports().items()
+        }
+
+    def _copy_port(self, port: Port) -> Port:
+        port = port.copy()
+        port.reference = self
+        return port
+
+    def _get_local_ports(self) -> Dict[str, Port]:
+        """Returns the transformed ports, which must not be changed.
+
+        The transformed ports are cached while the parent is locked and
+        the transformation and the parent ports stay the same.
+        """
+        from gdsfactory.component import Component
+
+        parent = self.parent
+        parent_ports = parent.ports
+        key = (
+            self._reference.origin,
+            self._reference.rotation,
+            self._reference.x_reflection,
+            self._reference.magnification,
+            tuple(parent_ports),
+            tuple(map(id, parent_ports.values())),
+            Component._cache_epoch_global,
+        )
+        if parent._locked and key == self._ports_key:
+            return self._local_ports
+
+        centers, orientations = self._transform_ports(
+            np.array(
+                [port.center for port in parent_ports.values()], dtype=float
+            ).reshape(-1, 2),
+            [port.orientation for port in parent_ports.values()],
+        )
+        for (name, port), center, orientation in zip(
+            parent_ports.items(), centers, orientations
+        ):
             if name not in self._local_ports:
                 self._local_ports[name] = port.copy()
-            self._local_ports[name].center = new_center
-            self._local_ports[name].orientation = (
-                mod(new_orientation, 360) if new_orientation else new_orientation
-            )
-            self._local_ports[name].parent = self
+            local_port = self._local_ports[name]
+            local_port.center = center
+            local_port.orientation = orientation
+            local_port.parent = self
+
         # Remove any ports that no longer exist in the reference's parent
-        parent_names = self.parent.ports.keys()
-        local_names = list(self._local_ports.keys())
-        for name in local_names:
-            if name not in parent_names:
+        for name in list(self._local_ports):
+            if name not in parent_ports:
                 self._local_ports.pop(name)
-        for k in list(self._local_ports):
-            self._local_ports[k].reference = self
+        for port in self._local_ports.values():
+            port.reference = self
+        self._ports_key = key
         return self._local_ports
 
     @property
@@ -565,6 +608,36 @@ class ComponentReference(_GeometryHelper):
 
         return new_point, new_orientation
 
+    def _transform_ports(
+        self, centers: ndarray, orientations: List[Optional[float]]
+    ) -> Tuple[ndarray, List[Optional[float]]]:
+        """Apply the reference transformation to all port centers and orientations.
+
+        Same as _transform_port for each port, but with one NumPy operation.
+        """
+        centers = np.array(centers, dtype=float)
+        has_orientation = np.array([o is not None for o in orientations], dtype=bool)
+        angles = np.array(
+            [0 if o is None else o for o in orientations], dtype=float
+        ).reshape(-1)
+
+        if self.x_reflection:
+            centers[:, 1] = -centers[:, 1]
+            angles = -angles
+        rotation = self.rotation
+        if rotation is not None:
+            angles = angles + rotation
+            if rotation != 0 and has_orientation.any():
+                centers[has_orientation] = _rotate_points(
+                    centers[has_orientation], angle=rotation, center=[0, 0]
+                )
+        centers = centers + np.array(self.origin)
+        angles = mod(angles, 360)
+        return centers, [
+            angle if orientation else None
+            for angle, orientation in zip(angles, has_orientation)
+        ]
+
     def _transform_point(
         self,
         point: ndarray,
@@ -609,10 +682,10 @@ class ComponentReference(_GeometryHelper):
             origin = (0, 0)
 
         if isinstance(origin, str):
-            if origin not in self.ports:
+            if origin not in self._get_local_ports():
                 raise ValueError(f"{origin} not in {self.ports.keys()}")
 
-            origin = self.ports[origin]
+            origin = self[origin]
             origin = cast(Port, origin)
             o = origin.center
         elif hasattr(origin, "center"):
@@ -628,10 +701,10 @@ class ComponentReference(_GeometryHelper):
             )
 
         if isinstance(destination, str):
-            if destination not in self.ports:
+            if destination not in self._get_local_ports():
                 raise ValueError(f"{destination} not in {self.ports.keys()}")
 
-            destination = self.ports[destination]
+            destination = self[destination]
             destination = cast(Port, destination)
             d = destination.center
         if hasattr(destination, "center"):
@@ -673,7 +746,7 @@ class ComponentReference(_GeometryHelper):
         if angle == 0:
             return self
         if isinstance(center, (int, str)):
-            center = self.ports[center].center
+            center = self[center].center
 
         if isinstance(center, Port):
             center = center.center
@@ -694,7 +767,7 @@ class ComponentReference(_GeometryHelper):
             x0 = -self.x
 
         if port_name is not None:
-            position = self.ports[port_name]
+            position = self[port_name]
             x0 = position.x
         self.mirror((x0, 1), (x0, 0))
         return self
@@ -707,7 +780,7 @@ class ComponentReference(_GeometryHelper):
             y0 = 0.0
 
         if port_name is not None:
-            position = self.ports[port_name]
+            position = self[port_name]
             y0 = position.y
         self.mirror((1, y0), (0, y0))
         return self
@@ -771,8 +844,8 @@ class ComponentReference(_GeometryHelper):
             ComponentReference: with correct rotation to connect to destination.
         """
         # port can either be a string with the name, port index, or an actual Port
-        if port in self.ports:
-            p = self.ports[port]
+        if port in self._get_local_ports():
+            p = self[port]
         elif isinstance(port, Port):
             p = port
         else:
@@ -108,7 +108,7 @@ def coupler_full(
         c = x.add_bbox(c)
 
     if x.info:
-        c.info = x.info
+        c.info = dict(x.info)
 
     c.add_port("o1", port=bend_input_bottom.ports["o2"])
     c.add_port("o2", port=bend_input_top.ports["o2"])
@@ -33,7 +33,7 @@ def mmi2x2_with_sbend(
     P = gf.path.straight(length=2 * 2.4 + 2 * 1.6, npoints=5)
 
     xs = gf.get_cross_section(cross_section, add_pins=None)
-    xs.width = mmi_widths
+    xs = xs.copy(width=mmi_widths)
     ref = c << gf.path.extrude(P, cross_section=xs)
 
     # Add input and output tapers
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import concurrent.futures
+import contextlib
 import itertools as it
-from typing import Any, Dict, List, Tuple
+import multiprocessing
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
 
 import gdsfactory as gf
 from gdsfactory.cell import cell
@@ -13,12 +19,90 @@ from gdsfactory.typings import CellSpec, ComponentSpec, Optional
 _doe = "mmi1x2"
 _settings = dict(length_mmi=[2.5, 100], width_mmi=[4, 10])
 
+doe_n_workers: ContextVar[int] = ContextVar("doe_n_workers", default=1)
+_doe_job: Tuple[ComponentSpec, List[Dict], Optional[Callable]] = ("", [], None)
+
+
+@contextlib.contextmanager
+def parallel_doe(n_workers: int) -> Iterator[None]:
+    """Builds the DOE variants of pack_doe and pack_doe_grid in n_workers processes.
+
+    .. code::
+
+        with parallel_doe(n_workers=8):
+            c = gf.components.pack_doe(doe="mmi1x2", settings=settings)
+    """
+    token = doe_n_workers.set(n_workers)
+    try:
+        yield
+    finally:
+        doe_n_workers.reset(token)
+
+
+def _get_doe_component(
+    doe: ComponentSpec, settings: Dict[str, Any], function: Optional[Callable]
+) -> Component:
+    component = gf.get_component(doe, **settings)
+    return function(component) if function else component
+
+
+def _generate_doe_serialized(indices: List[int]) -> Tuple[bytes, bytes]:
+    """Returns the DOE variants of _doe_job as GDS and JSON bytes.
+
+    Runs in a worker process. Each variant is a reference of the returned cell.
+    """
+    from gdsfactory.disk_cache import dumps
+
+    doe, settings_list, function = _doe_job
+    container = Component()
+    for i in indices:
+        container.add_ref(_get_doe_component(doe, settings_list[i], function))
+    return dumps(container)
+
+
+def _generate_doe_parallel(
+    doe: ComponentSpec,
+    settings_list: List[Dict],
+    function: Optional[Callable],
+    n_workers: int,
+) -> List[Component]:
+    """Returns the DOE variants built in forked worker processes.
+
+    Variants are merged into the cell cache by name, so cells shared by
+    different variants or already in the cache are only loaded once.
+    """
+    from gdsfactory.disk_cache import loads
+
+    global _doe_job
+
+    indices = list(range(len(settings_list)))
+    chunks = [
+        chunk.tolist()
+        for chunk in np.array_split(indices, min(len(indices), 4 * n_workers))
+    ]
+    _doe_job = (doe, settings_list, function)
+    try:
+        context = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=context
+        ) as pool:
+            results = list(pool.map(_generate_doe_serialized, chunks))
+    finally:
+        _doe_job = ("", [], None)
+
+    component_list = []
+    for gds, metadata in results:
+        container = loads(gds, metadata)
+        component_list.extend(ref.parent for ref in container.references)
+    return component_list
+
 
 def generate_doe(
     doe: ComponentSpec,
     settings: Dict[str, List[Any]],
     do_permutations: bool = False,
     function: Optional[CellSpec] = None,
+    n_workers: Optional[int] = None,
 ) -> Tuple[List[Component], List[Dict]]:
     """Generates a component DOE (Design of Experiment).
 
@@ -29,6 +113,9 @@ def generate_doe(
         settings: component settings.
         do_permutations: for each setting.
         function: for the component (add padding, grating couplers ...)
+        n_workers: number of processes to build the variants.
+            Defaults to doe_n_workers (see parallel_doe).
+            The variants have the same names and geometry as a serial build.
     """
     if do_permutations:
         settings_list = [dict(zip(settings, t)) for t in it.product(*settings.values())]
@@ -39,12 +126,13 @@ def generate_doe(
         function = gf.get_cell(function)
         if not callable(function):
             raise ValueError(f"Error {function!r} needs to be callable.")
-        component_list = [
-            function(gf.get_component(doe, **settings)) for settings in settings_list
-        ]
+
+    n_workers = doe_n_workers.get() if n_workers is None else n_workers
+    if n_workers > 1 and len(settings_list) > 1:
+        component_list = _generate_doe_parallel(doe, settings_list, function, n_workers)
     else:
         component_list = [
-            gf.get_component(doe, **settings) for settings in settings_list
+            _get_doe_component(doe, settings, function) for settings in settings_list
         ]
     return component_list, settings_list
 
@@ -59,6 +147,8 @@ def pack_doe(
 ) -> Component:
     """Packs a component DOE (Design of Experiment) using pack.
 
+    Use parallel_doe to build the variants in worker processes.
+
     Args:
         doe: function to return Components.
         settings: component settings.
@@ -109,6 +199,8 @@ def pack_doe_grid(
 ) -> Component:
     """Packs a component DOE (Design of Experiment) using grid.
 
+    Use parallel_doe to build the variants in worker processes.
+
     Args:
         component: function to return Components.
         settings: component settings.
@@ -131,22 +223,9 @@ def pack_doe_grid(
         h_mirror: horizontal mirror y axis (x, 1) (1, 0). most common mirror.
         v_mirror: vertical mirror using x axis (1, y) (0, y).
     """
-    if do_permutations:
-        settings_list = [dict(zip(settings, t)) for t in it.product(*settings.values())]
-    else:
-        settings_list = [dict(zip(settings, t)) for t in zip(*settings.values())]
-
-    if function:
-        function = gf.get_cell(function)
-        if not callable(function):
-            raise ValueError(f"Error {function!r} needs to be callable.")
-        component_list = [
-            function(gf.get_component(doe, **settings)) for settings in settings_list
-        ]
-    else:
-        component_list = [
-            gf.get_component(doe, **settings) for settings in settings_list
-        ]
+    component_list, settings_list = generate_doe(
+        doe, settings, do_permutations, function
+    )
 
     if with_text:
         c = grid_with_text(component_list, **kwargs)
@@ -8,12 +8,14 @@ import hashlib
 import inspect
 import sys
 import functools
+import types
 from collections.abc import Iterable
+from dataclasses import dataclass
 from functools import partial
 from inspect import getmembers
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TypeVar
 
-from pydantic import BaseModel, Field, validate_arguments
+from pydantic import BaseModel, Field, PrivateAttr, validate_arguments
 from typing_extensions import Literal
 from gdsfactory.add_pins import add_pins_inside1nm, add_pins_siepic_optical
 
@@ -35,7 +37,32 @@ cladding_offsets_optical = None
 cladding_simplify_optical = None
 
 
-class Section(BaseModel):
+class _Shareable(BaseModel):
+    """BaseModel that can not be changed once it is shared by the CrossSection cache."""
+
+    _frozen: bool = PrivateAttr(default=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Raises TypeError if the instance is shared."""
+        if self._frozen:
+            raise TypeError(
+                f"{self.__class__.__name__} is shared by the cross_section cache "
+                "and can not be changed, use copy() to get a copy you can change."
+            )
+        super().__setattr__(name, value)
+
+    def __hash__(self) -> int:
+        """Hashes a few settings, equal instances have the same hash."""
+        return hash((self.__class__, self.layer, self.width, self.offset, self.name))
+
+    def _copy_and_set_values(self, *args, **kwargs):
+        """Copies and validated copies of a shared instance can be changed."""
+        m = super()._copy_and_set_values(*args, **kwargs)
+        object.__setattr__(m, "_frozen", False)
+        return m
+
+
+class Section(_Shareable):
     """CrossSection to extrude a path with a waveguide.
 
     Parameters:
@@ -85,7 +112,7 @@ class Section(BaseModel):
         extra = "forbid"
 
 
-class CrossSection(BaseModel):
+class CrossSection(_Shareable):
     """Waveguide information to extrude a path.
 
     cladding_layers follow path shape, while bbox_layers are rectangular.
@@ -162,17 +189,15 @@ class CrossSection(BaseModel):
 
     def __init__(__pydantic_self__, **data: Any) -> None:
         """Extend BaseModel init to process mirroring."""
+        if data.get("mirror") and data.get("sections"):
+            data["sections"] = [
+                section.copy(update={"offset": -section.offset})
+                if isinstance(section, Section)
+                else {**section, "offset": -section.get("offset", 0)}
+                for section in data["sections"]
+            ]
         super().__init__(**data)
 
-        if "mirror" in data and data["mirror"]:
-            data["offset"] *= -1
-            if data["sections"]:
-                for section in data["sections"]:
-                    section.offset *= -1
-            if data["cladding_offsets"]:
-                for offset in data["cladding_offsets"]:
-                    offset *= -1
-
     class Config:
         """Configuration."""
 
@@ -183,13 +208,12 @@ class CrossSection(BaseModel):
             "add_bbox": {"exclude": True},
         }
 
-    def copy(self, **kwargs):
-        """Returns a CrossSection copy."""
-        xs = super().copy(update=kwargs)
-        xs.decorator = self.decorator
-        xs.add_pins = self.add_pins
-        xs.add_bbox = self.add_bbox
-        return xs
+    def copy(self, **kwargs) -> CrossSection:
+        """Returns a CrossSection copy with some settings changed.
+
+        The copy can be changed, even if this CrossSection is shared.
+        """
+        return _to_mutable(_replace(self, **kwargs))
 
     def get_name(self) -> str:
         h = hashlib.md5(str(self).encode()).hexdigest()[:8]
@@ -311,30 +335,206 @@ class Transition(CrossSection):
     port_names: Tuple[Optional[str], Optional[str]] = (None, None)
     port_types: Tuple[Optional[str], Optional[str]] = ("optical", "optical")
 
+    __hash__ = _Shareable.__hash__
+
+
+@dataclass
+class CrossSectionCacheInfo:
+    """CrossSection interning statistics.
+
+    Args:
+        hits: number of CrossSections returned from the cache.
+        misses: number of CrossSections created.
+        currsize: number of distinct CrossSections in the cache.
+    """
+
+    hits: int
+    misses: int
+    currsize: int
+
+
+_CROSS_SECTIONS: Dict[Any, CrossSection] = {}
+_CACHE_STATS = {"hits": 0, "misses": 0}
+
+
+class _NoKey(Exception):
+    """Raised for settings that can not be part of a cache key."""
+
+
+class _FrozenDict(dict):
+    """dict of a shared CrossSection that raises on changes."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("CrossSection shared by the cache can not be changed")
+
+    __setitem__ = __delitem__ = __ior__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+
+    def __reduce__(self):
+        return _FrozenDict, (dict(self),)
+
+
+class _FrozenList(list):
+    """list of a shared CrossSection that raises on changes."""
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("CrossSection shared by the cache can not be changed")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = _immutable
+
+    def __reduce__(self):
+        return _FrozenList, (list(self),)
+
+
+def _freeze(value: Any) -> Any:
+    """Returns a hashable key for a CrossSection setting.
+
+    The type is part of the key as it is stored in CrossSection.info.
+    Only shared Sections and CrossSections are supported as others can change.
+    """
+    value_type = type(value)
+    if value_type in (str, int, float, bool) or value is None:
+        return value_type, value
+    if value_type in (tuple, list, _FrozenList):
+        value_type = tuple if value_type is tuple else list
+        return value_type, tuple(_freeze(v) for v in value)
+    if value_type in (dict, _FrozenDict):
+        return dict, tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if value_type is types.FunctionType:
+        return value
+    if isinstance(value, (Section, CrossSection)) and value._frozen:
+        return value
+    if value_type is functools.partial:
+        return (
+            functools.partial,
+            _freeze(value.func),
+            _freeze(value.args),
+            _freeze(value.keywords),
+        )
+    raise _NoKey
+
+
+def _get_key(factory: Any, args: Tuple[Any, ...], kwargs: Dict[str, Any]):
+    """Returns a hashable key of a factory call or None if not supported."""
+    try:
+        return factory, _freeze(args), _freeze(kwargs)
+    except (_NoKey, TypeError):
+        return None
+
+
+def _replace(xs: CrossSection, **kwargs) -> CrossSection:
+    """Returns a new CrossSection with some settings changed."""
+    update = dict(decorator=xs.decorator, add_pins=xs.add_pins, add_bbox=xs.add_bbox)
+    update.update(kwargs)
+    return BaseModel.copy(xs, update=update)
+
+
+def _to_immutable(value: Any) -> Any:
+    """Returns value with dicts, lists, Sections and CrossSections that raise on changes."""
+    if isinstance(value, dict):
+        return _FrozenDict((k, _to_immutable(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_to_immutable(v) for v in value)
+    if type(value) is tuple:
+        return tuple(_to_immutable(v) for v in value)
+    if isinstance(value, (Section, CrossSection)) and not value._frozen:
+        value = BaseModel.copy(
+            value, update={k: _to_immutable(v) for k, v in value.__dict__.items()}
+        )
+        object.__setattr__(value, "_frozen", True)
+    return value
+
+
+def _to_mutable(value: Any) -> Any:
+    """Returns a copy of a shared value that can be changed.
+
+    Sections and CrossSections are always copied, other values only if shared.
+    """
+    if isinstance(value, _FrozenDict):
+        return {k: _to_mutable(v) for k, v in value.items()}
+    if isinstance(value, _FrozenList):
+        return [_to_mutable(v) for v in value]
+    if type(value) is tuple:
+        return tuple(_to_mutable(v) for v in value)
+    if isinstance(value, (Section, CrossSection)):
+        value = BaseModel.copy(
+            value, update={k: _to_mutable(v) for k, v in value.__dict__.items()}
+        )
+    return value
+
+
+def _copy_shared(xs: CrossSection, **kwargs) -> CrossSection:
+    """Returns a CrossSection with some settings changed.
+
+    Copies of a shared CrossSection with the same settings are shared as well.
+    Other CrossSections are copied as they can change.
+    """
+    if not xs._frozen:
+        return xs.copy(**kwargs)
+    if not kwargs:
+        return xs
+    key = _get_key(xs, (), kwargs)
+    xs_copy = _CROSS_SECTIONS.get(key) if key is not None else None
+    if xs_copy is not None:
+        _CACHE_STATS["hits"] += 1
+        return xs_copy
+
+    xs_copy = _to_immutable(_replace(xs, **kwargs))
+    _CACHE_STATS["misses"] += 1
+    if key is not None:
+        _CROSS_SECTIONS[key] = xs_copy
+    return xs_copy
+
+
+def cross_section_cache_info() -> CrossSectionCacheInfo:
+    """Returns how many CrossSections were created and reused."""
+    return CrossSectionCacheInfo(
+        hits=_CACHE_STATS["hits"],
+        misses=_CACHE_STATS["misses"],
+        currsize=len(_CROSS_SECTIONS),
+    )
+
+
+def clear_cross_section_cache() -> None:
+    """Clears the CrossSection cache and statistics."""
+    _CROSS_SECTIONS.clear()
+    _CACHE_STATS.update(hits=0, misses=0)
+
 
 def _xsection_without_validator(func):
     """Decorator for cross_section functions
 
     use xsection instead so it will validate arguments with types.
+
+    The CrossSection is shared, so it can not be changed, and calls with the
+    same arguments return it without calling func again.
     """
+    sig = inspect.signature(func)
+    parameter_names = list(sig.parameters.keys())
+
+    # Get settings from default arguments in function signature
+    default = {
+        p.name: p.default
+        for p in sig.parameters.values()
+        if p.default != inspect._empty
+    }
 
     @functools.wraps(func)
     def _xsection(*args, **kwargs):
-        xs = func(*args, **kwargs)
+        key = _get_key(_xsection, args, kwargs)
+        xs = _CROSS_SECTIONS.get(key) if key is not None else None
+        if xs is not None:
+            _CACHE_STATS["hits"] += 1
+            return xs
 
-        sig = inspect.signature(func)
+        xs = func(*args, **kwargs)
 
         # Collect args passed into function into dict
-        args_as_kwargs = dict(zip(sig.parameters.keys(), args))
-
-        # Get settings from default arguments in function signature
-        settings = {
-            p.name: p.default
-            for p in sig.parameters.values()
-            if p.default != inspect._empty
-        }
+        args_as_kwargs = dict(zip(parameter_names, args))
 
         # Update with args and kwargs, overriding defaults
+        settings = default.copy()
         settings.update(args_as_kwargs)
         settings.update(kwargs)
 
@@ -344,7 +544,14 @@ def _xsection_without_validator(func):
                 "make sure that functions with @xsection decorator return a CrossSection",
             )
 
-        xs.info.update(settings=settings, function_name=func.__name__)
+        # func can return a shared CrossSection, so info is replaced, not updated
+        xs = _replace(
+            xs, info={**xs.info, "settings": settings, "function_name": func.__name__}
+        )
+        xs = _to_immutable(xs)
+        _CACHE_STATS["misses"] += 1
+        if key is not None:
+            _CROSS_SECTIONS[key] = xs
         return xs
 
     return _xsection
@@ -584,7 +791,7 @@ def slot(
     rail_width = (width - slot_width) / 2
     rail_offset = (rail_width + slot_width) / 2
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(width=rail_width, offset=rail_offset, layer=layer, name="left_rail"),
         Section(width=rail_width, offset=-rail_offset, layer=layer, name="right rail"),
@@ -652,7 +859,7 @@ def rib_with_trenches(
     """
     trench_offset = width / 2 + width_trench / 2
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(width=width_slab, layer=layer, name="slab", simplify=simplify_slab)
     ]
@@ -729,7 +936,7 @@ def l_with_trenches(
 
     mult = 1 if mirror else -1
     trench_offset = mult * (width / 2 + width_trench / 2)
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(
             width=width_slab, layer=layer, offset=mult * (width_slab / 2 - width / 2)
@@ -839,7 +1046,7 @@ def pin(
     slab_width = width + 2 * via_stack_gap + 2 * via_stack_width - 2 * slab_gap
     via_stack_offset = width / 2 + via_stack_gap + via_stack_width / 2
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [Section(width=slab_width, layer=layer_slab, name="slab")]
     sections += [
         Section(
@@ -973,7 +1180,7 @@ def pn(
     """
     slab = Section(width=width_slab, offset=0, layer=layer_slab)
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [slab]
     base_offset_low_doping = width_doping / 2 + gap_low_doping / 4
     width_low_doping = width_doping - gap_low_doping / 2
@@ -1177,7 +1384,7 @@ def pn_with_trenches(
         c.plot()
     """
     trench_offset = width / 2 + width_trench / 2
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [Section(width=width_slab, layer=layer)]
     sections += [
         Section(width=width_trench, offset=offset, layer=layer_trench)
@@ -1391,7 +1598,7 @@ def pn_with_trenches_asymmetric(
 
     # Trenches
     trench_offset = width / 2 + width_trench / 2
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [Section(width=width_slab, layer=layer)]
     sections += [
         Section(width=width_trench, offset=offset, layer=layer_trench)
@@ -1609,7 +1816,7 @@ def l_wg_doped_with_trenches(
     """
 
     trench_offset = -1 * (width / 2 + width_trench / 2)
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(width=width_slab, layer=layer, offset=-1 * (width_slab / 2 - width / 2))
     ]
@@ -1745,7 +1952,7 @@ def strip_heater_metal_undercut(
         c.plot()
     """
     trench_offset = trench_gap + trench_width / 2 + width / 2
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(
             layer=layer_heater,
@@ -1794,7 +2001,7 @@ def strip_heater_metal(
         c.plot()
     """
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(
             layer=layer_heater,
@@ -1855,7 +2062,7 @@ def strip_heater_doped(
     """
     heater_offset = width / 2 + heater_gap + heater_width / 2
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(
             layer=layer,
@@ -1942,7 +2149,7 @@ def rib_heater_doped(
         slab_width = width + heater_gap + heater_width + slab_gap
         slab_offset = +slab_width / 2
 
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
 
     if with_bot_heater:
         sections += [
@@ -2038,7 +2245,7 @@ def rib_heater_doped_via_stack(
 
     heater_offset = width / 2 + heater_gap + heater_width / 2
     via_stack_offset = width / 2 + via_stack_gap + via_stack_width / 2
-    sections = kwargs.pop("sections", [])
+    sections = list(kwargs.pop("sections", []))
     sections += [
         Section(width=slab_width, layer=layer_slab, offset=slab_offset, name="slab"),
     ]
@@ -0,0 +1,486 @@
+"""Persistent on-disk cache for @cell Components.
+
+Each cached cell is stored once, as a GDS file and a JSON file with the ports,
+settings, info and reference names of its cells. Cells that have their own
+entry are written as empty placeholder cells and referenced by key, so a
+hierarchy of N cells takes N entries. Cells without an entry are stored with
+the parent that references them.
+
+The cache key includes the cell name (which already hashes the changed arguments),
+the source code of the module that defines the factory, the active PDK name and
+version and the gdsfactory version, so editing a factory or a helper in the same
+module, or bumping the PDK version, invalidates it. An entry is also ignored when
+the module of one of the cells it references changed since it was written.
+
+Note that the key does not include the source code of helpers in other modules,
+so bump `Pdk.version` or clear the cache directory when you edit those.
+
+Port cross_sections are pickled into the JSON file, so only load entries from
+directories you trust.
+
+.. code::
+
+    import gdsfactory as gf
+
+    pdk = gf.get_active_pdk()
+    pdk.cell_decorator_settings.disk_cache_dirpath = gf.PATH.gdslib / "cells"
+    c = gf.components.mzi()  # second python process loads it from disk
+"""
+from __future__ import annotations
+
+import base64
+import functools
+import hashlib
+import inspect
+import linecache
+import os
+import pathlib
+import pickle
+import tempfile
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import gdstk
+import orjson
+import toolz
+
+from gdsfactory.cell import CACHE, Settings, get_source_code
+from gdsfactory.component import Component
+from gdsfactory.component_reference import ComponentReference
+from gdsfactory.config import __version__, logger
+from gdsfactory.port import Port
+from gdsfactory.serialization import clean_dict
+from gdsfactory.typings import PathType
+
+
+_KEYS: weakref.WeakKeyDictionary[Component, str] = weakref.WeakKeyDictionary()
+
+
+def _get_source_file(func: Callable) -> Optional[str]:
+    """Returns the file that defines a function or None if not available."""
+    if isinstance(func, functools.partial):
+        func = func.func
+    elif isinstance(func, toolz.functoolz.Compose):
+        func = func.first
+    try:
+        return inspect.getsourcefile(inspect.unwrap(func))
+    except (TypeError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_file_hash(filepath: str) -> Optional[str]:
+    """Returns md5 hash of a source file or None if not available."""
+    source = "".join(linecache.getlines(filepath))
+    return hashlib.md5(source.encode()).hexdigest() if source else None
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_hash(func: Callable) -> Optional[str]:
+    """Returns md5 hash of the module source code or None if not available.
+
+    Falls back to the function source code for functions without a module file.
+    """
+    try:
+        source = get_source_code(func)
+    except (OSError, TypeError, ValueError):
+        return None
+    filepath = _get_source_file(func)
+    file_hash = _get_file_hash(filepath) if filepath else None
+    return file_hash or hashlib.md5(source.encode()).hexdigest()
+
+
+def _dumps_cross_section(cross_section: Any) -> Optional[str]:
+    """Returns a pickled cross_section as text or None if it can not be pickled."""
+    try:
+        return base64.b64encode(pickle.dumps(cross_section)).decode()
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        name = getattr(cross_section, "name", cross_section)
+        logger.warning(f"Skip port cross_section {name!r} in disk cache: {e}")
+        return None
+
+
+def _loads_cross_section(data: Optional[str]) -> Any:
+    return None if data is None else pickle.loads(base64.b64decode(data))
+
+
+def _port_to_dict(
+    port: Port, cross_sections: Dict[int, Tuple[int, Any]]
+) -> Dict[str, Any]:
+    """Returns port settings. The cross_section is an index into cross_sections."""
+    cross_section = port.cross_section
+    if cross_section is not None:
+        index, _ = cross_sections.setdefault(
+            id(cross_section), (len(cross_sections), cross_section)
+        )
+    else:
+        index = None
+    return {
+        "name": port.name,
+        "center": [float(port.center[0]), float(port.center[1])],
+        "width": float(port.width),
+        "orientation": None if port.orientation is None else float(port.orientation),
+        "layer": list(port.layer),
+        "port_type": port.port_type,
+        "shear_angle": port.shear_angle,
+        "cross_section": index,
+    }
+
+
+def _cell_to_dict(
+    component: Component, cross_sections: Dict[int, Tuple[int, Any]]
+) -> Dict[str, Any]:
+    settings = component.settings
+    return {
+        "ports": [
+            _port_to_dict(port, cross_sections) for port in component.ports.values()
+        ],
+        "settings": clean_dict(dict(settings))
+        if isinstance(settings, Settings)
+        else None,
+        "info": clean_dict(component.info or {}),
+        "references": [ref.name for ref in component.references],
+        "cache_key": CACHE.get_cache_key(component),
+    }
+
+
+def _postorder(component: Component, visited: Dict[int, Component]) -> None:
+    for ref in component.references:
+        if id(ref.parent) not in visited:
+            _postorder(ref.parent, visited)
+    visited[id(component)] = component
+
+
+class DiskCache:
+    """Stores and loads locked @cell Components from a directory.
+
+    Args:
+        dirpath: directory for the GDS and JSON files.
+    """
+
+    def __init__(self, dirpath: PathType) -> None:
+        self.dirpath = pathlib.Path(dirpath)
+
+    def get_key(self, name: str, func: Callable) -> Optional[str]:
+        """Returns the cache key for a cell or None if it can not be cached.
+
+        Args:
+            name: cell name computed by the @cell decorator.
+            func: cell factory.
+        """
+        from gdsfactory.pdk import get_active_pdk
+
+        source_hash = get_source_hash(func)
+        if source_hash is None:
+            return None
+        pdk = get_active_pdk()
+        key = f"{name}_{source_hash}_{pdk.name}_{pdk.version}_{__version__}"
+        return f"{name}_{hashlib.md5(key.encode()).hexdigest()[:8]}"
+
+    def load(self, key: str, cache: bool = False) -> Optional[Component]:
+        """Returns the cached Component for a key or None if it is not cached.
+
+        Args:
+            key: of the entry.
+            cache: also put the Component into the memory CACHE.
+        """
+        from gdsfactory.pdk import get_active_pdk
+
+        gdspath = self.dirpath / f"{key}.gds"
+        jsonpath = self.dirpath / f"{key}.json"
+        if not gdspath.exists() or not jsonpath.exists():
+            return None
+
+        try:
+            metadata = orjson.loads(jsonpath.read_bytes())
+            unit = get_active_pdk().gds_write_settings.unit
+            library = gdstk.read_gds(str(gdspath), unit=unit)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skip corrupt disk cache entry {str(gdspath)!r}: {e}")
+            return None
+
+        # entries referenced by key were written from another module version
+        source_file = metadata.get("source_file")
+        if source_file and _get_file_hash(source_file) != metadata["source_hash"]:
+            return None
+
+        try:
+            cross_sections = [
+                _loads_cross_section(data) for data in metadata["cross_sections"]
+            ]
+        except (pickle.UnpicklingError, AttributeError, ImportError, TypeError) as e:
+            logger.warning(f"Skip disk cache entry {str(jsonpath)!r}: {e}")
+            return None
+
+        cells_metadata = metadata["cells"]
+        children = metadata.get("children", {})
+        cell_to_component: Dict[gdstk.Cell, Component] = {}
+        reused = set()
+
+        for cell in library.cells:
+            component = None
+            if cell.name != metadata["top"]:
+                component = CACHE.get_by_cell_name(cell.name)
+                if component is None and cell.name in children:
+                    component = self.load(children[cell.name], cache=True)
+                    if component is None:
+                        return None
+            if component is not None:
+                reused.add(cell)
+            else:
+                component = Component(name=cell.name)
+                component._cell = cell
+                component.name = cell.name
+            cell_to_component[cell] = component
+
+        for cell, component in cell_to_component.items():
+            if cell in reused:
+                continue
+            cell_metadata = cells_metadata.get(cell.name, {})
+            aliases = cell_metadata.get("references", [])
+
+            for i, e in enumerate(cell.references):
+                child = cell_to_component[e.cell]
+                e.cell = child._cell
+                ref = ComponentReference(
+                    component=child,
+                    origin=e.origin,
+                    rotation=e.rotation,
+                    magnification=e.magnification,
+                    x_reflection=e.x_reflection,
+                    columns=e.repetition.columns or 1,
+                    rows=e.repetition.rows or 1,
+                    spacing=e.repetition.spacing,
+                    v1=e.repetition.v1,
+                    v2=e.repetition.v2,
+                )
+                component._register_reference(
+                    ref, alias=aliases[i] if i < len(aliases) else None
+                )
+                component._references.append(ref)
+                ref._reference = e
+
+            for port in cell_metadata.get("ports", []):
+                component.add_port(
+                    name=port["name"],
+                    center=port["center"],
+                    width=port["width"],
+                    orientation=port["orientation"],
+                    layer=tuple(port["layer"]),
+                    port_type=port["port_type"],
+                )
+                component.ports[port["name"]].shear_angle = port["shear_angle"]
+                if port["cross_section"] is not None:
+                    component.ports[port["name"]].cross_section = cross_sections[
+                        port["cross_section"]
+                    ]
+
+            component.info = cell_metadata.get("info", {})
+            if cell_metadata.get("settings"):
+                component.settings = Settings(**cell_metadata["settings"])
+
+        top = [c for c in cell_to_component.values() if c.name == metadata["top"]]
+        if not top:
+            return None
+
+        # children go into the memory cache before their parents so cells built
+        # later in this session reuse them instead of creating duplicated names
+        loaded = {id(c) for cell, c in cell_to_component.items() if cell not in reused}
+        components: Dict[int, Component] = {}
+        _postorder(top[0], components)
+        for component in components.values():
+            if id(component) not in loaded:
+                continue
+            component.lock()
+            cache_key = cells_metadata.get(component.name, {}).get("cache_key")
+            if (
+                (cache or component is not top[0])
+                and cache_key
+                and cache_key not in CACHE
+            ):
+                CACHE[cache_key] = component
+        _KEYS[top[0]] = key
+        return top[0]
+
+    def save(self, key: str, component: Component, func: Callable = None) -> None:
+        """Writes a locked Component to the cache.
+
+        Cells below it that have an entry in this directory are referenced by key,
+        the other cells are stored with it.
+
+        Args:
+            key: of the entry.
+            component: to store.
+            func: factory of the component. Its module is checked on load.
+        """
+        from gdsfactory.pdk import get_active_pdk
+
+        write_settings = get_active_pdk().gds_write_settings
+        self.dirpath.mkdir(parents=True, exist_ok=True)
+
+        cells: Dict[str, Component] = {}
+        children: Dict[str, str] = {}
+        stack = [component]
+        while stack:
+            c = stack.pop()
+            if c.name in cells:
+                continue
+            cells[c.name] = c
+            for ref in c.references:
+                child = ref.parent
+                if child.name in cells or child.name in children:
+                    continue
+                child_key = _KEYS.get(child)
+                if child_key and (self.dirpath / f"{child_key}.json").exists():
+                    children[child.name] = child_key
+                else:
+                    stack.append(child)
+
+        source_file = _get_source_file(func) if func else None
+        cross_sections: Dict[int, Tuple[int, Any]] = {}
+        cells_metadata = {
+            name: _cell_to_dict(c, cross_sections) for name, c in cells.items()
+        }
+        metadata = {
+            "top": component.name,
+            "cells": cells_metadata,
+            "cross_sections": [
+                _dumps_cross_section(cross_section)
+                for _, cross_section in cross_sections.values()
+            ],
+            "children": children,
+            "source_file": source_file,
+            "source_hash": _get_file_hash(source_file) if source_file else None,
+        }
+
+        library = gdstk.Library(
+            unit=write_settings.unit, precision=write_settings.precision
+        )
+        library.add(*[c._cell for c in cells.values()])
+        library.add(*[gdstk.Cell(name) for name in children])
+
+        # write to a temporary file first so concurrent processes never read
+        # a partially written entry
+        gdspath = self.dirpath / f"{key}.gds"
+        jsonpath = self.dirpath / f"{key}.json"
+        gdspath_tmp = self.dirpath / f"{key}.gds.{os.getpid()}.tmp"
+        jsonpath_tmp = self.dirpath / f"{key}.json.{os.getpid()}.tmp"
+        library.write_gds(str(gdspath_tmp), max_points=write_settings.max_points)
+        jsonpath_tmp.write_bytes(orjson.dumps(metadata))
+        os.replace(gdspath_tmp, gdspath)
+        os.replace(jsonpath_tmp, jsonpath)
+        _KEYS[component] = key
+
+
+def dumps(component: Component) -> Tuple[bytes, bytes]:
+    """Returns the GDS and JSON bytes of a locked Component and its dependencies.
+
+    The temporary directory has no other entries, so all the cells are stored.
+
+    Used to send Components built in worker processes back to the parent.
+    """
+    with tempfile.TemporaryDirectory() as dirpath:
+        disk_cache = DiskCache(dirpath)
+        disk_cache.save("component", component)
+        gds = (disk_cache.dirpath / "component.gds").read_bytes()
+        metadata = (disk_cache.dirpath / "component.json").read_bytes()
+    return gds, metadata
+
+
+def loads(gds: bytes, metadata: bytes) -> Component:
+    """Returns a Component from the bytes returned by dumps.
+
+    Cells with the same name as a cached cell are reused from the cache.
+    """
+    with tempfile.TemporaryDirectory() as dirpath:
+        disk_cache = DiskCache(dirpath)
+        (disk_cache.dirpath / "component.gds").write_bytes(gds)
+        (disk_cache.dirpath / "component.json").write_bytes(metadata)
+        return disk_cache.load("component")
+
+
+def test_disk_cache(tmp_path) -> None:
+    import gdsfactory as gf
+
+    c1 = gf.components.mzi()
+    disk_cache = DiskCache(tmp_path)
+    key = disk_cache.get_key(c1.name, gf.components.mzi)
+    disk_cache.save(key, c1)
+
+    gf.clear_cache()
+    c2 = disk_cache.load(key)
+    assert c2.name == c1.name
+    assert {
+        name: (port.to_dict(), port.cross_section) for name, port in c2.ports.items()
+    } == {name: (port.to_dict(), port.cross_section) for name, port in c1.ports.items()}
+    assert c2.settings.full == c1.settings.full
+    assert set(c2.named_references) == set(c1.named_references)
+    assert {c.name for c in c2.get_dependencies(recursive=True)} == {
+        c.name for c in c1.get_dependencies(recursive=True)
+    }
+    assert c2.hash_geometry(precision=1e-3) == c1.hash_geometry(precision=1e-3)
+
+
+def test_cell_disk_cache(tmp_path) -> None:
+    import gdsfactory as gf
+    from gdsfactory.cell import cache_info
+
+    settings = gf.get_active_pdk().cell_decorator_settings
+    settings.disk_cache_dirpath = tmp_path
+    try:
+        gf.clear_cache()
+        c1 = gf.components.mzi(delta_length=11)
+        builds = cache_info().build_count["mzi"]
+        gf.clear_cache()
+        c2 = gf.components.mzi(delta_length=11)
+        assert cache_info().build_count["mzi"] == builds
+        assert c2 is not c1
+        assert c2.name == c1.name
+        assert c2 is gf.components.mzi(delta_length=11)
+        children = {ref.parent.name: ref.parent for ref in c2.references}
+        assert gf.components.bend_euler() is children["bend_euler"]
+    finally:
+        settings.disk_cache_dirpath = None
+        gf.clear_cache()
+
+
+def test_cell_disk_cache_children(tmp_path) -> None:
+    """Cells with an entry are stored once and referenced by key."""
+    import gdsfactory as gf
+
+    settings = gf.get_active_pdk().cell_decorator_settings
+    settings.disk_cache_dirpath = tmp_path
+    try:
+        gf.clear_cache()
+        c1 = gf.components.mzi(delta_length=12)
+        metadata = orjson.loads(next(tmp_path.glob("mzi_*.json")).read_bytes())
+        assert "bend_euler" in metadata["children"]
+        assert "bend_euler" not in metadata["cells"]
+
+        gf.clear_cache()
+        c2 = gf.components.mzi(delta_length=12)
+        assert c2.hash_geometry(precision=1e-3) == c1.hash_geometry(precision=1e-3)
+
+        # an entry written from another version of the module is stale
+        gf.clear_cache()
+        disk_cache = DiskCache(tmp_path)
+        for jsonpath in tmp_path.glob("bend_euler_*.json"):
+            metadata = orjson.loads(jsonpath.read_bytes())
+            metadata["source_hash"] = "stale"
+            jsonpath.write_bytes(orjson.dumps(metadata))
+            assert disk_cache.load(jsonpath.stem) is None
+    finally:
+        settings.disk_cache_dirpath = None
+        gf.clear_cache()
+
+
+if __name__ == "__main__":
+    import gdsfactory as gf
+
+    c = gf.components.mzi()
+    disk_cache = DiskCache(gf.PATH.gdslib / "cells")
+    key = disk_cache.get_key(c.name, gf.components.mzi)
+    disk_cache.save(key, c)
+    gf.clear_cache()
+    c = disk_cache.load(key)
+    c.show()
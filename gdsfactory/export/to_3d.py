@@ -1,12 +1,234 @@
+"""Extrude Components into 3D meshes.
+
+Each unique cell is extruded once per layer and its instances are placed with
+transforms, so the number of meshes scales with the number of unique cells
+instead of the number of polygons.
+
+Etch layers of the LayerStack are applied to the polygons of each cell.
+References that overlap geometry of their parent or siblings that they can
+etch, or be etched by, are flattened into the parent before etching.
+"""
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
-import shapely
+import numpy as np
 
 from gdsfactory.component import Component
+from gdsfactory.component_layout import get_polygons_buffers
 from gdsfactory.technology import LayerStack, LayerViews
-from gdsfactory.typings import Layer
+from gdsfactory.typings import Layer, PathType
+
+Polygons = Dict[Layer, List[np.ndarray]]
+Cells = Dict[str, Tuple[Polygons, List[Tuple[str, np.ndarray]]]]
+
+
+def _get_transform(ref, offset=(0, 0)) -> np.ndarray:
+    """Returns the 4x4 matrix of a reference: reflect, magnify, rotate and move."""
+    angle = np.deg2rad(ref.rotation)
+    cos, sin = np.cos(angle), np.sin(angle)
+    magnification = ref.magnification or 1
+    reflection = -1 if ref.x_reflection else 1
+    transform = np.eye(4)
+    transform[:2, :2] = magnification * np.array(
+        [[cos, -sin * reflection], [sin, cos * reflection]]
+    )
+    transform[:2, 3] = np.asarray(ref.origin) + offset
+    return transform
+
+
+def _get_etch_layers(layer_stack: LayerStack) -> Tuple[Set[Layer], Set[Layer]]:
+    """Returns the etch layers and the layers they etch into."""
+    etch_layers = set()
+    etched_layers = set()
+    for level in layer_stack.layers.values():
+        if level.layer and level.layer_type == "etch" and level.into:
+            etch_layers.add(tuple(level.layer))
+            etched_layers.update(
+                tuple(layer_stack.layers[name].layer)
+                for name in level.into
+                if layer_stack.layers[name].layer
+            )
+    return etch_layers, etched_layers
+
+
+def _get_interacting(
+    bboxes: np.ndarray, etch: np.ndarray, etched: np.ndarray
+) -> np.ndarray:
+    """Returns a mask of the boxes that overlap a box they can etch or be etched by."""
+    lower, upper = bboxes[:, 0], bboxes[:, 1]
+    overlap = np.all(
+        (lower[:, None] < upper[None]) & (lower[None] < upper[:, None]), axis=2
+    )
+    np.fill_diagonal(overlap, False)
+    interacts = (etch[:, None] & etched[None]) | (etched[:, None] & etch[None])
+    return np.any(overlap & interacts, axis=1)
+
+
+def _add_polygons(
+    component: Component, layer: Layer, points: np.ndarray, offsets: np.ndarray
+) -> None:
+    if len(points):
+        for polygon in np.split(points, offsets[1:-1]):
+            component.add_polygon(polygon, layer=layer)
+
+
+def _add_cell(
+    cell: Component,
+    layer_stack: LayerStack,
+    etch_layers: Set[Layer],
+    etched_layers: Set[Layer],
+    cells: Cells,
+) -> None:
+    """Adds the etched polygons and the instances of cell to cells."""
+    if cell.name in cells:
+        return
+
+    own_polygons = get_polygons_buffers(cell, depth=0)
+    references = list(cell.references)
+    bboxes = [ref.bbox for ref in references] + [
+        [points.min(axis=0), points.max(axis=0)]
+        for points, _ in own_polygons.values()
+        if len(points)
+    ]
+    layers = [set(ref.parent.get_layers()) for ref in references] + [
+        {layer} for layer, (points, _) in own_polygons.items() if len(points)
+    ]
+    flatten = _get_interacting(
+        np.asarray(bboxes, dtype=float).reshape(-1, 2, 2),
+        np.array([bool(layer & etch_layers) for layer in layers]),
+        np.array([bool(layer & etched_layers) for layer in layers]),
+    )
+
+    component = Component()
+    for layer, (points, offsets) in own_polygons.items():
+        _add_polygons(component, layer, points, offsets)
+
+    instances = []
+    for ref, flat in zip(references, flatten):
+        if flat:
+            for layer, (points, offsets) in get_polygons_buffers(ref).items():
+                _add_polygons(component, layer, points, offsets)
+            continue
+        _add_cell(ref.parent, layer_stack, etch_layers, etched_layers, cells)
+        repetition = ref._reference.repetition
+        for offset in repetition.get_offsets() if repetition.size else [(0, 0)]:
+            instances.append((ref.parent.name, _get_transform(ref, offset)))
+
+    derived = layer_stack.get_component_with_derived_layers(component)
+    polygons = {
+        layer: list(layer_polygons)
+        for layer, layer_polygons in derived.get_polygons(by_spec=True).items()
+    }
+    cells[cell.name] = (polygons, instances)
+
+
+def get_cells(component: Component, layer_stack: LayerStack) -> Cells:
+    """Returns cell name to (etched polygons by layer, [(cell name, transform)]).
+
+    The polygons of a cell do not include the polygons of its instances.
+    """
+    cells: Cells = {}
+    _add_cell(component, layer_stack, *_get_etch_layers(layer_stack), cells)
+    return cells
+
+
+def get_placements(
+    cells: Cells, name: str, transform: Optional[np.ndarray] = None
+) -> Iterator[Tuple[str, np.ndarray]]:
+    """Yields (cell name, 4x4 transform) for the cell and all its instances."""
+    transform = np.eye(4) if transform is None else transform
+    yield name, transform
+    for child, child_transform in cells[name][1]:
+        yield from get_placements(cells, child, transform @ child_transform)
+
+
+def _is_convex(points: np.ndarray) -> bool:
+    edges = np.roll(points, -1, axis=0) - points
+    cross = edges[:, 0] * np.roll(edges[:, 1], -1) - edges[:, 1] * np.roll(
+        edges[:, 0], -1
+    )
+    return bool(np.all(cross >= 0))
+
+
+def extrude_polygons(
+    polygons: List[np.ndarray],
+    zmin: float,
+    height: float,
+    hull_invalid_polygons: bool = True,
+):
+    """Returns one trimesh with all the polygons extruded from zmin.
+
+    Convex polygons are triangulated as fans, others with trimesh.
+
+    Args:
+        polygons: list of [N][2] points.
+        zmin: bottom of the extrusion.
+        height: of the extrusion.
+        hull_invalid_polygons: replaces invalid polygons with their convex hull.
+    """
+    import shapely
+    import trimesh
+
+    vertices = []
+    faces = []
+    nvertices = 0
+    for points in polygons:
+        points = np.asarray(points, dtype=float)
+        if np.all(points[0] == points[-1]):
+            points = points[:-1]
+        if len(points) < 3:
+            continue
+        area = np.sum(points[:, 0] * np.roll(points[:, 1], -1)) - np.sum(
+            points[:, 1] * np.roll(points[:, 0], -1)
+        )
+        if area < 0:
+            points = points[::-1]
+
+        n = len(points)
+        if _is_convex(points):
+            cap_vertices = points
+            cap_faces = np.c_[
+                np.zeros(n - 2, int), np.arange(1, n - 1), np.arange(2, n)
+            ]
+        else:
+            polygon = shapely.geometry.Polygon(points)
+            if hull_invalid_polygons and not polygon.is_valid:
+                polygon = shapely.geometry.polygon.orient(polygon.convex_hull)
+                points = np.asarray(polygon.exterior.coords)[:-1]
+                n = len(points)
+            cap_vertices, cap_faces = trimesh.creation.triangulate_polygon(polygon)
+            (ax, ay), (bx, by), (cx, cy) = cap_vertices[cap_faces[0]]
+            if (bx - ax) * (cy - ay) - (by - ay) * (cx - ax) < 0:
+                cap_faces = cap_faces[:, ::-1]
+
+        m = len(cap_vertices)
+        ring = np.arange(n)
+        bottom, top = 2 * m + ring, 2 * m + n + ring
+        bottom_next, top_next = np.roll(bottom, -1), np.roll(top, -1)
+        vertices.extend(
+            [
+                np.c_[cap_vertices, np.full(m, zmin)],
+                np.c_[cap_vertices, np.full(m, zmin + height)],
+                np.c_[points, np.full(n, zmin)],
+                np.c_[points, np.full(n, zmin + height)],
+            ]
+        )
+        faces.extend(
+            [
+                cap_faces[:, ::-1] + nvertices,
+                cap_faces + m + nvertices,
+                np.c_[bottom, bottom_next, top_next] + nvertices,
+                np.c_[bottom, top_next, top] + nvertices,
+            ]
+        )
+        nvertices += 2 * m + 2 * n
+
+    if not faces:
+        return trimesh.Trimesh()
+    return trimesh.Trimesh(
+        vertices=np.concatenate(vertices), faces=np.concatenate(faces)
+    )
 
 
 def to_3d(
@@ -17,6 +239,9 @@ def to_3d(
 ):
     """Return Component 3D trimesh Scene.
 
+    Each unique cell is extruded once per layer and each instance is a node
+    of the scene graph, so `to_3d(c).export("c.glb")` writes every mesh once.
+
     Args:
         component: to extrude in 3D.
         layer_views: layer colors from Klayout Layer Properties file.
@@ -29,7 +254,6 @@ def to_3d(
     from gdsfactory.pdk import get_active_pdk, get_layer_stack, get_layer_views
 
     try:
-        from trimesh.creation import extrude_polygon
         from trimesh.scene import Scene
     except ImportError as e:
         print("you need to `pip install trimesh`")
@@ -42,49 +266,81 @@ def to_3d(
     layer_to_thickness = layer_stack.get_layer_to_thickness()
     layer_to_zmin = layer_stack.get_layer_to_zmin()
     exclude_layers = exclude_layers or ()
-    # layers = layer_views.layer_map.values()
-
-    component_with_booleans = layer_stack.get_component_with_derived_layers(component)
-    component_layers = component_with_booleans.get_layers()
-    component_with_booleans.show()
-
-    has_polygons = False
-
-    for layer, polygons in component_with_booleans.get_polygons(
-        by_spec=True, as_array=False
-    ).items():
-        if (
-            layer not in exclude_layers
-            and layer in layer_to_zmin
-            and layer in layer_to_thickness
-            and layer in component_layers
-        ):
-            height = layer_to_thickness[layer]
-            zmin = layer_to_zmin[layer]
+
+    cells = get_cells(component, layer_stack)
+    geometries = {}
+    for name, (polygons, _) in cells.items():
+        geometries[name] = []
+        for layer, layer_polygons in polygons.items():
+            if (
+                layer in exclude_layers
+                or layer not in layer_to_zmin
+                or layer not in layer_to_thickness
+                or layer_to_zmin[layer] is None
+            ):
+                continue
             layer_view = layer_views.get_from_tuple(layer)
+            if not layer_view.visible:
+                continue
             color_rgb = [
                 c / 255 for c in layer_view.fill_color.as_rgb_tuple(alpha=False)
             ]
-            # opacity = layer_view.get_alpha()
-            # print(layer, height, zmin, opacity, layer_view.visible)
-
-            if zmin is not None and layer_view.visible:
-                for polygon in polygons:
-                    p = shapely.geometry.Polygon(polygon.points)
-                    mesh = extrude_polygon(p, height=height)
-                    mesh.apply_translation((0, 0, zmin))
-                    mesh.visual.face_colors = (*color_rgb, 0.5)
-                    scene.add_geometry(mesh)
-                    has_polygons = True
-
-    if not has_polygons:
+            mesh = extrude_polygons(
+                layer_polygons,
+                zmin=layer_to_zmin[layer],
+                height=layer_to_thickness[layer],
+            )
+            if mesh.is_empty:
+                continue
+            mesh.visual.face_colors = (*color_rgb, 0.5)
+            geometry = f"{name}_{layer[0]}_{layer[1]}"
+            scene.geometry[geometry] = mesh
+            geometries[name].append(geometry)
+
+    def _add_node(name: str, parent: str, node: str, transform: np.ndarray) -> None:
+        scene.graph.update(frame_from=parent, frame_to=node, matrix=transform)
+        for geometry in geometries[name]:
+            scene.graph.update(
+                frame_from=node, frame_to=f"{node}/{geometry}", geometry=geometry
+            )
+        for i, (child, child_transform) in enumerate(cells[name][1]):
+            _add_node(child, node, f"{node}/{child}_{i}", child_transform)
+
+    if not scene.geometry:
         raise ValueError(
             f"{component.name!r} does not have polygons defined in the "
             f"layer_stack or layer_views for the active Pdk {get_active_pdk().name!r}"
         )
+    _add_node(component.name, scene.graph.base_frame, component.name, np.eye(4))
     return scene
 
 
+def to_glb(
+    component: Component,
+    filepath: PathType,
+    layer_views: Optional[LayerViews] = None,
+    layer_stack: Optional[LayerStack] = None,
+    exclude_layers: Optional[Tuple[Layer, ...]] = None,
+) -> None:
+    """Writes a Component to a GLB file with one mesh per unique cell and layer.
+
+    Args:
+        component: to extrude in 3D.
+        filepath: to write the GLB to.
+        layer_views: layer colors from Klayout Layer Properties file.
+        layer_stack: contains thickness and zmin for each layer.
+        exclude_layers: layers to exclude.
+    """
+    scene = to_3d(
+        component,
+        layer_views=layer_views,
+        layer_stack=layer_stack,
+        exclude_layers=exclude_layers,
+    )
+    with open(filepath, "wb") as f:
+        scene.export(file_obj=f, file_type="glb")
+
+
 if __name__ == "__main__":
     import gdsfactory as gf
 
@@ -13,6 +13,7 @@ from pathlib import Path
 from pydantic import BaseModel, Field
 
 from gdsfactory import Component
+from gdsfactory.pdk import get_layer
 
 
 class GerberLayer(BaseModel):
@@ -81,6 +82,7 @@ def to_gerber(
             resolution: float = 1e-6
             int_size: int = 4
     """
+    layer_to_polygons = component.get_polygons(by_spec=True)
     for layer_tup, layer in layermap_to_gerber_layer.items():
         filename = (dirpath / layer.name.replace(" ", "_")).with_suffix(".gbr")
         with open(filename, "w+") as f:
@@ -110,7 +112,7 @@ def to_gerber(
             f.write("%ADD10C,0.050000*%\n")
 
             # Only supports polygons for now
-            for poly in component.get_polygons(by_spec=layer_tup):
+            for poly in layer_to_polygons.get(get_layer(layer_tup), []):
                 f.write(polygon(poly))
 
             # File end
@@ -1,11 +1,432 @@
+"""Rasterize Component polygons into numpy arrays.
+
+The image is rendered in square tiles, so each tile only draws the polygons
+that overlap it and tiles can be rendered in parallel or streamed.
+Cells placed several times with a translation are rasterized once and
+copied into the tiles for each instance.
+"""
 from __future__ import annotations
 
-from typing import Optional
+import concurrent.futures
+import multiprocessing
+from collections import defaultdict, deque
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
 from gdsfactory.component import Component
-from gdsfactory.typings import Floats, Layers
+from gdsfactory.component_layout import get_polygons_buffers
+from gdsfactory.typings import Floats, Layers, PathType
+
+Tile = Tuple[Tuple[slice, slice], np.ndarray]
+_subpixels = 1024
+_rasterizer: Optional["_Rasterizer"] = None
+
+
+def _snap(pixels: np.ndarray) -> np.ndarray:
+    """Rounds pixel coordinates to a binary fraction of a pixel.
+
+    Translating snapped polygons by whole pixels is exact, so a cell rasterized
+    once gives the same pixels as rasterizing each of its instances.
+    """
+    return np.round(pixels * _subpixels) / _subpixels
+
+
+def _fill_polygon(image: np.ndarray, points: np.ndarray) -> None:
+    """Sets the pixels of image with centers inside or on the edges of a polygon.
+
+    Pixel (i, j) has its center at (i, j). Each row is filled between pairs of
+    edge crossings, so the cost scales with the polygon perimeter in pixels.
+    """
+    ni, nj = image.shape
+    lower, upper = points.min(axis=0), points.max(axis=0)
+    if upper[0] < 0 or upper[1] < 0 or lower[0] > ni - 1 or lower[1] > nj - 1:
+        return
+    if _is_rectangle(points):
+        if (upper > lower).all():
+            a0, b0 = np.maximum(np.ceil(lower), 0).astype(int)
+            a1, b1 = np.maximum(np.floor(upper) + 1, 0).astype(int)
+            image[a0:a1, b0:b1] = 1
+        return
+
+    x0, y0 = points[:, 0], points[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+
+    # rows i crossed by each edge, with min(x0, x1) <= i < max(x0, x1)
+    first = np.maximum(np.ceil(np.minimum(x0, x1)), 0).astype(int)
+    last = np.minimum(np.ceil(np.maximum(x0, x1)) - 1, ni - 1).astype(int)
+    counts = np.maximum(last - first + 1, 0)
+    edges = np.repeat(np.arange(len(x0)), counts)
+    rows = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows += first[edges]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ys = y0[edges] + (rows - x0[edges]) * (
+            (y1[edges] - y0[edges]) / (x1[edges] - x0[edges])
+        )
+    order = np.lexsort((ys, rows))
+    rows, ys = rows[order], ys[order]
+    spans = [(rows[0::2], ys[0::2], ys[1::2])]
+
+    # edges and vertices on the rows
+    vertical = (x0 == x1) & (x0 == np.round(x0)) & (x0 >= 0) & (x0 < ni)
+    spans.append(
+        (
+            x0[vertical].astype(int),
+            np.minimum(y0, y1)[vertical],
+            np.maximum(y0, y1)[vertical],
+        )
+    )
+    vertices = (x0 == np.round(x0)) & (x0 >= 0) & (x0 < ni)
+    spans.append((x0[vertices].astype(int), y0[vertices], y0[vertices]))
+
+    rows, ya, yb = (np.concatenate(values) for values in zip(*spans))
+    ja = np.maximum(np.ceil(ya), 0).astype(int)
+    jb = np.minimum(np.floor(yb), nj - 1).astype(int)
+    keep = ja <= jb
+    for row, start, stop in zip(
+        rows[keep].tolist(), ja[keep].tolist(), (jb[keep] + 1).tolist()
+    ):
+        image[row, start:stop] = 1
+
+
+def _is_rectangle(points: np.ndarray) -> bool:
+    """Returns True for axis-aligned rectangles."""
+    return len(points) == 4 and (
+        (
+            points[0, 0] == points[1, 0]
+            and points[2, 0] == points[3, 0]
+            and points[1, 1] == points[2, 1]
+            and points[3, 1] == points[0, 1]
+        )
+        or (
+            points[0, 1] == points[1, 1]
+            and points[2, 1] == points[3, 1]
+            and points[1, 0] == points[2, 0]
+            and points[3, 0] == points[0, 0]
+        )
+    )
+
+
+def _get_shape(component: Component, nm_per_pixel: float) -> Tuple[int, int]:
+    pixels_per_um = (1 / nm_per_pixel) * 1e3
+    xmin, ymin = component.bbox[0]
+    xmax, ymax = component.bbox[1]
+    return (
+        int(np.ceil(xmax - xmin) * pixels_per_um),
+        int(np.ceil(ymax - ymin) * pixels_per_um),
+    )
+
+
+def _get_instances(component: Component) -> Dict[str, int]:
+    """Returns the number of instances of each cell in component."""
+    instances = defaultdict(int)
+    instances[component.name] = 1
+    for cell in reversed([*component.get_dependencies(recursive=True), component]):
+        for ref in cell.references:
+            repetition = ref._reference.repetition
+            instances[ref.parent.name] += instances[cell.name] * max(repetition.size, 1)
+    return instances
+
+
+class _Rasterizer:
+    """Renders the polygons of a component in pixel coordinates.
+
+    Args:
+        component: to rasterize.
+        shift: pixel coordinates of the component origin, snapped.
+        shape: image shape in pixels.
+        pixels_per_um: scale.
+        layers: one channel per layer.
+        dtype: of the image.
+        tile_size: tile side in pixels. Cells up to this size are reused.
+        instances: number of instances of each cell.
+        stamps: rasters of the reused cells by cell name and sub-pixel shift.
+    """
+
+    def __init__(
+        self,
+        component: Component,
+        shift: np.ndarray,
+        shape: Tuple[int, int],
+        pixels_per_um: float,
+        layers: Layers,
+        dtype,
+        tile_size: int,
+        instances: Dict[str, int],
+        stamps: Dict[Tuple[str, float, float], Tuple[np.ndarray, np.ndarray]],
+    ) -> None:
+        self.shape = shape
+        self.pixels_per_um = pixels_per_um
+        self.layers = [tuple(layer) for layer in layers]
+        self.dtype = dtype
+        self.tile_size = tile_size
+        self.instances = instances
+        self.stamps = stamps
+
+        self.polygons: List[Tuple[int, np.ndarray]] = []
+        self.stamp_placements: List[Tuple[Tuple[str, float, float], np.ndarray]] = []
+        self._add_component(component, shift)
+
+        self.polygon_bins = self._bin(
+            [
+                np.r_[points.min(axis=0), points.max(axis=0)]
+                for _, points in self.polygons
+            ]
+        )
+        self.stamp_bins = self._bin(
+            [
+                np.r_[corner, corner + self.stamps[key][1].shape[1:] - 1]
+                for key, corner in self.stamp_placements
+            ]
+        )
+
+    def _add_polygons(self, instance, shift: np.ndarray, depth=None) -> None:
+        for layer, (points, offsets) in get_polygons_buffers(
+            instance, depth=depth
+        ).items():
+            if layer not in self.layers or len(offsets) < 2:
+                continue
+            channel = self.layers.index(layer)
+            points = _snap(points * self.pixels_per_um) + shift
+            self.polygons.extend(
+                (channel, polygon) for polygon in np.split(points, offsets[1:-1])
+            )
+
+    def _add_component(self, component: Component, shift: np.ndarray) -> None:
+        self._add_polygons(component, shift, depth=0)
+        for ref in component.references:
+            if ref.rotation % 360 or ref.x_reflection or ref.magnification != 1:
+                self._add_polygons(ref, shift, depth=None)
+                continue
+            repetition = ref._reference.repetition
+            offsets = repetition.get_offsets() if repetition.size else [(0, 0)]
+            for offset in offsets:
+                self._add_reference(
+                    ref.parent,
+                    shift
+                    + _snap((np.asarray(ref.origin) + offset) * self.pixels_per_um),
+                )
+
+    def _add_reference(self, cell: Component, shift: np.ndarray) -> None:
+        """Adds a translated cell, rasterized once if it has several instances."""
+        (xmin, ymin), (xmax, ymax) = cell.bbox * self.pixels_per_um
+        size = (xmax - xmin + 2) * (ymax - ymin + 2)
+        if self.instances[cell.name] < 2 or size > self.tile_size**2:
+            self._add_component(cell, shift)
+            return
+
+        corner = np.floor(shift).astype(int)
+        phase = shift - corner
+        key = (cell.name, *phase.tolist())
+        if key not in self.stamps:
+            origin = np.floor(_snap(cell.bbox[0] * self.pixels_per_um) + phase)
+            shape = tuple(
+                np.floor(_snap(cell.bbox[1] * self.pixels_per_um) + phase).astype(int)
+                - origin.astype(int)
+                + 1
+            )
+            stamp = _Rasterizer(
+                component=cell,
+                shift=phase - origin,
+                shape=shape,
+                pixels_per_um=self.pixels_per_um,
+                layers=self.layers,
+                dtype=self.dtype,
+                tile_size=self.tile_size,
+                instances=self.instances,
+                stamps=self.stamps,
+            )
+            self.stamps[key] = (origin.astype(int), stamp.render(0, 0, *shape))
+        self.stamp_placements.append((key, corner + self.stamps[key][0]))
+
+    def _bin(self, bboxes: List[np.ndarray]) -> Dict[Tuple[int, int], List[int]]:
+        """Returns the indices of the bounding boxes that overlap each tile."""
+        bins = defaultdict(list)
+        if not bboxes:
+            return bins
+        bboxes = np.asarray(bboxes)
+        ntiles = np.ceil(np.array(self.shape) / self.tile_size).astype(int) - 1
+        inside = (
+            (bboxes[:, 2] >= 0)
+            & (bboxes[:, 3] >= 0)
+            & (bboxes[:, 0] < self.shape[0])
+            & (bboxes[:, 1] < self.shape[1])
+        )
+        tiles = np.floor(bboxes / self.tile_size).astype(int)
+        tiles = np.clip(tiles, 0, np.r_[ntiles, ntiles])
+        for index in np.flatnonzero(inside).tolist():
+            ti0, tj0, ti1, tj1 = tiles[index].tolist()
+            for ti in range(ti0, ti1 + 1):
+                for tj in range(tj0, tj1 + 1):
+                    bins[ti, tj].append(index)
+        return bins
+
+    def render(self, i0: int, j0: int, ni: int, nj: int) -> np.ndarray:
+        """Returns the (layers, ni, nj) pixels starting at pixel (i0, j0).
+
+        The region has to be aligned to the tiles or cover the full image.
+        """
+        tile = np.zeros((len(self.layers), ni, nj), dtype=self.dtype)
+        ti0, tj0 = i0 // self.tile_size, j0 // self.tile_size
+        ti1, tj1 = (i0 + ni - 1) // self.tile_size, (j0 + nj - 1) // self.tile_size
+        polygons = set()
+        placements = set()
+        for ti in range(ti0, ti1 + 1):
+            for tj in range(tj0, tj1 + 1):
+                polygons.update(self.polygon_bins.get((ti, tj), []))
+                placements.update(self.stamp_bins.get((ti, tj), []))
+
+        for index in sorted(polygons):
+            channel, points = self.polygons[index]
+            _fill_polygon(tile[channel], points - (i0, j0))
+
+        for index in sorted(placements):
+            key, corner = self.stamp_placements[index]
+            stamp = self.stamps[key][1]
+            a0, b0 = np.maximum(corner, (i0, j0))
+            a1, b1 = np.minimum(corner + stamp.shape[1:], (i0 + ni, j0 + nj))
+            if a0 < a1 and b0 < b1:
+                tile[:, a0 - i0 : a1 - i0, b0 - j0 : b1 - j0] |= stamp[
+                    :, a0 - corner[0] : a1 - corner[0], b0 - corner[1] : b1 - corner[1]
+                ]
+        return tile
+
+    def get_tiles(self) -> List[Tuple[int, int, int, int]]:
+        return [
+            (
+                i0,
+                j0,
+                min(self.tile_size, self.shape[0] - i0),
+                min(self.tile_size, self.shape[1] - j0),
+            )
+            for i0 in range(0, self.shape[0], self.tile_size)
+            for j0 in range(0, self.shape[1], self.tile_size)
+        ]
+
+
+def _render_tile(tile: Tuple[int, int, int, int]) -> np.ndarray:
+    return _rasterizer.render(*tile)
+
+
+def _get_rasterizer(
+    component: Component,
+    nm_per_pixel: float,
+    layers: Layers,
+    dtype,
+    tile_size: int,
+) -> _Rasterizer:
+    pixels_per_um = (1 / nm_per_pixel) * 1e3
+    return _Rasterizer(
+        component=component,
+        shift=-_snap(np.asarray(component.bbox[0]) * pixels_per_um),
+        shape=_get_shape(component, nm_per_pixel),
+        pixels_per_um=pixels_per_um,
+        layers=layers,
+        dtype=dtype,
+        tile_size=tile_size,
+        instances=_get_instances(component),
+        stamps={},
+    )
+
+
+def to_np_tiles(
+    component: Component,
+    nm_per_pixel: float = 20,
+    layers: Layers = ((1, 0),),
+    dtype=bool,
+    tile_size: int = 1024,
+    n_workers: int = 1,
+) -> Iterator[Tile]:
+    """Yields the image of to_np_layers tile by tile, without padding.
+
+    Args:
+        component: Component.
+        nm_per_pixel: you can go from 20 (coarse) to 4 (fine).
+        layers: one channel per layer.
+        dtype: of the tiles (bool or uint8).
+        tile_size: tile side in pixels.
+        n_workers: number of processes to render the tiles.
+
+    Yields:
+        (rows, columns) slices of the tile in the image, (layers, rows, columns) tile.
+        With n_workers > 1, at most 2 * n_workers tiles are rendered ahead of the
+        consumer, so a slow consumer does not hold the whole image in memory.
+    """
+    global _rasterizer
+
+    rasterizer = _get_rasterizer(component, nm_per_pixel, layers, dtype, tile_size)
+    tiles = rasterizer.get_tiles()
+    slices = [(slice(i0, i0 + ni), slice(j0, j0 + nj)) for i0, j0, ni, nj in tiles]
+    if n_workers <= 1 or len(tiles) < 2:
+        for tile, index in zip(tiles, slices):
+            yield index, rasterizer.render(*tile)
+        return
+
+    _rasterizer = rasterizer
+    try:
+        context = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=context
+        ) as pool:
+            futures = deque()
+            for tile, index in zip(tiles, slices):
+                futures.append((index, pool.submit(_render_tile, tile)))
+                if len(futures) >= 2 * n_workers:
+                    index, future = futures.popleft()
+                    yield index, future.result()
+            while futures:
+                index, future = futures.popleft()
+                yield index, future.result()
+    finally:
+        _rasterizer = None
+
+
+def to_np_layers(
+    component: Component,
+    nm_per_pixel: float = 20,
+    layers: Layers = ((1, 0),),
+    pad_width: int = 1,
+    dtype=bool,
+    tile_size: int = 1024,
+    n_workers: int = 1,
+    filepath: Optional[PathType] = None,
+) -> np.ndarray:
+    """Returns a (layers, x, y) pixelated numpy array with one channel per layer.
+
+    Args:
+        component: Component.
+        nm_per_pixel: you can go from 20 (coarse) to 4 (fine).
+        layers: one channel per layer.
+        pad_width: padding pixels around the image.
+        dtype: of the image (bool or uint8).
+        tile_size: tile side in pixels.
+        n_workers: number of processes to render the tiles.
+        filepath: optional .npy file to memory-map the image to.
+    """
+    nx, ny = _get_shape(component, nm_per_pixel)
+    shape = (len(layers), nx + 2 * pad_width, ny + 2 * pad_width)
+    if filepath:
+        img = np.lib.format.open_memmap(filepath, mode="w+", dtype=dtype, shape=shape)
+        img[:] = 0
+    else:
+        img = np.zeros(shape, dtype=dtype)
+
+    for (rows, columns), tile in to_np_tiles(
+        component,
+        nm_per_pixel=nm_per_pixel,
+        layers=layers,
+        dtype=dtype,
+        tile_size=tile_size,
+        n_workers=n_workers,
+    ):
+        img[
+            :,
+            rows.start + pad_width : rows.stop + pad_width,
+            columns.start + pad_width : columns.stop + pad_width,
+        ] = tile
+    if filepath:
+        img.flush()
+    return img
 
 
 def to_np(
@@ -17,6 +438,8 @@ def to_np(
 ) -> np.ndarray:
     """Returns a pixelated numpy array from Component polygons.
 
+    Use to_np_layers for one channel per layer or large images.
+
     Args:
         component: Component.
         nm_per_pixel: you can go from 20 (coarse) to 4 (fine).
@@ -25,32 +448,15 @@ def to_np(
         pad_width: padding pixels around the image.
 
     """
-    import skimage.draw as skdraw
-
-    pixels_per_um = (1 / nm_per_pixel) * 1e3
-    xmin, ymin = component.bbox[0]
-    xmax, ymax = component.bbox[1]
-    shape = (
-        int(np.ceil(xmax - xmin) * pixels_per_um),
-        int(np.ceil(ymax - ymin) * pixels_per_um),
+    channels = to_np_layers(
+        component, nm_per_pixel=nm_per_pixel, layers=layers, pad_width=pad_width
     )
-    img = np.zeros(shape, dtype=float)
-    layer_to_polygons = component.get_polygons(by_spec=True, depth=None)
-
     values = values or [1] * len(layers)
 
-    for layer, value in zip(layers, values):
-        if layer in layer_to_polygons:
-            polygons = layer_to_polygons[layer]
-            for polygon in polygons:
-                r = polygon[:, 0] - xmin
-                c = polygon[:, 1] - ymin
-                rr, cc = skdraw.polygon(
-                    r * pixels_per_um, c * pixels_per_um, shape=shape
-                )
-                img[rr, cc] = value
-
-    return np.pad(img, pad_width=pad_width)
+    img = np.zeros(channels.shape[1:], dtype=float)
+    for channel, value in zip(channels, values):
+        img[channel] = value
+    return img
 
 
 if __name__ == "__main__":
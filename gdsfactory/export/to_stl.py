@@ -3,10 +3,34 @@ from __future__ import annotations
 import pathlib
 from typing import Optional, Tuple
 
+import numpy as np
+
 from gdsfactory.component import Component
+from gdsfactory.export.to_3d import extrude_polygons, get_cells, get_placements
 from gdsfactory.technology import LayerStack
 from gdsfactory.typings import Layer
 
+_stl_dtype = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attributes", "<u2")]
+)
+
+
+def _get_triangles(vertices: np.ndarray, transform: np.ndarray) -> np.ndarray:
+    """Returns binary STL records of [N][3][3] triangles moved by a 4x4 transform."""
+    triangles = vertices @ transform[:3, :3].T + transform[:3, 3]
+    if np.linalg.det(transform[:3, :3]) < 0:
+        triangles = triangles[:, ::-1]
+    normals = np.cross(
+        triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0]
+    )
+    norms = np.linalg.norm(normals, axis=1, keepdims=True)
+    records = np.zeros(len(triangles), dtype=_stl_dtype)
+    records["normal"] = np.divide(
+        normals, norms, out=np.zeros_like(normals), where=norms > 0
+    )
+    records["vertices"] = triangles
+    return records
+
 
 def to_stl(
     component: Component,
@@ -17,7 +41,10 @@ def to_stl(
     hull_invalid_polygons: bool = True,
     scale: Optional[float] = None,
 ) -> None:
-    """Exports a Component into STL.
+    """Exports a Component into binary STL, one file per layer.
+
+    Each unique cell is extruded once per layer and the triangles of each
+    instance are streamed to disk, so the full layer mesh is never in memory.
 
     Args:
         component: to export.
@@ -29,8 +56,6 @@ def to_stl(
         scale: Optional factor by which to scale meshes before writing.
 
     """
-    import shapely
-    import trimesh.creation
     from gdsfactory.pdk import get_layer_stack
 
     layer_stack = layer_stack or get_layer_stack()
@@ -39,17 +64,22 @@ def to_stl(
     layer_to_zmin = layer_stack.get_layer_to_zmin()
     filepath = pathlib.Path(filepath)
     exclude_layers = exclude_layers or []
+    layer_to_name = {
+        tuple(level.layer): name
+        for name, level in layer_stack.layers.items()
+        if level.layer
+    }
 
-    component_with_booleans = layer_stack.get_component_with_derived_layers(component)
-    component_layers = component_with_booleans.get_layers()
-    layer_names = list(layer_stack.layers.keys())
-    layer_tuples = list(layer_stack.layers.values())
-    for layer, polygons in component_with_booleans.get_polygons(by_spec=True).items():
+    cells = get_cells(component, layer_stack)
+    placements = list(get_placements(cells, component.name))
+    layers = {layer for polygons, _ in cells.values() for layer in polygons}
+
+    for layer in sorted(layers):
         if (
             layer in exclude_layers
             or layer not in layer_to_thickness
             or layer not in layer_to_zmin
-            or layer not in component_layers
+            or layer_to_zmin[layer] is None
         ):
             continue
 
@@ -57,7 +87,7 @@ def to_stl(
         zmin = layer_to_zmin[layer]
 
         layer_name = (
-            layer_names[layer_tuples.index(layer)]
+            layer_to_name.get(layer, f"{layer[0]}_{layer[1]}")
             if use_layer_name
             else f"{layer[0]}_{layer[1]}"
         )
@@ -68,23 +98,32 @@ def to_stl(
         print(
             f"Write {filepath_layer.absolute()!r} zmin = {zmin:.3f}, height = {height:.3f}"
         )
-        meshes = []
-        for polygon in polygons:
-            p = shapely.geometry.Polygon(polygon)
-
-            if hull_invalid_polygons and not p.is_valid:
-                p = p.convex_hull
-
-            mesh = trimesh.creation.extrude_polygon(p, height=height)
-            mesh.apply_translation((0, 0, zmin))
-            meshes.append(mesh)
-
-        layer_mesh = trimesh.util.concatenate(meshes)
-
-        if scale:
-            layer_mesh.apply_scale(scale)
 
-        layer_mesh.export(filepath_layer)
+        cell_triangles = {}
+        for name, (polygons, _) in cells.items():
+            if layer in polygons:
+                mesh = extrude_polygons(
+                    polygons[layer],
+                    zmin=zmin,
+                    height=height,
+                    hull_invalid_polygons=hull_invalid_polygons,
+                )
+                if len(mesh.faces):
+                    cell_triangles[name] = mesh.triangles
+
+        transform_scale = np.diag([scale, scale, scale, 1]) if scale else np.eye(4)
+        layer_placements = [
+            (name, transform_scale @ transform)
+            for name, transform in placements
+            if name in cell_triangles
+        ]
+        ntriangles = sum(len(cell_triangles[name]) for name, _ in layer_placements)
+
+        with open(filepath_layer, "wb") as f:
+            f.write(b"gdsfactory".ljust(80, b"\0"))
+            f.write(np.uint32(ntriangles).tobytes())
+            for name, transform in layer_placements:
+                _get_triangles(cell_triangles[name], transform).tofile(f)
 
 
 if __name__ == "__main__":
@@ -4,8 +4,9 @@ Adapted from PHIDL https://github.com/amccaugh/phidl/ by Adam McCaughan
 """
 from __future__ import annotations
 
-import itertools
-from typing import List, Optional, Union, Tuple
+import concurrent.futures
+import math
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
 import gdstk
 import numpy as np
@@ -80,13 +81,6 @@ def _rasterize_polygons(polygons, bounds=([-100, -100], [100, 100]), dx=1, dy=1)
     return raster
 
 
-def _raster_index_to_coords(i, j, bounds=([-100, -100], [100, 100]), dx=1, dy=1):
-    """Converts (i,j) index of raster matrix to real coordinates."""
-    x = (j + 0.5) * dx + bounds[0][0]
-    y = (i + 0.5) * dy + bounds[0][1]
-    return x, y
-
-
 def _expand_raster(raster, distance=(4, 2)):
     """Expands all black (1) pixels in the raster."""
     try:
@@ -111,6 +105,358 @@ def _expand_raster(raster, distance=(4, 2)):
     return morphology.binary_dilation(image=raster, footprint=neighborhood)
 
 
+def _raster_mask(
+    exclude_polys: List[np.ndarray],
+    include_polys: List[np.ndarray],
+    bbox: Tuple[Float2, Float2],
+    spacing: Float2,
+    margin: float,
+) -> np.ndarray:
+    """Returns a boolean array of the grid cells inside bbox that can be filled.
+
+    A cell is blocked when its center is inside an exclude polygon or on its
+    rasterized outline, and not on an include polygon. The blocked cells are
+    then dilated by margin.
+    """
+    dx, dy = spacing
+    raster = _rasterize_polygons(exclude_polys, bounds=bbox, dx=dx, dy=dy)
+    raster &= ~_rasterize_polygons(include_polys, bounds=bbox, dx=dx, dy=dy)
+    return ~_expand_raster(raster, distance=margin / np.array(spacing))
+
+
+def _polygon_bboxes(polygons: List[np.ndarray]) -> np.ndarray:
+    """Returns an (n, 4) array with xmin, ymin, xmax, ymax of each polygon."""
+    if not polygons:
+        return np.zeros((0, 4))
+    return np.array(
+        [(*p.min(axis=0), *p.max(axis=0)) for p in polygons], dtype=float
+    ).reshape(-1, 4)
+
+
+def _cell_range(
+    start: float, stop: float, origin: float, pitch: float, size: int
+) -> Tuple[int, int]:
+    """Returns the first and past the last grid cell overlapped by (start, stop)."""
+    eps = 1e-6
+    first = math.floor((start - origin) / pitch + eps)
+    last = math.ceil((stop - origin) / pitch - eps)
+    return min(max(first, 0), size), min(max(last, 0), size)
+
+
+def _block_columns(
+    blocked: np.ndarray,
+    pieces: List[gdstk.Polygon],
+    j0: int,
+    j1: int,
+    origin: Float2,
+    spacing: Float2,
+) -> None:
+    """Blocks the cells overlapped by pieces that lie within columns j0 to j1.
+
+    The pieces are bisected along the column edges, so each final piece lies
+    within one column and overlaps every row between its lowest and highest point.
+    """
+    x0, y0 = origin
+    dx, dy = spacing
+    if j1 - j0 == 1:
+        for piece in pieces:
+            (_, ymin), (_, ymax) = piece.bounding_box()
+            i0, i1 = _cell_range(ymin, ymax, y0, dy, blocked.shape[0])
+            blocked[i0:i1, j0] = True
+        return
+
+    jm = (j0 + j1) // 2
+    left, right = gdstk.slice(pieces, x0 + jm * dx, "x")
+    if left:
+        _block_columns(blocked, left, j0, jm, origin, spacing)
+    if right:
+        _block_columns(blocked, right, jm, j1, origin, spacing)
+
+
+def _fill_tile_mask(
+    exclude_polys: List[np.ndarray],
+    include_polys: List[np.ndarray],
+    origin: Float2,
+    spacing: Float2,
+    shape: Tuple[int, int],
+    margin: float,
+) -> np.ndarray:
+    """Returns a boolean array of the grid cells in one tile that can be filled.
+
+    The keep-out region is exclude_polys minus include_polys grown by margin.
+    A cell is blocked when any part of the keep-out region overlaps it.
+
+    Args:
+        exclude_polys: polygons to avoid.
+        include_polys: polygons to fill even if they overlap exclude_polys.
+        origin: x, y of the lower left corner of the tile.
+        spacing: x, y size of each grid cell.
+        shape: number of rows and columns of the tile.
+        margin: distance to keep from the keep-out polygons.
+    """
+    rows, columns = shape
+    blocked = np.zeros(shape, dtype=bool)
+    if not exclude_polys:
+        return ~blocked
+
+    keepout = [gdstk.Polygon(points) for points in exclude_polys]
+    if include_polys:
+        keepout = gdstk.boolean(keepout, include_polys, "not")
+    if margin > 0:
+        keepout = gdstk.offset(
+            keepout, margin, join="round", tolerance=margin / 20, use_union=True
+        )
+    if not keepout:
+        return ~blocked
+
+    x0, y0 = origin
+    dx, dy = spacing
+    keepout = gdstk.slice(keepout, [x0, x0 + columns * dx], "x")[1]
+    pieces = []
+    for polygon in keepout:
+        (xmin, ymin), (xmax, ymax) = polygon.bounding_box()
+        if np.isclose(polygon.area(), (xmax - xmin) * (ymax - ymin)):
+            # the polygon fills its bounding box
+            i0, i1 = _cell_range(ymin, ymax, y0, dy, rows)
+            j0, j1 = _cell_range(xmin, xmax, x0, dx, columns)
+            blocked[i0:i1, j0:j1] = True
+        else:
+            pieces.append(polygon)
+    if pieces:
+        _block_columns(blocked, pieces, 0, columns, origin, spacing)
+    return ~blocked
+
+
+def _fill_mask(
+    exclude_polys: List[np.ndarray],
+    include_polys: List[np.ndarray],
+    bbox: Tuple[Float2, Float2],
+    spacing: Float2,
+    margin: float,
+    tile_size: Float2 = (500.0, 500.0),
+    n_workers: int = 1,
+) -> np.ndarray:
+    """Returns a boolean array of the grid cells inside bbox that can be filled.
+
+    The grid is split into tiles of about tile_size that are processed
+    independently and, for n_workers > 1, in parallel worker processes.
+    Each tile only receives the polygons that can reach it.
+    """
+    (xmin, ymin), (xmax, ymax) = np.asarray(bbox, dtype=float)
+    dx, dy = spacing
+    rows = max(int((ymax - ymin) / dy + 1e-9), 0)
+    columns = max(int((xmax - xmin) / dx + 1e-9), 0)
+    mask = np.zeros((rows, columns), dtype=bool)
+    if rows == 0 or columns == 0:
+        return mask
+
+    tile_rows = max(int(tile_size[1] / dy), 1)
+    tile_columns = max(int(tile_size[0] / dx), 1)
+    exclude_bboxes = _polygon_bboxes(exclude_polys)
+    include_bboxes = _polygon_bboxes(include_polys)
+
+    def _select(polygons, bboxes, x0, y0, x1, y1):
+        inside = (
+            (bboxes[:, 0] < x1 + margin)
+            & (bboxes[:, 2] > x0 - margin)
+            & (bboxes[:, 1] < y1 + margin)
+            & (bboxes[:, 3] > y0 - margin)
+        )
+        return [polygons[i] for i in np.flatnonzero(inside)]
+
+    tiles = []
+    jobs = []
+    for i in range(0, rows, tile_rows):
+        for j in range(0, columns, tile_columns):
+            shape = (min(tile_rows, rows - i), min(tile_columns, columns - j))
+            x0, y0 = xmin + j * dx, ymin + i * dy
+            x1, y1 = x0 + shape[1] * dx, y0 + shape[0] * dy
+            tiles.append((i, j, shape))
+            jobs.append(
+                (
+                    _select(exclude_polys, exclude_bboxes, x0, y0, x1, y1),
+                    _select(include_polys, include_bboxes, x0, y0, x1, y1),
+                    (x0, y0),
+                    (dx, dy),
+                    shape,
+                    margin,
+                )
+            )
+
+    if n_workers > 1 and len(jobs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_fill_tile_mask, *zip(*jobs)))
+    else:
+        results = [_fill_tile_mask(*job) for job in jobs]
+
+    for (i, j, shape), tile_mask in zip(tiles, results):
+        mask[i : i + shape[0], j : j + shape[1]] = tile_mask
+    return mask
+
+
+def _mask_to_rectangles(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Returns (row, column, rows, columns) rectangles covering the True cells.
+
+    Runs of True cells in each row are merged with identical runs
+    in the rows above, so a fully free area becomes a single rectangle.
+    """
+    rectangles = []
+    active: Dict[Tuple[int, int], int] = {}
+    padding = np.zeros((mask.shape[0], 1), dtype=np.int8)
+    edges = np.diff(np.hstack([padding, mask.astype(np.int8), padding]), axis=1)
+    for i, row in enumerate(edges):
+        starts = np.flatnonzero(row == 1).tolist()
+        stops = np.flatnonzero(row == -1).tolist()
+        runs = set(zip(starts, stops))
+        for run in list(active):
+            if run not in runs:
+                i0 = active.pop(run)
+                rectangles.append((i0, run[0], i - i0, run[1] - run[0]))
+        for run in runs:
+            active.setdefault(run, i)
+    for run, i0 in active.items():
+        rectangles.append((i0, run[0], mask.shape[0] - i0, run[1] - run[0]))
+    return sorted(rectangles)
+
+
+def _mask_to_runs(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Returns (row, column, 1, columns) rectangles for each run of True cells."""
+    padding = np.zeros((mask.shape[0], 1), dtype=np.int8)
+    edges = np.diff(np.hstack([padding, mask.astype(np.int8), padding]), axis=1)
+    return [
+        (i, start, 1, stop - start)
+        for i, row in enumerate(edges)
+        for start, stop in zip(np.flatnonzero(row == 1), np.flatnonzero(row == -1))
+    ]
+
+
+def _get_mask(
+    engine: str,
+    exclude_polys: List[np.ndarray],
+    include_polys: List[np.ndarray],
+    bbox: Tuple[Float2, Float2],
+    spacing: Float2,
+    margin: float,
+    tile_size: Float2,
+    n_workers: int,
+) -> np.ndarray:
+    """Returns the grid cells that can be filled with the raster or geometry engine."""
+    if engine == "raster":
+        return _raster_mask(exclude_polys, include_polys, bbox, spacing, margin)
+    if engine == "geometry":
+        return _fill_mask(
+            exclude_polys=exclude_polys,
+            include_polys=include_polys,
+            bbox=bbox,
+            spacing=spacing,
+            margin=margin,
+            tile_size=tile_size,
+            n_workers=n_workers,
+        )
+    raise ValueError(f"engine={engine!r} not in ('raster', 'geometry')")
+
+
+def _density_mask(
+    mask: np.ndarray,
+    existing_polys: Dict[Tuple[int, int], List[np.ndarray]],
+    fill_areas: Dict[Tuple[int, int], float],
+    bbox: Tuple[Float2, Float2],
+    spacing: Float2,
+    window: Float2,
+    target: float,
+) -> np.ndarray:
+    """Returns the subset of mask needed to reach a target density per window.
+
+    For each window and fill layer the existing density is measured and
+    the number of fill cells to reach the target is spread evenly over
+    the free cells of the window. The largest count over the layers is used.
+
+    Args:
+        mask: free grid cells.
+        existing_polys: polygons already in the component for each fill layer.
+        fill_areas: area of one fill cell for each fill layer.
+        bbox: lower left and upper right corner of the grid.
+        spacing: x, y size of each grid cell.
+        window: x, y size of the density window.
+        target: density to reach in each window (1 == fully filled).
+    """
+    (xmin, ymin), _ = np.asarray(bbox, dtype=float)
+    dx, dy = spacing
+    window_rows = max(int(window[1] / dy), 1)
+    window_columns = max(int(window[0] / dx), 1)
+    merged = {
+        layer: gdstk.boolean(polygons, [], "or") if polygons else []
+        for layer, polygons in existing_polys.items()
+    }
+    selected = np.zeros_like(mask)
+
+    for i in range(0, mask.shape[0], window_rows):
+        for j in range(0, mask.shape[1], window_columns):
+            free = mask[i : i + window_rows, j : j + window_columns]
+            indices = np.flatnonzero(free)
+            if len(indices) == 0:
+                continue
+            x0, y0 = xmin + j * dx, ymin + i * dy
+            x1, y1 = x0 + free.shape[1] * dx, y0 + free.shape[0] * dy
+            window_area = (x1 - x0) * (y1 - y0)
+            rectangle = gdstk.rectangle((x0, y0), (x1, y1))
+
+            needed = 0
+            for layer, area in fill_areas.items():
+                if area <= 0:
+                    continue
+                polygons = merged.get(layer) or []
+                existing = sum(
+                    p.area() for p in gdstk.boolean(polygons, rectangle, "and")
+                )
+                missing = target * window_area - existing
+                needed = max(needed, int(np.ceil(missing / area - 1e-9)))
+
+            needed = min(needed, len(indices))
+            if needed <= 0:
+                continue
+            picks = indices[
+                np.linspace(0, len(indices) - 1, needed).round().astype(int)
+            ]
+            window_selected = np.zeros(free.size, dtype=bool)
+            window_selected[picks] = True
+            selected[
+                i : i + window_rows, j : j + window_columns
+            ] = window_selected.reshape(free.shape)
+    return selected
+
+
+def _add_fill_arrays(
+    fill: Component,
+    fill_cell: Component,
+    mask: np.ndarray,
+    bbox: Tuple[Float2, Float2],
+    spacing: Float2,
+    merge_rows: bool = True,
+) -> None:
+    """Adds one CellArray of centered fill_cell per rectangle of free cells.
+
+    With merge_rows=False each run of free cells in a row is a separate CellArray.
+    """
+    (xmin, ymin), _ = np.asarray(bbox, dtype=float)
+    dx, dy = spacing
+    rectangles = _mask_to_rectangles(mask) if merge_rows else _mask_to_runs(mask)
+    for i, j, rows, columns in rectangles:
+        array = fill.add_array(fill_cell, columns=columns, rows=rows, spacing=spacing)
+        array.move((xmin + (j + 0.5) * dx, ymin + (i + 0.5) * dy))
+
+
+def _get_polygon_points(
+    component: ComponentOrReference, layers: Optional[LayerSpecs]
+) -> List[np.ndarray]:
+    """Returns the polygon points of a component, optionally on some layers only."""
+    polygons = component.get_polygons(by_spec=True, depth=None, as_array=False)
+    if layers:
+        layers = [_parse_layer(layer) for layer in _loop_over(layers)]
+        polygons = {key: polygons[key] for key in polygons if key in layers}
+    return [p.points for ps in polygons.values() for p in ps]
+
+
 @cell
 def fill_cell_rectangle(
     size: Float2 = (20.0, 20.0),
@@ -162,12 +508,25 @@ def fill_rectangle(
     fill_densities: Union[float, Floats] = (0.5, 0.25, 0.7),
     fill_inverted: Optional[List[float]] = None,
     bbox: Optional[object] = None,
+    density_target: Optional[float] = None,
+    density_window: Float2 = (100.0, 100.0),
+    engine: Literal["raster", "geometry"] = "raster",
+    tile_size: Float2 = (500.0, 500.0),
+    n_workers: int = 1,
 ) -> Component:
     """Returns rectangular fill pattern and fills all empty areas.
 
     In the input component and returns a component that contains just the fill
     Dummy fill keeps density constant during fabrication
 
+    Fill cells are placed on a grid with fill_size pitch starting at the
+    lower left corner of bbox. With the raster engine a cell is skipped when
+    its center is inside or on the outline of an avoid_layers polygon, or within
+    margin of such a cell, and each run of free cells in a row is a CellArray.
+    With the geometry engine a cell is skipped when the avoid_layers polygons
+    grown by margin overlap it, the grid is processed in tiles and the
+    free cells are merged into as few CellArray references as possible.
+
     Args:
         component: Component to fill.
         fill_layers: list of layers. fill pattern layers.
@@ -178,6 +537,14 @@ def fill_rectangle(
         fill_densities: defines the fill pattern density (1.0 == fully filled).
         fill_inverted: inverts the fill pattern.
         bbox: x, y limit the fill pattern to the area defined by this bounding box.
+        density_target: optional density for each fill layer in each density_window.
+            Only the fill cells needed to reach it are placed.
+            None fills all empty areas.
+        density_window: x, y size of the windows for density_target.
+        engine: "raster" or "geometry" to find the free grid cells.
+        tile_size: x, y size of the tiles that are processed independently
+            with the geometry engine.
+        n_workers: number of worker processes for the tiles.
 
     """
     D = component
@@ -211,48 +578,53 @@ def fill_rectangle(
     fill_cell = gf.get_component(fill_cell)
     F = Component()
 
-    avoid_layers = [_parse_layer(layer) for layer in _loop_over(avoid_layers)]
-    exclude_polys = D.get_polygons(by_spec=True, depth=None, as_array=False)
-
-    if avoid_layers:
-        exclude_polys = {
-            key: exclude_polys[key] for key in exclude_polys if key in avoid_layers
-        }
-
-    exclude_polys = [
-        polygon.points for polygons in exclude_polys.values() for polygon in polygons
-    ]
-
-    if include_layers is None:
-        include_polys = []
-    else:
-        include_layers = [_parse_layer(layer) for layer in _loop_over(include_layers)]
-        include_polys = D.get_polygons(by_spec=True, depth=None)
-        include_polys = {
-            key: include_polys[key] for key in include_polys if key in include_layers
-        }
-        include_polys = itertools.chain.from_iterable(include_polys.values())
+    exclude_polys = _get_polygon_points(D, avoid_layers)
+    include_polys = (
+        _get_polygon_points(D, include_layers) if include_layers is not None else []
+    )
 
     if bbox is None:
         bbox = D.bbox
 
-    raster = _rasterize_polygons(
-        polygons=exclude_polys, bounds=bbox, dx=fill_size[0], dy=fill_size[1]
+    mask = _get_mask(
+        engine,
+        exclude_polys=exclude_polys,
+        include_polys=include_polys,
+        bbox=bbox,
+        spacing=fill_size,
+        margin=margin,
+        tile_size=tile_size,
+        n_workers=n_workers,
     )
-    raster = raster & ~_rasterize_polygons(
-        polygons=include_polys, bounds=bbox, dx=fill_size[0], dy=fill_size[1]
+
+    if density_target is not None:
+        polygons = D.get_polygons(by_spec=True, depth=None)
+        fill_polygons = fill_cell.get_polygons(by_spec=True)
+        layers = [_parse_layer(layer) for layer in fill_layers]
+        fill_areas = {
+            layer: sum(
+                p.area() for p in gdstk.boolean(fill_polygons.get(layer, []), [], "or")
+            )
+            for layer in layers
+        }
+        mask = _density_mask(
+            mask=mask,
+            existing_polys={layer: polygons.get(layer, []) for layer in layers},
+            fill_areas=fill_areas,
+            bbox=bbox,
+            spacing=fill_size,
+            window=density_window,
+            target=density_target,
+        )
+
+    _add_fill_arrays(
+        F,
+        fill_cell,
+        mask,
+        bbox=bbox,
+        spacing=fill_size,
+        merge_rows=engine == "geometry",
     )
-    raster = _expand_raster(raster, distance=margin / np.array(fill_size))
-
-    for i in range(np.size(raster, 0)):
-        sub_rasters = [list(g) for k, g in itertools.groupby(raster[i])]
-        j = 0
-        for s in sub_rasters:
-            if s[0] == 0:
-                x, y = _raster_index_to_coords(i, j, bbox, fill_size[0], fill_size[1])
-                a = F.add_array(fill_cell, columns=len(s), rows=1, spacing=fill_size)
-                a.move((x, y))
-            j += len(s)
     return F
 
 
@@ -264,6 +636,9 @@ def fill_rectangle_custom(
     avoid_layers: Optional[LayerSpecs] = None,
     margin: float = 5.0,
     bbox: Optional[object] = None,
+    engine: Literal["raster", "geometry"] = "raster",
+    tile_size: Float2 = (500.0, 500.0),
+    n_workers: int = 1,
 ) -> Component:
     """Returns custom fill pattern to fill all empty areas.
 
@@ -277,6 +652,11 @@ def fill_rectangle_custom(
         avoid_layers: Layers to be avoided (not filled) in D.
         margin: Margin spacing around avoided areas.
         bbox: x, y limit the fill pattern to the area defined by this bounding box.
+        engine: "raster" or "geometry" to find the free grid cells,
+            see fill_rectangle.
+        tile_size: x, y size of the tiles that are processed independently
+            with the geometry engine.
+        n_workers: number of worker processes for the tiles.
     """
     D = component
     if bbox is None:
@@ -284,37 +664,24 @@ def fill_rectangle_custom(
 
     fill_cell = gf.get_component(fill_cell)
     F = Component()
-    avoid_layers = [_parse_layer(layer) for layer in _loop_over(avoid_layers)]
-    exclude_polys = D.get_polygons(by_spec=True, depth=None, as_array=False)
-
-    if avoid_layers:
-        exclude_polys = {
-            key: exclude_polys[key] for key in exclude_polys if key in avoid_layers
-        }
-
-    exclude_polys = [
-        polygon.points for polygons in exclude_polys.values() for polygon in polygons
-    ]
-
-    include_polys = []
-
-    raster = _rasterize_polygons(
-        polygons=exclude_polys, bounds=bbox, dx=spacing[0], dy=spacing[1]
+    mask = _get_mask(
+        engine,
+        exclude_polys=_get_polygon_points(D, avoid_layers),
+        include_polys=[],
+        bbox=bbox,
+        spacing=spacing,
+        margin=margin,
+        tile_size=tile_size,
+        n_workers=n_workers,
     )
-    raster = raster & ~_rasterize_polygons(
-        polygons=include_polys, bounds=bbox, dx=spacing[0], dy=spacing[1]
+    _add_fill_arrays(
+        F,
+        fill_cell,
+        mask,
+        bbox=bbox,
+        spacing=spacing,
+        merge_rows=engine == "geometry",
     )
-    raster = _expand_raster(raster, distance=margin / np.array(spacing))
-
-    for i in range(np.size(raster, 0)):
-        sub_rasters = [list(g) for k, g in itertools.groupby(raster[i])]
-        j = 0
-        for s in sub_rasters:
-            if s[0] == 0:
-                x, y = _raster_index_to_coords(i, j, bbox, spacing[0], spacing[1])
-                a = F.add_array(fill_cell, columns=len(s), rows=1, spacing=spacing)
-                a.move((x, y))
-            j += len(s)
     return F
 
 
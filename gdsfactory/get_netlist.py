@@ -87,6 +87,15 @@ def get_instance_name_from_label(
     return text
 
 
+def _copy_json(value: Any) -> Any:
+    """Returns a copy of nested dicts, lists and tuples (faster than deepcopy)."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_copy_json(v) for v in value)
+    return value
+
+
 def get_netlist_yaml(
     component: Component,
     full_settings: bool = False,
@@ -120,7 +129,7 @@ def get_netlist(
 
     1. first tries to connect everything assuming perfect connections at each port.
     2. Then gathers ports which did not perfectly connect to anything and tries \
-            to find imperfect connections, by grouping ports on a coarse grid.
+            to find imperfect connections, by grouping ports closer than tolerance.
 
     warnings collected during netlisting are reported back into the netlist.
     These include warnings about mismatched port widths, orientations, shear angles, excessive offsets, etc.
@@ -132,15 +141,15 @@ def get_netlist(
     This allows us to use different logic to determine i.e.
     if an electrical port is properly connected vs an optical port.
     In this function, the core logic is the same, but we employ extra validation for optical ports.
-    snap_to_grid() allows a value of 0, which will return the original value,
-    is more efficient when the value is 1, and will throw a more descriptive error when the value is <0
-    the default value of tolerance is 5nm because it should allow better performance with the two-grid-sweep approach.
+    Ports are matched with a KD-tree, so two ports closer than tolerance connect
+    even if they fall on different sides of a grid line.
+    A tolerance of 0 only connects ports with the same center.
 
 
     Args:
         component: to extract netlist.
         full_settings: True returns all, false changed settings.
-        tolerance: tolerance in nm to consider two ports connected.
+        tolerance: ports closer than tolerance (nm) are connected.
         exclude_port_types: optional list of port types to exclude from netlisting.
         get_instance_name: function to get instance name.
         allow_multiple: False to raise an error if more than two ports share the same connection.
@@ -169,6 +178,7 @@ def get_netlist(
     top_ports_list = set()
 
     references = _get_references_to_netlist(component)
+    component_to_instance: Dict[int, Dict[str, Any]] = {}
 
     for reference in references:
         c = reference.parent
@@ -190,19 +200,23 @@ def get_netlist(
         else:
             is_array = False
 
-        instance = {}
+        # references to the same component share the serialized settings
+        if id(c) not in component_to_instance:
+            instance = {}
 
-        if c.info:
-            instance.update(component=c.name, info=clean_value_json(c.info))
+            if c.info:
+                instance.update(component=c.name, info=clean_value_json(c.info))
 
-        # Prefer name from settings over c.name
-        if c.settings:
-            settings = c.settings.full if full_settings else c.settings.changed
+            # Prefer name from settings over c.name
+            if c.settings:
+                settings = c.settings.full if full_settings else c.settings.changed
 
-            instance.update(
-                component=getattr(c.settings, "function_name", c.name),
-                settings=clean_value_json(settings),
-            )
+                instance.update(
+                    component=getattr(c.settings, "function_name", c.name),
+                    settings=clean_value_json(settings),
+                )
+            component_to_instance[id(c)] = instance
+        instance = _copy_json(component_to_instance[id(c)])
 
         instances[reference_name] = instance
         placements[reference_name] = {
@@ -238,10 +252,6 @@ def get_netlist(
         else:
             # lower level ports
             for port in reference.ports.values():
-                reference_name = get_instance_name(
-                    component,
-                    reference,
-                )
                 src = f"{reference_name},{port.name}"
                 name2port[src] = port
                 ports_by_type[port.port_type].append(src)
@@ -314,6 +324,36 @@ def extract_connections(
     )
 
 
+def _group_ports(centers: np.ndarray, tolerance: float) -> List[np.ndarray]:
+    """Returns groups of port indices closer than tolerance (nm) to each other.
+
+    Groups are connected components of the "closer than tolerance" graph,
+    sorted by their first index. Indices in each group are sorted.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+    from scipy.spatial import cKDTree
+
+    n = len(centers)
+    if n == 0:
+        return []
+
+    # ports closer than tolerance connect, tolerance = 0 only matches equal centers
+    radius = max(tolerance * 1e-3 - 1e-9, 0)
+    pairs = cKDTree(centers).query_pairs(r=radius, output_type="ndarray")
+    graph = coo_matrix(
+        (np.ones(len(pairs), dtype=bool), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    _, first_index = np.unique(labels, return_index=True)
+    rank = np.empty(len(first_index), dtype=int)
+    rank[np.argsort(first_index)] = np.arange(len(first_index))
+    order = np.lexsort((np.arange(n), rank[labels]))
+    splits = np.flatnonzero(np.diff(rank[labels][order])) + 1
+    return np.split(order, splits)
+
+
 def _extract_connections_two_sweep(
     port_names: List[str],
     ports: Dict[str, Port],
@@ -329,41 +369,40 @@ def _extract_connections_two_sweep(
             port_type, []
         )
 
-    unconnected_port_names = list(port_names)
     if tolerance < 0:
         raise ValueError(f"Cannot have a tolerance less than zero. Got {tolerance}")
     elif tolerance <= 1:
         # if tolerance is 0 or 1, do only one sweep with that tolerance
-        grids = [("fine", tolerance)]
+        sweeps = [("fine", tolerance)]
     else:
         # default: do one fine sweep with a 1nm tolerance, then a coarse sweep
         # with the given tolerance to connect any remaining ports which are not
         # perfectly aligned
-        grids = [("fine", 1), ("coarse", tolerance)]
+        sweeps = [("fine", 1), ("coarse", tolerance)]
 
+    port_names = list(port_names)
+    centers = np.array(
+        [ports[port_name].center for port_name in port_names], dtype=float
+    ).reshape(-1, 2)
+    unconnected = np.arange(len(port_names))
     connections = []
 
-    for _grid_name, grid_size in grids:
-        by_xy = defaultdict(list)
+    for _sweep_name, sweep_tolerance in sweeps:
+        still_unconnected = []
 
-        for port_name in unconnected_port_names:
-            port = ports[port_name]
-            by_xy[tuple(snap_to_grid(port.center, nm=grid_size))].append(port_name)
+        for group in _group_ports(centers[unconnected], sweep_tolerance):
+            group = unconnected[group]
+            ports_at_xy = [port_names[i] for i in group]
 
-        unconnected_port_names = []
-
-        for xy, ports_at_xy in by_xy.items():
             if len(ports_at_xy) == 1:
-                unconnected_port_names.append(ports_at_xy[0])
+                still_unconnected.append(group[0])
 
             elif len(ports_at_xy) == 2:
-                port1 = ports[ports_at_xy[0]]
-                port2 = ports[ports_at_xy[1]]
-                connection_validator(port1, port2, ports_at_xy, warnings)
                 connections.append(ports_at_xy)
 
             elif not allow_multiple:
                 warnings["multiple_connections"].append(ports_at_xy)
+                xy = tuple(centers[group[0]])
                 raise ValueError(f"Found multiple connections at {xy}:{ports_at_xy}")
 
             else:
@@ -371,13 +410,15 @@ def _extract_connections_two_sweep(
                 for portindex1, portindex2 in zip(
                     range(-1, num_ports - 1), range(num_ports)
                 ):
-                    port1 = ports[ports_at_xy[portindex1]]
-                    port2 = ports[ports_at_xy[portindex2]]
-                    connection_validator(port1, port2, ports_at_xy, warnings)
                     connections.append(
                         [ports_at_xy[portindex1], ports_at_xy[portindex2]]
                     )
 
+        unconnected = np.array(still_unconnected, dtype=int)
+
+    _validate_connections(connections, ports, connection_validator, warnings)
+    unconnected_port_names = [port_names[i] for i in unconnected]
+
     if unconnected_port_names:
         unconnected_non_top_level = [
             pname for pname in unconnected_port_names if ("," in pname)
@@ -405,6 +446,65 @@ def _extract_connections_two_sweep(
     return connections, dict(warnings)
 
 
+def _validate_connections(
+    connections: List[List[str]],
+    ports: Dict[str, Port],
+    connection_validator: Callable,
+    warnings: Dict[str, List],
+) -> None:
+    """Runs connection_validator on each pair of connected ports.
+
+    validate_optical_connection only runs on the pairs that a vectorized
+    check flags, as most connections are perfect.
+    """
+    if connection_validator is _null_validator:
+        return
+    if connection_validator is validate_optical_connection:
+        flagged = _flag_optical_connections(connections, ports)
+        connections = [c for c, flag in zip(connections, flagged) if flag]
+
+    for port_names in connections:
+        port1 = ports[port_names[0]]
+        port2 = ports[port_names[1]]
+        connection_validator(port1, port2, port_names, warnings)
+
+
+def _flag_optical_connections(
+    connections: List[List[str]],
+    ports: Dict[str, Port],
+    angle_tolerance: float = 0.01,
+    offset_tolerance: float = 0.001,
+    width_tolerance: float = 0.001,
+) -> np.ndarray:
+    """Returns True for the connections that validate_optical_connection may warn about."""
+    if not connections:
+        return np.zeros(0, dtype=bool)
+
+    pairs = [(ports[name1], ports[name2]) for name1, name2 in connections]
+    is_top_level = np.array(
+        [("," not in name1) or ("," not in name2) for name1, name2 in connections]
+    )
+    widths = np.array([(p1.width, p2.width) for p1, p2 in pairs], dtype=float)
+    shear_angles = np.array(
+        [(p1.shear_angle or 0, p2.shear_angle or 0) for p1, p2 in pairs], dtype=float
+    )
+    orientations = np.array(
+        [(p1.orientation, p2.orientation) for p1, p2 in pairs], dtype=float
+    )
+    centers = np.array([(p1.center, p2.center) for p1, p2 in pairs], dtype=float)
+
+    angle = np.mod(orientations[:, 1] - orientations[:, 0] + 180, 360) - 180
+    angle_misalignment = np.abs(np.abs(angle) - 180)
+    offset = np.sqrt(np.sum(np.square(centers[:, 1] - centers[:, 0]), axis=1))
+    return (
+        is_top_level
+        | (np.abs(widths[:, 0] - widths[:, 1]) > width_tolerance)
+        | np.any(shear_angles != 0, axis=1)
+        | ~(angle_misalignment <= angle_tolerance)
+        | (offset > offset_tolerance)
+    )
+
+
 def _make_warning(ports: List[str], values: Any, message: str) -> Dict[str, Any]:
     w = {
         "ports": ports,
@@ -556,7 +656,7 @@ def get_netlist_recursive(
 
     Keyword Args:
         full_settings: True returns all, false changed settings.
-        tolerance: tolerance in nm to consider two ports connected.
+        tolerance: ports closer than tolerance (nm) are connected.
         exclude_port_types: optional list of port types to exclude from netlisting.
         get_instance_name: function to get instance name.
 
@@ -13,6 +13,7 @@ import warnings
 from collections.abc import Iterable
 from typing import Callable, Optional, Union
 
+import gdstk
 import numpy as np
 from numpy import mod, pi
 
@@ -254,27 +255,10 @@ class Path(_GeometryHelper):
     ):
         """Creates a offset curve (but does not account for cusps etc)\
         by computing the centerpoint offset of the supplied x and y points."""
-        new_points = np.array(points, dtype=np.float64)
-        dx = np.diff(points[:, 0])
-        dy = np.diff(points[:, 1])
-        theta = np.arctan2(dy, dx)
-        theta = np.concatenate([theta[:1], theta, theta[-1:]])
-        theta_mid = (np.pi + theta[1:] + theta[:-1]) / 2  # Mean angle between segments
-        dtheta_int = np.pi + theta[:-1] - theta[1:]  # Internal angle between segments
-        offset_distance = offset_distance / np.sin(dtheta_int / 2)
-        new_points[:, 0] -= offset_distance * np.cos(theta_mid)
-        new_points[:, 1] -= offset_distance * np.sin(theta_mid)
-        if start_angle is not None:
-            new_points[0, :] = points[0, :] + (
-                np.sin(start_angle * np.pi / 180) * offset_distance[0],
-                -np.cos(start_angle * np.pi / 180) * offset_distance[0],
-            )
-        if end_angle is not None:
-            new_points[-1, :] = points[-1, :] + (
-                np.sin(end_angle * np.pi / 180) * offset_distance[-1],
-                -np.cos(end_angle * np.pi / 180) * offset_distance[-1],
-            )
-        return new_points
+        offset_distance = np.broadcast_to(offset_distance, (1, len(points)))
+        return _centerpoint_offset_curves(
+            points, offset_distance, start_angle, end_angle
+        )[0]
 
     def _parametric_offset_curve(self, points, offset_distance, start_angle, end_angle):
         """Creates a parametric offset (does not account for cusps etc) \
@@ -407,6 +391,7 @@ class Path(_GeometryHelper):
         simplify: Optional[float] = None,
         shear_angle_start: Optional[float] = None,
         shear_angle_end: Optional[float] = None,
+        flexpath: bool = False,
     ) -> Component:
         """Returns Component by extruding a Path with a CrossSection.
 
@@ -424,6 +409,7 @@ class Path(_GeometryHelper):
               polygon by more than the value listed here will be removed.
             shear_angle_start: an optional angle to shear the starting face by (in degrees).
             shear_angle_end: an optional angle to shear the ending face by (in degrees).
+            flexpath: adds sections with constant width as gdstk.FlexPath.
 
         .. plot::
             :include-source:
@@ -434,7 +420,7 @@ class Path(_GeometryHelper):
             c = p.extrude(layer=(1, 0), width=0.5)
             c.plot()
         """
-        return extrude(
+        return (extrude_flexpath if flexpath else extrude)(
             p=self,
             cross_section=cross_section,
             layer=layer,
@@ -458,6 +444,80 @@ class Path(_GeometryHelper):
 PathFactory = Callable[..., Path]
 
 
+def _centerpoint_offset_curves(
+    points: np.ndarray,
+    offset_distances: np.ndarray,
+    start_angle: Optional[float],
+    end_angle: Optional[float],
+) -> np.ndarray:
+    """Returns the centerpoint offset curves of points for many offsets at once.
+
+    The segment angles are computed once and broadcast over all the offsets.
+
+    Args:
+        points: (N, 2) path points.
+        offset_distances: (M, N) offset of each curve at each point.
+        start_angle: in degrees. Sets the direction of the first offset point.
+        end_angle: in degrees. Sets the direction of the last offset point.
+
+    Returns:
+        (M, N, 2) offset curves.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    dx = np.diff(points[:, 0])
+    dy = np.diff(points[:, 1])
+    theta = np.arctan2(dy, dx)
+    theta = np.concatenate([theta[:1], theta, theta[-1:]])
+    theta_mid = (np.pi + theta[1:] + theta[:-1]) / 2  # Mean angle between segments
+    dtheta_int = np.pi + theta[:-1] - theta[1:]  # Internal angle between segments
+    offset_distances = offset_distances / np.sin(dtheta_int / 2)
+
+    new_points = np.empty(offset_distances.shape + (2,))
+    new_points[..., 0] = points[:, 0] - offset_distances * np.cos(theta_mid)
+    new_points[..., 1] = points[:, 1] - offset_distances * np.sin(theta_mid)
+    if start_angle is not None:
+        new_points[:, 0, 0] = (
+            points[0, 0] + np.sin(start_angle * np.pi / 180) * offset_distances[:, 0]
+        )
+        new_points[:, 0, 1] = (
+            points[0, 1] + -np.cos(start_angle * np.pi / 180) * offset_distances[:, 0]
+        )
+    if end_angle is not None:
+        new_points[:, -1, 0] = (
+            points[-1, 0] + np.sin(end_angle * np.pi / 180) * offset_distances[:, -1]
+        )
+        new_points[:, -1, 1] = (
+            points[-1, 1] + -np.cos(end_angle * np.pi / 180) * offset_distances[:, -1]
+        )
+    return new_points
+
+
+def _flexpath_points(p: Path) -> np.ndarray:
+    """Returns the Path points for a gdstk.FlexPath with the Path end angles.
+
+    FlexPath faces are normal to the first and last segments, so the end
+    segments are split and their outer halves follow the end angles.
+    """
+    points = p.points
+    start = np.array(
+        [np.cos(p.start_angle * np.pi / 180), np.sin(p.start_angle * np.pi / 180)]
+    )
+    end = np.array(
+        [np.cos(p.end_angle * np.pi / 180), np.sin(p.end_angle * np.pi / 180)]
+    )
+    first = points[1] - points[0]
+    last = points[-1] - points[-2]
+    first_length = np.hypot(*first)
+    last_length = np.hypot(*last)
+    if abs(np.cross(start, first)) > 1e-9 * first_length:
+        midpoint = points[0] + start * first_length / 2
+        points = np.vstack([points[:1], midpoint, points[1:]])
+    if abs(np.cross(end, last)) > 1e-9 * last_length:
+        midpoint = points[-1] - end * last_length / 2
+        points = np.vstack([points[:-1], midpoint, points[-1:]])
+    return points
+
+
 def _sinusoidal_transition(y1, y2):
     dy = y2 - y1
 
@@ -732,6 +792,74 @@ def extrude(
         shear_angle_start: an optional angle to shear the starting face by (in degrees).
         shear_angle_end: an optional angle to shear the ending face by (in degrees).
     """
+    return _extrude(
+        p=p,
+        cross_section=cross_section,
+        layer=layer,
+        width=width,
+        widths=widths,
+        simplify=simplify,
+        shear_angle_start=shear_angle_start,
+        shear_angle_end=shear_angle_end,
+    )
+
+
+@cell
+def extrude_flexpath(
+    p: Path,
+    cross_section: Optional[CrossSectionSpec] = None,
+    layer: Optional[LayerSpec] = None,
+    width: Optional[float] = None,
+    widths: Optional[Float2] = None,
+    simplify: Optional[float] = None,
+    shear_angle_start: Optional[float] = None,
+    shear_angle_end: Optional[float] = None,
+) -> Component:
+    """Returns Component extruding a Path with sections as gdstk.FlexPath.
+
+    Sections with constant width are added as one gdstk.FlexPath per centerline
+    instead of polygons, which is faster for long paths with many sections.
+    Sections with simplify, shear angles or snap_to_grid coarser than
+    the GDS precision are added as polygons like in extrude.
+
+    Args:
+        p: a path is a list of points (arc, straight, euler).
+        cross_section: to extrude.
+        layer: optional layer to extrude.
+        width: optional width to extrude.
+        widths: tuple of starting and end width.
+        simplify: Tolerance value for the simplification algorithm.
+        shear_angle_start: an optional angle to shear the starting face by (in degrees).
+        shear_angle_end: an optional angle to shear the ending face by (in degrees).
+    """
+    return _extrude(
+        p=p,
+        cross_section=cross_section,
+        layer=layer,
+        width=width,
+        widths=widths,
+        simplify=simplify,
+        shear_angle_start=shear_angle_start,
+        shear_angle_end=shear_angle_end,
+        flexpath=True,
+    )
+
+
+def _extrude(
+    p: Path,
+    cross_section: Optional[CrossSectionSpec] = None,
+    layer: Optional[LayerSpec] = None,
+    width: Optional[float] = None,
+    widths: Optional[Float2] = None,
+    simplify: Optional[float] = None,
+    shear_angle_start: Optional[float] = None,
+    shear_angle_end: Optional[float] = None,
+    flexpath: bool = False,
+) -> Component:
+    """Returns Component extruding a Path with a cross_section.
+
+    The sections that share a centerline are offset in one vectorized pass.
+    """
     from gdsfactory.pdk import (
         get_active_pdk,
         get_cross_section,
@@ -755,7 +883,6 @@ def extrude(
             width=_linear_transition(widths[0], widths[1]), layer=layer
         )
 
-    xsection_points = []
     c = Component()
 
     x = get_cross_section(cross_section)
@@ -792,26 +919,22 @@ def extrude(
                     )
                 ]
 
-    for section in sections:
-        p_sec = p.copy()
-        width = section.width
-        offset = section.offset
-        layer = get_layer(section.layer)
-        port_names = section.port_names
-        port_types = section.port_types
-        hidden = section.hidden
+    if isinstance(simplify, bool):
+        raise ValueError("simplify argument must be a number (e.g. 1e-3) or None")
 
-        if isinstance(width, (int, float)) and isinstance(offset, (int, float)):
-            xsection_points.append([width, offset])
-        if isinstance(layer, int):
-            layer = (layer, 0)
-        if (
-            isinstance(layer, Iterable)
-            and len(layer) == 2
-            and isinstance(layer[0], int)
-            and isinstance(layer[1], int)
-        ):
-            xsection_points.append([layer[0], layer[1]])
+    pdk = get_active_pdk()
+    warn_off_grid_ports = pdk.warn_off_grid_ports
+    # polygons are written to GDS on this grid so FlexPaths need no extra snapping
+    gds_grid_nm = round(
+        1e3 * pdk.gds_write_settings.precision / pdk.gds_write_settings.unit
+    )
+
+    # sections share the path centerline unless they have insets or a callable offset
+    centerlines = {}
+    extruded_sections = []
+    edges = []
+    for section in sections:
+        p_sec = p
 
         if section.insets and section.insets != (0, 0):
             p_pts = p_sec.points
@@ -836,42 +959,67 @@ def extrude(
                 [new_start_point, *p_pts[new_start_idx:new_stop_idx], new_stop_point]
             )
 
-        if callable(offset):
-            p_sec.offset(offset)
-            points = p_sec.points
-            start_angle = p_sec.start_angle
-            end_angle = p_sec.end_angle
-            offset = 0
-        else:
-            points = p_sec.points
-            start_angle = p_sec.start_angle
-            end_angle = p_sec.end_angle
+        if callable(section.offset):
+            p_sec = p_sec.copy().offset(section.offset)
 
-        if callable(width):
-            # Compute lengths
-            dx = np.diff(p_sec.points[:, 0])
-            dy = np.diff(p_sec.points[:, 1])
+        centerlines.setdefault(id(p_sec), (p_sec, {}))[1][len(edges)] = section
+        extruded_sections.append(section)
+        edges.append(None)
+
+    for p_sec, centerline_sections in centerlines.values():
+        points = p_sec.points
+        length = p_sec.length()
+        widths = [section.width for section in centerline_sections.values()]
+        if any(callable(width) for width in widths):
+            dx = np.diff(points[:, 0])
+            dy = np.diff(points[:, 1])
             lengths = np.cumsum(np.sqrt(dx**2 + dy**2))
             lengths = np.concatenate([[0], lengths])
-            width = width(lengths / lengths[-1])
-        dy = offset + width / 2
-        # _points = _shear_face(points, dy, shear_angle_start, shear_angle_end)
-
-        points1 = p_sec._centerpoint_offset_curve(
-            points,
-            offset_distance=dy,
-            start_angle=start_angle,
-            end_angle=end_angle,
-        )
-        dy = offset - width / 2
-        # _points = _shear_face(points, dy, shear_angle_start, shear_angle_end)
-
-        points2 = p_sec._centerpoint_offset_curve(
-            points,
-            offset_distance=dy,
-            start_angle=start_angle,
-            end_angle=end_angle,
+            t = lengths / lengths[-1]
+            widths = [width(t) if callable(width) else width for width in widths]
+        offsets = [
+            0 if callable(section.offset) else section.offset
+            for section in centerline_sections.values()
+        ]
+
+        # both edges of all the sections are offset in one vectorized pass
+        offset_distances = np.empty((2 * len(widths), len(points)))
+        offset_distances[::2] = [
+            np.broadcast_to(offset + width / 2, len(points))
+            for width, offset in zip(widths, offsets)
+        ]
+        offset_distances[1::2] = [
+            np.broadcast_to(offset - width / 2, len(points))
+            for width, offset in zip(widths, offsets)
+        ]
+        curves = _centerpoint_offset_curves(
+            points, offset_distances, p_sec.start_angle, p_sec.end_angle
         )
+        for i, index in enumerate(centerline_sections):
+            edges[index] = (
+                p_sec,
+                length,
+                widths[i],
+                offsets[i],
+                curves[2 * i : 2 * i + 2],
+            )
+
+    flexpath_sections = {}
+    for section, (p_sec, length, width, offset, (points1, points2)) in zip(
+        extruded_sections, edges
+    ):
+        points = p_sec.points
+        start_angle = p_sec.start_angle
+        end_angle = p_sec.end_angle
+        layer = get_layer(section.layer)
+        port_names = section.port_names
+        port_types = section.port_types
+        hidden = section.hidden
+        with_simplify = section.simplify or simplify
+
+        if isinstance(layer, int):
+            layer = (layer, 0)
+
         if shear_angle_start or shear_angle_end:
             _face_angle_start = (
                 start_angle + shear_angle_start - 90 if shear_angle_start else None
@@ -894,38 +1042,42 @@ def extrude(
                 path=points2,
             )
 
-        # angle = start_angle + shear_angle_start + 90
-        # points2 = _cut_path_with_ray(points[0], angle, points2, start=True)
         # Simplify lines using the Ramer–Douglas–Peucker algorithm
-        if isinstance(simplify, bool):
-            raise ValueError("simplify argument must be a number (e.g. 1e-3) or None")
-
-        with_simplify = section.simplify or simplify
-
         if with_simplify:
             points1 = _simplify(points1, tolerance=with_simplify)
             points2 = _simplify(points2, tolerance=with_simplify)
 
         if x.snap_to_grid:
-            points = snap.snap_to_grid(points, snap_to_grid_nm)
             points1 = snap.snap_to_grid(points1, snap_to_grid_nm)
             points2 = snap.snap_to_grid(points2, snap_to_grid_nm)
 
-        # Join points together
-        points_poly = np.concatenate([points1, points2[::-1, :]])
-
         layers = layer if hidden else [layer, layer]
-        if not hidden and p_sec.length() > 1e-3:
-            c.add_polygon(points_poly, layer=layer)
+        if hidden or length <= 1e-3:
+            pass
+        elif (
+            flexpath
+            and np.isscalar(width)
+            and not (shear_angle_start or shear_angle_end)
+            and not with_simplify
+            and (not x.snap_to_grid or snap_to_grid_nm <= gds_grid_nm)
+        ):
+            flexpath_sections.setdefault(id(p_sec), (p_sec, []))[1].append(
+                (width, offset, layer)
+            )
+        else:
+            # Join points together
+            c.add_polygon(np.concatenate([points1, points2[::-1, :]]), layer=layer)
 
-        pdk = get_active_pdk()
-        warn_off_grid_ports = pdk.warn_off_grid_ports
+        if x.snap_to_grid:
+            center_points = snap.snap_to_grid(points, snap_to_grid_nm)
+        else:
+            center_points = points
 
         # Add port_names if they were specified
         if port_names[0] is not None:
             port_width = width if np.isscalar(width) else width[0]
             port_orientation = (p_sec.start_angle + 180) % 360
-            center = points[0]
+            center = center_points[0]
             face = [points1[0], points2[0]]
             face = [_rotated_delta(point, center, port_orientation) for point in face]
 
@@ -952,7 +1104,7 @@ def extrude(
         if port_names[1] is not None:
             port_width = width if np.isscalar(width) else width[-1]
             port_orientation = (p_sec.end_angle) % 360
-            center = points[-1]
+            center = center_points[-1]
             face = [points1[-1], points2[-1]]
             face = [_rotated_delta(point, center, port_orientation) for point in face]
 
@@ -977,6 +1129,21 @@ def extrude(
             )
             port2.info["face"] = face
 
+    # gdstk offsets are positive to the left of the path
+    for p_sec, flexpath_section in flexpath_sections.values():
+        widths, offsets, layers = zip(*flexpath_section)
+        c._add_polygons(
+            gdstk.FlexPath(
+                _flexpath_points(p_sec),
+                width=list(widths),
+                offset=[-offset for offset in offsets],
+                joins="natural",
+                ends="flush",
+                layer=[layer[0] for layer in layers],
+                datatype=[layer[1] for layer in layers],
+            )
+        )
+
     c.info["length"] = float(np.round(p.length(), 3))
 
     if isinstance(x, CrossSection):
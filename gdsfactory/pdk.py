@@ -14,6 +14,7 @@ from pydantic import BaseModel, Field, validator
 
 from gdsfactory.config import PATH, logger
 from gdsfactory.containers import containers as containers_default
+from gdsfactory.cross_section import _copy_shared
 from gdsfactory.events import Event
 from gdsfactory.materials import MaterialSpec
 from gdsfactory.materials import materials_index as materials_index_default
@@ -141,6 +142,10 @@ class CellDecoratorSettings(BaseModel):
         default=MAX_NAME_LENGTH,
         description="Maximum length of the cell name.",
     )
+    disk_cache_dirpath: Optional[pathlib.Path] = Field(
+        default=None,
+        description="If set, loads and stores cells in this directory across python sessions.",
+    )
 
 
 class Pdk(BaseModel):
@@ -150,6 +155,7 @@ class Pdk(BaseModel):
 
     Parameters:
         name: PDK name.
+        version: PDK version, invalidates the cells stored in the disk cache.
         cross_sections: dict of cross_sections factories.
         cells: dict of parametric cells that return Components.
         symbols: dict of symbols names to functions.
@@ -184,6 +190,7 @@ class Pdk(BaseModel):
     """
 
     name: str
+    version: str = "0.0.0"
     cross_sections: Dict[str, CrossSectionFactory] = Field(default_factory=dict)
     cells: Dict[str, ComponentFactory] = Field(default_factory=dict)
     symbols: Dict[str, ComponentFactory] = Field(default_factory=dict)
@@ -486,9 +493,9 @@ class Pdk(BaseModel):
     ) -> Union[CrossSection, Transition]:
         """Returns cross_section from a cross_section spec."""
         if isinstance(cross_section, CrossSection):
-            return cross_section.copy(**kwargs)
+            return _copy_shared(cross_section, **kwargs)
         elif isinstance(cross_section, Transition):
-            return cross_section.copy(**kwargs)
+            return _copy_shared(cross_section, **kwargs)
         elif callable(cross_section):
             return cross_section(**kwargs)
         elif isinstance(cross_section, str):
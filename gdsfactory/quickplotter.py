@@ -6,13 +6,19 @@ based on phidl.quickplotter.
 from __future__ import annotations
 
 import sys
-from typing import Optional
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
 
 import numpy as np
 
 from gdsfactory.component import Component
-from gdsfactory.component_layout import Polygon, _rotate_points
+from gdsfactory.component_layout import (
+    Polygon,
+    _rotate_points,
+    get_polygons_buffers,
+)
 from gdsfactory.component_reference import ComponentReference
+from gdsfactory.typings import Layer
 
 _SUBPORT_RGB = (0, 120, 120)
 _PORT_RGB = (190, 0, 0)
@@ -61,6 +67,7 @@ _quickplot_options = {
     "zoom_factor": 1.4,
     "interactive_zoom": None,
     "fontsize": 14,
+    "min_pixels": 2,
 }
 
 
@@ -136,6 +143,7 @@ def set_quickplot_options(
     zoom_factor: Optional[float] = None,
     interactive_zoom: Optional[bool] = None,
     fontsize: Optional[int] = None,
+    min_pixels: Optional[float] = None,
 ) -> None:
     """Sets plotting options for quickplot().
 
@@ -151,6 +159,8 @@ def set_quickplot_options(
             mousewheel/trackpad.
         interactive_zoom: Enables using mousewheel/trackpad to zoom.
         fontsize: for labels.
+        min_pixels: instances smaller than this number of pixels are drawn as
+            their bounding box. 0 draws all the polygons.
 
     """
     if show_ports is not None:
@@ -169,6 +179,8 @@ def set_quickplot_options(
         _quickplot_options["interactive_zoom"] = interactive_zoom
     if fontsize is not None:
         _quickplot_options["fontsize"] = fontsize
+    if min_pixels is not None:
+        _quickplot_options["min_pixels"] = min_pixels
 
 
 def quickplot(items, **kwargs):  # noqa: C901
@@ -191,7 +203,11 @@ def quickplot(items, **kwargs):  # noqa: C901
             mousewheel/trackpad.
         interactive_zoom: Enables using mousewheel/trackpad to zoom.
         fontsize: for labels.
+        min_pixels: instances smaller than this number of pixels are drawn as
+            their bounding box. 0 draws all the polygons.
 
+    Components are drawn with one path per layer and only the visible window
+    is drawn again when zooming.
 
     Examples
     --------
@@ -238,27 +254,24 @@ def quickplot(items, **kwargs):  # noqa: C901
     # Iterate through each Component/ComponentReference/Polygon
     if not isinstance(items, list):
         items = [items]
-    LAYER_VIEWS = get_layer_views()
-    all_lv_tuples = LAYER_VIEWS.get_layer_tuples()
+    layer_views = {
+        layer_view.layer: layer_view
+        for layer_view in get_layer_views().get_layer_views().values()
+    }
+    lod_plots = []
     for item in items:
         if isinstance(item, (Component, ComponentReference)):
-            polygons_spec = item.get_polygons(by_spec=True, depth=None)
-            for key in sorted(polygons_spec):
-                polygons = polygons_spec[key]
-                layer_view = (
-                    LAYER_VIEWS.get_from_tuple(key)
-                    if key in all_lv_tuples
-                    else LayerView(layer=key)
-                )
-                colors = layer_view.get_color_dict()
-                new_bbox = _draw_polygons(
-                    polygons,
-                    ax,
-                    facecolor=colors["fill_color"],
-                    edgecolor=colors["frame_color"],
-                    alpha=layer_view.get_alpha(),
+            gdstk_item = item._cell if isinstance(item, Component) else item._reference
+            item_bbox = gdstk_item.bounding_box()
+            if item_bbox is not None:
+                lod_plots.append(
+                    _LodPlot(
+                        ax,
+                        LodRenderer(item, min_pixels=quickplot_options["min_pixels"]),
+                        layer_views,
+                    )
                 )
-                bbox = _update_bbox(bbox, new_bbox)
+                bbox = _update_bbox(bbox, list(np.ravel(item_bbox)))
             # If item is a Component or ComponentReference, draw ports
             if isinstance(item, (Component, ComponentReference)) and show_ports is True:
                 for port in item.ports.values():
@@ -295,11 +308,7 @@ def quickplot(items, **kwargs):  # noqa: C901
                     )
         elif isinstance(item, Polygon):
             layer_tuple = (item.layer, item.datatype)
-            layer_view = (
-                LAYER_VIEWS.get_from_tuple(layer_tuple)
-                if layer_tuple in all_lv_tuples
-                else LayerView(layer=layer_tuple)
-            )
+            layer_view = layer_views.get(layer_tuple) or LayerView(layer=layer_tuple)
             colors = layer_view.get_color_dict()
             new_bbox = _draw_polygons(
                 item.points,
@@ -327,6 +336,10 @@ def quickplot(items, **kwargs):  # noqa: C901
     ymargin = (bbox[3] - bbox[1]) * 0.1 + 1e-9
     ax.set_xlim([bbox[0] - xmargin, bbox[2] + xmargin])
     ax.set_ylim([bbox[1] - ymargin, bbox[3] + ymargin])
+    for lod_plot in lod_plots:
+        lod_plot.connect()
+    # matplotlib holds the zoom callbacks weakly, so the axes keep the plots alive
+    ax._lod_plots = lod_plots
 
     # When using inline Jupyter notebooks, this may fail so allow it to fail gracefully
     try:
@@ -392,6 +405,311 @@ def _draw_line(x, y, ax, **kwargs):
     return [xmin, ymin, xmax, ymax]
 
 
+Buffers = Dict[Layer, Tuple[np.ndarray, np.ndarray]]
+
+
+def _get_reference_transforms(ref) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the 2x2 linear transform and the [N][2] origins of a reference."""
+    angle = np.deg2rad(ref.rotation or 0)
+    cos, sin = np.cos(angle), np.sin(angle)
+    magnification = ref.magnification or 1
+    reflection = -1 if ref.x_reflection else 1
+    linear = magnification * np.array(
+        [[cos, -sin * reflection], [sin, cos * reflection]]
+    )
+    origin = np.asarray(ref.origin, dtype=float)
+    repetition = ref._reference.repetition
+    if repetition.size:
+        return linear, origin + np.asarray(repetition.get_offsets())
+    return linear, origin[None]
+
+
+def _get_corners(bbox: np.ndarray, linear: np.ndarray) -> np.ndarray:
+    (xmin, ymin), (xmax, ymax) = bbox
+    return np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]]) @ linear.T
+
+
+class _Collector:
+    """Accumulates polygons by layer as (points, lengths) and boxes as [N][4][2]."""
+
+    def __init__(self) -> None:
+        self.points = defaultdict(list)
+        self.lengths = defaultdict(list)
+        self.boxes = []
+
+    def add(self, polygons: Tuple[Buffers, np.ndarray], origins: np.ndarray) -> None:
+        buffers, boxes = polygons
+        for layer, (points, lengths) in buffers.items():
+            self.points[layer].append((points[None] + origins[:, None]).reshape(-1, 2))
+            self.lengths[layer].append(np.tile(lengths, len(origins)))
+        if len(boxes):
+            self.boxes.append((boxes[None] + origins[:, None, None]).reshape(-1, 4, 2))
+
+    def add_boxes(self, corners: np.ndarray, origins: np.ndarray) -> None:
+        self.boxes.append(corners[None] + origins[:, None])
+
+    def get(self) -> Tuple[Buffers, np.ndarray]:
+        buffers = {
+            layer: (np.concatenate(points), np.concatenate(self.lengths[layer]))
+            for layer, points in self.points.items()
+        }
+        boxes = np.concatenate(self.boxes) if self.boxes else np.zeros((0, 4, 2))
+        return buffers, boxes
+
+
+class LodRenderer:
+    """Returns the polygons of a Component visible in a window, with level of detail.
+
+    Instances smaller than min_pixels are returned as their bounding box.
+    Instances fully inside the window are flattened once per cell, orientation
+    and level of detail, and moved for each instance.
+
+    Args:
+        component: Component or ComponentReference to render.
+        min_pixels: instances smaller than this number of pixels are boxes.
+            0 returns all the polygons.
+    """
+
+    def __init__(self, component, min_pixels: float = 2) -> None:
+        self.min_pixels = min_pixels
+        if isinstance(component, ComponentReference):
+            self.component = component.parent
+            self.transforms = _get_reference_transforms(component)
+        else:
+            self.component = component
+            self.transforms = np.eye(2), np.zeros((1, 2))
+        self._cells = {}
+        self._flat = {}
+
+    def get_level(self, pixel_size: float) -> float:
+        """Returns the minimum instance size drawn, rounded down to a power of 2."""
+        min_size = self.min_pixels * pixel_size
+        return 2.0 ** np.floor(np.log2(min_size)) if min_size > 0 else 0.0
+
+    def _get_cell(self, cell: Component):
+        """Returns the polygons, references and bounding box of a cell."""
+        if cell.name not in self._cells:
+            polygons = {
+                layer: (points, np.diff(offsets))
+                for layer, (points, offsets) in get_polygons_buffers(
+                    cell, depth=0
+                ).items()
+                if len(points)
+            }
+            references = [
+                (ref.parent, *_get_reference_transforms(ref)) for ref in cell.references
+            ]
+            bbox = cell._cell.bounding_box()
+            self._cells[cell.name] = (
+                polygons,
+                references,
+                None if bbox is None else np.asarray(bbox),
+            )
+        return self._cells[cell.name]
+
+    def _get_flat(
+        self, cell: Component, linear: np.ndarray, level: float
+    ) -> Tuple[Buffers, np.ndarray]:
+        """Returns the polygons and boxes of a cell transformed by linear."""
+        key = (cell.name, *np.round(linear, 9).ravel(), level)
+        if key in self._flat:
+            return self._flat[key]
+
+        polygons, references, _ = self._get_cell(cell)
+        flat = _Collector()
+        flat.add(
+            (
+                {
+                    layer: (points @ linear.T, lengths)
+                    for layer, (points, lengths) in polygons.items()
+                },
+                np.zeros((0, 4, 2)),
+            ),
+            np.zeros((1, 2)),
+        )
+        for child, child_linear, child_origins in references:
+            bbox = self._get_cell(child)[2]
+            if bbox is None:
+                continue
+            child_linear = linear @ child_linear
+            origins = child_origins @ linear.T
+            corners = _get_corners(bbox, child_linear)
+            if np.max(np.ptp(corners, axis=0)) < level:
+                flat.add_boxes(corners, origins)
+            else:
+                flat.add(self._get_flat(child, child_linear, level), origins)
+        self._flat[key] = flat.get()
+        return self._flat[key]
+
+    def _add(
+        self,
+        cell: Component,
+        linear: np.ndarray,
+        origins: np.ndarray,
+        window: np.ndarray,
+        level: float,
+        collector: _Collector,
+        is_root: bool = False,
+    ) -> None:
+        polygons, references, bbox = self._get_cell(cell)
+        if bbox is None:
+            return
+        corners = _get_corners(bbox, linear)
+        lower = corners.min(axis=0) + origins
+        upper = corners.max(axis=0) + origins
+        visible = np.all((lower < window[1]) & (upper > window[0]), axis=1)
+        origins, lower, upper = origins[visible], lower[visible], upper[visible]
+        if not len(origins):
+            return
+        if not is_root and np.max(np.ptp(corners, axis=0)) < level:
+            collector.add_boxes(corners, origins)
+            return
+
+        inside = np.all((lower >= window[0]) & (upper <= window[1]), axis=1)
+        if np.any(inside):
+            collector.add(self._get_flat(cell, linear, level), origins[inside])
+        for origin in origins[~inside]:
+            collector.add(
+                (
+                    {
+                        layer: (points @ linear.T, lengths)
+                        for layer, (points, lengths) in polygons.items()
+                    },
+                    np.zeros((0, 4, 2)),
+                ),
+                origin[None],
+            )
+            for child, child_linear, child_origins in references:
+                self._add(
+                    child,
+                    linear @ child_linear,
+                    child_origins @ linear.T + origin,
+                    window,
+                    level,
+                    collector,
+                )
+
+    def render(
+        self, window: Tuple[float, float, float, float], pixel_size: float
+    ) -> Tuple[Buffers, np.ndarray]:
+        """Returns the polygons by layer and the boxes of the small instances.
+
+        Args:
+            window: (xmin, ymin, xmax, ymax) to render.
+            pixel_size: size of a pixel in um.
+
+        Returns:
+            dict of layer to (points [N][2], number of points of each polygon),
+            and the [M][4][2] corners of the instances drawn as boxes.
+        """
+        collector = _Collector()
+        linear, origins = self.transforms
+        self._add(
+            self.component,
+            linear,
+            origins,
+            np.reshape(window, (2, 2)),
+            self.get_level(pixel_size),
+            collector,
+            is_root=True,
+        )
+        return collector.get()
+
+
+def _get_path(points: np.ndarray, lengths: np.ndarray):
+    """Returns a matplotlib Path with all the polygons.
+
+    Polygons are oriented counterclockwise so that overlaps stay filled.
+    """
+    from matplotlib.path import Path
+
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    index = np.arange(len(points))
+    following = index + 1
+    following[ends - 1] = starts
+    x, y = points.T
+    area = np.add.reduceat(x * y[following] - x[following] * y, starts)
+    polygon = np.repeat(np.arange(len(lengths)), lengths)
+    flip = area[polygon] < 0
+    index[flip] = (starts + ends - 1)[polygon[flip]] - index[flip]
+    points = points[index]
+
+    vertices = np.insert(points, ends, points[starts], axis=0)
+    codes = np.full(len(vertices), Path.LINETO, dtype=Path.code_type)
+    codes[starts + np.arange(len(starts))] = Path.MOVETO
+    codes[ends + np.arange(len(ends))] = Path.CLOSEPOLY
+    return Path(vertices, codes)
+
+
+class _LodPlot:
+    """Draws a LodRenderer on matplotlib axes, one path per layer.
+
+    Renders a window twice the size of the view and renders again when the
+    view leaves it or the level of detail changes.
+    """
+
+    def __init__(self, ax, renderer: LodRenderer, layer_views) -> None:
+        self.ax = ax
+        self.renderer = renderer
+        self.layer_views = layer_views
+        self.artists = []
+        self.window = None
+        self.level = None
+
+    def connect(self) -> None:
+        self.ax.callbacks.connect("xlim_changed", self.update)
+        self.ax.callbacks.connect("ylim_changed", self.update)
+        self.update()
+
+    def update(self, ax=None) -> None:
+        from matplotlib.collections import PolyCollection
+        from matplotlib.patches import PathPatch
+
+        from gdsfactory.technology import LayerView
+
+        xmin, xmax = self.ax.get_xlim()
+        ymin, ymax = self.ax.get_ylim()
+        extent = self.ax.get_window_extent()
+        pixel_size = max(
+            (xmax - xmin) / max(extent.width, 1), (ymax - ymin) / max(extent.height, 1)
+        )
+        level = self.renderer.get_level(pixel_size)
+        if (
+            self.window is not None
+            and level == self.level
+            and np.all(self.window[0] <= (xmin, ymin))
+            and np.all(self.window[1] >= (xmax, ymax))
+        ):
+            return
+
+        dx, dy = (xmax - xmin) / 2, (ymax - ymin) / 2
+        self.window = np.array([[xmin - dx, ymin - dy], [xmax + dx, ymax + dy]])
+        self.level = level
+        buffers, boxes = self.renderer.render(self.window.ravel(), pixel_size)
+
+        for artist in self.artists:
+            artist.remove()
+        self.artists = []
+        for layer in sorted(buffers):
+            layer_view = self.layer_views.get(layer) or LayerView(layer=layer)
+            colors = layer_view.get_color_dict()
+            self.artists.append(
+                PathPatch(
+                    _get_path(*buffers[layer]),
+                    facecolor=colors["fill_color"],
+                    edgecolor=colors["frame_color"],
+                    alpha=layer_view.get_alpha(),
+                )
+            )
+        if len(boxes):
+            self.artists.append(
+                PolyCollection(boxes, facecolor="gray", edgecolor="dimgray", alpha=0.5)
+            )
+        for artist in self.artists:
+            self.ax.add_artist(artist)
+
+
 def _port_marker(port, is_subport):
     angle = port.orientation if port.orientation is not None else 0
 
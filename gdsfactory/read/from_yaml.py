@@ -48,12 +48,16 @@ routes:
 """
 from __future__ import annotations
 
+import concurrent.futures
+import contextvars
 import importlib
+import itertools
 import io
+import multiprocessing
 import pathlib
 import warnings
 from functools import partial
-from typing import IO, Any, Callable, Dict, List, Optional, Union
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from omegaconf import DictConfig, OmegaConf
@@ -62,8 +66,14 @@ from typing_extensions import Literal
 from gdsfactory.add_pins import add_instance_label
 from gdsfactory.cell import cell
 from gdsfactory.component import Component, ComponentReference
+from gdsfactory.port import Port
 from gdsfactory.typings import Route
 
+routing_n_workers: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "routing_n_workers", default=1
+)
+# number of worker processes for the routes of from_yaml, set by from_yaml(n_workers)
+
 valid_placement_keys = [
     "x",
     "y",
@@ -155,11 +165,7 @@ def _get_anchor_value_from_name(
 def _move_ref(
     x: Union[str, float],
     x_or_y: Literal["x", "y"],
-    placements_conf,
-    connections_by_transformed_inst,
-    instances,
-    encountered_insts,
-    all_remaining_insts,
+    instances: Dict[str, ComponentReference],
 ) -> float:
     if not isinstance(x, str):
         return x
@@ -168,15 +174,6 @@ def _move_ref(
             f"You can define {x_or_y} as `{x_or_y}: instanceName,portName` got `{x_or_y}: {x!r}`"
         )
     instance_name_ref, port_name = x.split(",")
-    if instance_name_ref in all_remaining_insts:
-        place(
-            placements_conf,
-            connections_by_transformed_inst,
-            instances,
-            encountered_insts,
-            instance_name_ref,
-            all_remaining_insts,
-        )
     if instance_name_ref not in instances:
         raise ValueError(
             f"{instance_name_ref!r} not in {list(instances.keys())}."
@@ -196,41 +193,104 @@ def _move_ref(
     return _get_anchor_value_from_name(instances[instance_name_ref], port_name, x_or_y)
 
 
+def _refers_to(value: Union[str, float], instance_name: str) -> bool:
+    return isinstance(value, str) and value.split(",")[0] == instance_name
+
+
+def _get_placement_dependencies(
+    instance_name: str,
+    placements_conf: Dict[str, Dict[str, Union[int, float, str]]],
+    connections_by_transformed_inst: Dict[str, Dict[str, str]],
+) -> List[str]:
+    """Returns the instances that the placement of instance_name refers to."""
+    dependencies = []
+    placement_settings = placements_conf.get(instance_name)
+    if isinstance(placement_settings, dict):
+        for key in ["x", "y", "ymax", "ymin", "xmin", "xmax"]:
+            value = placement_settings.get(key)
+            if isinstance(value, str) and len(value.split(",")) == 2:
+                dependencies.append(value.split(",")[0])
+    if instance_name in connections_by_transformed_inst:
+        conn_info = connections_by_transformed_inst[instance_name]
+        dependencies.append(conn_info["instance_dst_name"])
+    return [name for name in dependencies if name != instance_name]
+
+
+def get_placement_order(
+    placements_conf: Dict[str, Dict[str, Union[int, float, str]]],
+    connections_by_transformed_inst: Dict[str, Dict[str, str]],
+) -> List[str]:
+    """Returns the instances to place, each one after the instances it refers to.
+
+    Uses an iterative depth first search, so long chains of placements
+    and connections do not hit the recursion limit.
+
+    Args:
+        placements_conf: Dict of instance_name to placement (x, y, rotation ...).
+        connections_by_transformed_inst: Dict of connection attributes.
+            keyed by the name of the instance which should be transformed.
+
+    Raises:
+        ValueError: if placements or connections refer to each other in a loop.
+    """
+    dependencies = {
+        instance_name: _get_placement_dependencies(
+            instance_name, placements_conf, connections_by_transformed_inst
+        )
+        for instance_name in list(placements_conf)
+        + list(connections_by_transformed_inst)
+    }
+
+    order = []
+    visiting = set()
+    placed = set()
+    for instance_name in dependencies:
+        if instance_name in placed:
+            continue
+        stack = [(instance_name, iter(dependencies[instance_name]))]
+        visiting.add(instance_name)
+        while stack:
+            name, names_ref = stack[-1]
+            for name_ref in names_ref:
+                if name_ref not in dependencies or name_ref in placed:
+                    continue
+                if name_ref in visiting:
+                    loop = [name for name, _ in stack]
+                    loop = loop[loop.index(name_ref) :] + [name_ref]
+                    loop_str = " -> ".join(loop)
+                    raise ValueError(
+                        f"circular reference in placement for {name_ref}! Loop: {loop_str}"
+                    )
+                visiting.add(name_ref)
+                stack.append((name_ref, iter(dependencies[name_ref])))
+                break
+            else:
+                stack.pop()
+                visiting.remove(name)
+                placed.add(name)
+                order.append(name)
+    return order
+
+
 def place(
     placements_conf: Dict[str, Dict[str, Union[int, float, str]]],
     connections_by_transformed_inst: Dict[str, Dict[str, str]],
     instances: Dict[str, ComponentReference],
-    encountered_insts: List[str],
-    instance_name: Optional[str] = None,
-    all_remaining_insts: Optional[List[str]] = None,
+    instance_name: str,
 ) -> None:
     """Place instance_name based on placements_conf config.
 
+    The instances that instance_name refers to need to be placed first,
+    see get_placement_order.
+
     Args:
         placements_conf: Dict of instance_name to placement (x, y, rotation ...).
         connections_by_transformed_inst: Dict of connection attributes.
             keyed by the name of the instance which should be transformed.
         instances: Dict of references.
-        encountered_insts: list of encountered_instances.
         instance_name: instance_name to place.
-        all_remaining_insts: list of all the remaining instances to place
-            instances pop from this instance as they are placed.
 
     """
-    if not all_remaining_insts:
-        return
-    if instance_name is None:
-        instance_name = all_remaining_insts.pop(0)
-    else:
-        all_remaining_insts.remove(instance_name)
-
-    if instance_name in encountered_insts:
-        encountered_insts.append(instance_name)
-        loop_str = " -> ".join(encountered_insts)
-        raise ValueError(
-            f"circular reference in placement for {instance_name}! Loop: {loop_str}"
-        )
-    encountered_insts.append(instance_name)
     if instance_name not in instances:
         raise ValueError(f"{instance_name!r} not in {list(instances.keys())}")
     ref = instances[instance_name]
@@ -279,6 +339,8 @@ def place(
                     "x value or True/False"
                 )
 
+        # port, x and y translations are applied with a single move
+        translation = np.zeros(2)
         if port:
             a = _get_anchor_point_from_name(ref, port)
             if a is None:
@@ -290,33 +352,22 @@ def place(
                     "Valid keywords: \n"
                     f"{valid_anchor_point_keywords}",
                 )
-            ref.x -= a[0]
-            ref.y -= a[1]
+            translation -= a
 
         if x is not None:
-            ref.x += _move_ref(
-                x,
-                x_or_y="x",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
-
-        # print(instance_name, x, xmin, xmax, y, ymin, ymax)
-        # print(ymin, y or ymin or ymax)
+            if _refers_to(x, instance_name):
+                ref.move(translation)
+                translation = np.zeros(2)
+            translation[0] += _move_ref(x, x_or_y="x", instances=instances)
 
         if y is not None:
-            ref.y += _move_ref(
-                y,
-                x_or_y="y",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
+            if _refers_to(y, instance_name):
+                ref.move(translation)
+                translation = np.zeros(2)
+            translation[1] += _move_ref(y, x_or_y="y", instances=instances)
+
+        if translation.any():
+            ref.move(translation)
 
         if rotation:
             if port:
@@ -329,71 +380,259 @@ def place(
         if ymin is not None and ymax is not None:
             raise ValueError("You cannot set ymin and ymax")
         elif ymax is not None:
-            ref.ymax = _move_ref(
-                ymax,
-                x_or_y="y",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
+            ref.ymax = _move_ref(ymax, x_or_y="y", instances=instances)
         elif ymin is not None:
-            ref.ymin = _move_ref(
-                ymin,
-                x_or_y="y",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
+            ref.ymin = _move_ref(ymin, x_or_y="y", instances=instances)
 
         if xmin is not None and xmax is not None:
             raise ValueError("You cannot set xmin and xmax")
         elif xmin is not None:
-            ref.xmin = _move_ref(
-                xmin,
-                x_or_y="x",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
+            ref.xmin = _move_ref(xmin, x_or_y="x", instances=instances)
         elif xmax is not None:
-            ref.xmax = _move_ref(
-                xmax,
-                x_or_y="x",
-                placements_conf=placements_conf,
-                connections_by_transformed_inst=connections_by_transformed_inst,
-                instances=instances,
-                encountered_insts=encountered_insts,
-                all_remaining_insts=all_remaining_insts,
-            )
-        if dx:
-            ref.x += dx
-
-        if dy:
-            ref.y += dy
+            ref.xmax = _move_ref(xmax, x_or_y="x", instances=instances)
+        if dx or dy:
+            ref.move((dx or 0, dy or 0))
 
     if instance_name in connections_by_transformed_inst:
         conn_info = connections_by_transformed_inst[instance_name]
-        instance_dst_name = conn_info["instance_dst_name"]
-        if instance_dst_name in all_remaining_insts:
-            place(
-                placements_conf,
-                connections_by_transformed_inst,
-                instances,
-                encountered_insts,
-                instance_dst_name,
-                all_remaining_insts,
-            )
-
         make_connection(instances=instances, **conn_info)
         # placements_conf.pop(instance_name)
 
 
+def _get_route_group(
+    route_alias: str,
+    routes_dict: Dict[str, Any],
+    instances: Dict[str, ComponentReference],
+    routing_strategy: Dict[str, Callable],
+) -> Tuple[List[str], Callable, List[Port], List[Port], Dict[str, Any]]:
+    """Returns route names, routing function, ports1, ports2 and settings of a route."""
+    route_names = []
+    ports1 = []
+    ports2 = []
+    for key in routes_dict.keys():
+        if key not in valid_route_keys:
+            raise ValueError(f"{route_alias!r} key={key!r} not in {valid_route_keys}")
+
+    settings = routes_dict.pop("settings", {})
+    routing_strategy_name = routes_dict.pop("routing_strategy", "get_bundle")
+    if routing_strategy_name not in routing_strategy:
+        routing_strategies = list(routing_strategy.keys())
+        raise ValueError(
+            f"{routing_strategy_name!r} is an invalid routing_strategy "
+            f"{routing_strategies}"
+        )
+
+    if "links" not in routes_dict:
+        raise ValueError(f"You need to define links for the {route_alias!r} route")
+    links_dict = routes_dict["links"]
+
+    for port_src_string, port_dst_string in links_dict.items():
+        if ":" in port_src_string:
+            src, src0, src1 = (s.strip() for s in port_src_string.split(":"))
+            dst, dst0, dst1 = (s.strip() for s in port_dst_string.split(":"))
+            instance_src_name, port_src_name = (s.strip() for s in src.split(","))
+            instance_dst_name, port_dst_name = (s.strip() for s in dst.split(","))
+
+            src0 = int(src0)
+            src1 = int(src1)
+            dst0 = int(dst0)
+            dst1 = int(dst1)
+
+            if src1 > src0:
+                ports1names = [f"{port_src_name}{i}" for i in range(src0, src1 + 1)]
+            else:
+                ports1names = [f"{port_src_name}{i}" for i in range(src0, src1 - 1, -1)]
+
+            if dst1 > dst0:
+                ports2names = [f"{port_dst_name}{i}" for i in range(dst0, dst1 + 1)]
+            else:
+                ports2names = [f"{port_dst_name}{i}" for i in range(dst0, dst1 - 1, -1)]
+
+            if len(ports1names) != len(ports2names):
+                raise ValueError(f"{ports1names} different from {ports2names}")
+
+            route_names += [
+                f"{instance_src_name},{i}:{instance_dst_name},{j}"
+                for i, j in zip(ports1names, ports2names)
+            ]
+
+            instance_src = instances[instance_src_name]
+            instance_dst = instances[instance_dst_name]
+
+            ports_src = instance_src.ports
+            ports_dst = instance_dst.ports
+
+            for port_src_name in ports1names:
+                if port_src_name not in ports_src:
+                    raise ValueError(
+                        f"{port_src_name!r} not in {list(ports_src.keys())}"
+                        f"for {instance_src_name!r} "
+                    )
+                ports1.append(ports_src[port_src_name])
+
+            for port_dst_name in ports2names:
+                if port_dst_name not in ports_dst:
+                    raise ValueError(
+                        f"{port_dst_name!r} not in {list(ports_dst.keys())}"
+                        f"for {instance_dst_name!r}"
+                    )
+                ports2.append(ports_dst[port_dst_name])
+
+        else:
+            instance_src_name, port_src_name = port_src_string.split(",")
+            instance_dst_name, port_dst_name = port_dst_string.split(",")
+
+            instance_src_name = instance_src_name.strip()
+            instance_dst_name = instance_dst_name.strip()
+            port_src_name = port_src_name.strip()
+            port_dst_name = port_dst_name.strip()
+
+            if instance_src_name not in instances:
+                raise ValueError(
+                    f"{instance_src_name!r} not in {list(instances.keys())}"
+                )
+            if instance_dst_name not in instances:
+                raise ValueError(
+                    f"{instance_dst_name!r} not in {list(instances.keys())}"
+                )
+
+            ports_src = instances[instance_src_name].ports
+            ports_dst = instances[instance_dst_name].ports
+
+            if port_src_name not in ports_src:
+                raise ValueError(
+                    f"{port_src_name!r} not in {list(ports_src.keys())} for"
+                    f" {instance_src_name!r} "
+                )
+
+            if port_dst_name not in ports_dst:
+                raise ValueError(
+                    f"{port_dst_name!r} not in {list(ports_dst.keys())} for"
+                    f" {instance_dst_name!r}"
+                )
+
+            ports1.append(ports_src[port_src_name])
+            ports2.append(ports_dst[port_dst_name])
+            route_names.append(f"{port_src_string}:{port_dst_string}")
+
+    routing_function = routing_strategy[routing_strategy_name]
+    return route_names, routing_function, ports1, ports2, settings
+
+
+def _get_routes(
+    route_names: List[str],
+    routing_function: Callable,
+    ports1: List[Port],
+    ports2: List[Port],
+    settings: Dict[str, Any],
+) -> List[Tuple[str, List[ComponentReference], float]]:
+    """Returns the name, references and length of each route of a route group."""
+    route_or_route_list = routing_function(
+        ports1=ports1,
+        ports2=ports2,
+        **settings,
+    )
+
+    # FIXME, be more consistent
+    if isinstance(route_or_route_list, list):
+        if len(route_names) != len(route_or_route_list):
+            raise ValueError(
+                f"{len(route_or_route_list)} routes for {len(route_names)} "
+                f"route names {route_names}"
+            )
+        return [
+            (route_name, route.references, route.length)
+            for route_name, route in zip(route_names, route_or_route_list)
+        ]
+    elif isinstance(route_or_route_list, Route):
+        return [
+            (
+                route_names[-1],
+                route_or_route_list.references,
+                route_or_route_list.length,
+            )
+        ]
+    else:
+        raise ValueError(f"{route_or_route_list} needs to be a Route or a list")
+
+
+_route_groups: List[
+    Tuple[List[str], Callable, List[Port], List[Port], Dict[str, Any]]
+] = []
+
+
+def _get_routes_serialized(index: int) -> Tuple[bytes, bytes, List[Tuple]]:
+    """Returns the routes of _route_groups[index] in a worker process.
+
+    The route references are returned in a Component as GDS and JSON bytes
+    in the DiskCache format and each route as its name, length and
+    number of references.
+    """
+    from gdsfactory.disk_cache import dumps
+
+    routes = _get_routes(*_route_groups[index])
+    container = Component()
+    routes_serialized = []
+    for route_name, references, length in routes:
+        container.add(references)
+        routes_serialized.append((route_name, length, len(references)))
+
+    return (*dumps(container), routes_serialized)
+
+
+def _get_routes_parallel(
+    route_groups: List[
+        Tuple[List[str], Callable, List[Port], List[Port], Dict[str, Any]]
+    ],
+    n_workers: int,
+) -> List[List[Tuple[str, List[ComponentReference], float]]]:
+    """Returns the routes of each route group computed in worker processes.
+
+    Workers are forked so they share the active PDK and the cell cache.
+    The route components are merged into the cell cache by name and
+    the routes are returned in the same order as route_groups.
+    """
+    from gdsfactory.disk_cache import loads
+
+    global _route_groups
+
+    _route_groups = route_groups
+    try:
+        context = multiprocessing.get_context("fork")
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=context
+        ) as pool:
+            results = list(pool.map(_get_routes_serialized, range(len(route_groups))))
+    finally:
+        _route_groups = []
+
+    routes_by_group = []
+    for gds, metadata, routes_serialized in results:
+        container = loads(gds, metadata)
+        # the loaded references belong to the container, so they are copied
+        container_references = iter(container.references)
+        routes = []
+        for route_name, length, n_references in routes_serialized:
+            references = [
+                ComponentReference(
+                    component=ref.parent,
+                    origin=ref.origin,
+                    rotation=ref.rotation,
+                    magnification=ref.magnification,
+                    x_reflection=ref.x_reflection,
+                    columns=ref.columns,
+                    rows=ref.rows,
+                    spacing=ref.spacing,
+                    v1=ref.v1,
+                    v2=ref.v2,
+                )
+                for ref in itertools.islice(container_references, n_references)
+            ]
+            routes.append((route_name, references, length))
+        routes_by_group.append(routes)
+    return routes_by_group
+
+
 def transform_connections_dict(connections_conf: Dict[str, str]) -> Dict[str, Dict]:
     """Returns Dict with source_instance_name key and connection properties."""
     if not connections_conf:
@@ -596,6 +835,7 @@ def from_yaml(
     label_instance_function: Callable = add_instance_label,
     name: Optional[str] = None,
     prefix: Optional[str] = None,
+    n_workers: int = 1,
     **kwargs,
 ) -> Component:
     """Returns Component from YAML string or file.
@@ -608,6 +848,9 @@ def from_yaml(
         label_instance_function: to label each instance.
         name: Optional name.
         prefix: name prefix.
+        n_workers: number of worker processes to compute the route groups.
+            Needs the fork start method, otherwise routes are computed
+            sequentially. The Component is the same as with n_workers=1.
         kwargs: function settings for creating YAML PCells.
 
     .. code::
@@ -708,14 +951,18 @@ def from_yaml(
         else:
             conf["settings"][key] = value
 
-    return _from_yaml(
-        conf=OmegaConf.to_container(conf, resolve=True),
-        routing_strategy=routing_strategy,
-        label_instance_function=label_instance_function,
-        prefix=prefix or conf.get("name", "Unnamed"),
-        name=name,
-        mode=mode,
-    )
+    token = routing_n_workers.set(n_workers)
+    try:
+        return _from_yaml(
+            conf=OmegaConf.to_container(conf, resolve=True),
+            routing_strategy=routing_strategy,
+            label_instance_function=label_instance_function,
+            prefix=prefix or conf.get("name", "Unnamed"),
+            name=name,
+            mode=mode,
+        )
+    finally:
+        routing_n_workers.reset(token)
 
 
 @cell
@@ -794,17 +1041,14 @@ def _from_yaml(
                 "with both connection and placement. Please use one or the other.",
             )
 
-    all_remaining_insts = list(
-        set(placements_conf.keys()).union(set(connections_by_transformed_inst.keys()))
-    )
-
-    while all_remaining_insts:
+    for instance_name in get_placement_order(
+        placements_conf, connections_by_transformed_inst
+    ):
         place(
             placements_conf=placements_conf,
             connections_by_transformed_inst=connections_by_transformed_inst,
             instances=instances,
-            encountered_insts=[],
-            all_remaining_insts=all_remaining_insts,
+            instance_name=instance_name,
         )
 
     for instance_name in instances_dict:
@@ -813,148 +1057,26 @@ def _from_yaml(
         )
 
     if routes_conf:
-        for route_alias in routes_conf:
-            route_names = []
-            ports1 = []
-            ports2 = []
-            routes_dict = routes_conf[route_alias]
-            for key in routes_dict.keys():
-                if key not in valid_route_keys:
-                    raise ValueError(
-                        f"{route_alias!r} key={key!r} not in {valid_route_keys}"
-                    )
-
-            settings = routes_dict.pop("settings", {})
-            routing_strategy_name = routes_dict.pop("routing_strategy", "get_bundle")
-            if routing_strategy_name not in routing_strategy:
-                routing_strategies = list(routing_strategy.keys())
-                raise ValueError(
-                    f"{routing_strategy_name!r} is an invalid routing_strategy "
-                    f"{routing_strategies}"
-                )
-
-            if "links" not in routes_dict:
-                raise ValueError(
-                    f"You need to define links for the {route_alias!r} route"
-                )
-            links_dict = routes_dict["links"]
-
-            for port_src_string, port_dst_string in links_dict.items():
-                if ":" in port_src_string:
-                    src, src0, src1 = (s.strip() for s in port_src_string.split(":"))
-                    dst, dst0, dst1 = (s.strip() for s in port_dst_string.split(":"))
-                    instance_src_name, port_src_name = (
-                        s.strip() for s in src.split(",")
-                    )
-                    instance_dst_name, port_dst_name = (
-                        s.strip() for s in dst.split(",")
-                    )
-
-                    src0 = int(src0)
-                    src1 = int(src1)
-                    dst0 = int(dst0)
-                    dst1 = int(dst1)
-
-                    if src1 > src0:
-                        ports1names = [
-                            f"{port_src_name}{i}" for i in range(src0, src1 + 1)
-                        ]
-                    else:
-                        ports1names = [
-                            f"{port_src_name}{i}" for i in range(src0, src1 - 1, -1)
-                        ]
-
-                    if dst1 > dst0:
-                        ports2names = [
-                            f"{port_dst_name}{i}" for i in range(dst0, dst1 + 1)
-                        ]
-                    else:
-                        ports2names = [
-                            f"{port_dst_name}{i}" for i in range(dst0, dst1 - 1, -1)
-                        ]
-
-                    if len(ports1names) != len(ports2names):
-                        raise ValueError(f"{ports1names} different from {ports2names}")
-
-                    route_names += [
-                        f"{instance_src_name},{i}:{instance_dst_name},{j}"
-                        for i, j in zip(ports1names, ports2names)
-                    ]
-
-                    instance_src = instances[instance_src_name]
-                    instance_dst = instances[instance_dst_name]
-
-                    for port_src_name in ports1names:
-                        if port_src_name not in instance_src.ports:
-                            raise ValueError(
-                                f"{port_src_name!r} not in {list(instance_src.ports.keys())}"
-                                f"for {instance_src_name!r} "
-                            )
-                        ports1.append(instance_src.ports[port_src_name])
-
-                    for port_dst_name in ports2names:
-                        if port_dst_name not in instance_dst.ports:
-                            raise ValueError(
-                                f"{port_dst_name!r} not in {list(instance_dst.ports.keys())}"
-                                f"for {instance_dst_name!r}"
-                            )
-                        ports2.append(instance_dst.ports[port_dst_name])
-
-                else:
-                    instance_src_name, port_src_name = port_src_string.split(",")
-                    instance_dst_name, port_dst_name = port_dst_string.split(",")
-
-                    instance_src_name = instance_src_name.strip()
-                    instance_dst_name = instance_dst_name.strip()
-                    port_src_name = port_src_name.strip()
-                    port_dst_name = port_dst_name.strip()
-
-                    if instance_src_name not in instances:
-                        raise ValueError(
-                            f"{instance_src_name!r} not in {list(instances.keys())}"
-                        )
-                    if instance_dst_name not in instances:
-                        raise ValueError(
-                            f"{instance_dst_name!r} not in {list(instances.keys())}"
-                        )
-
-                    instance_src = instances[instance_src_name]
-                    instance_dst = instances[instance_dst_name]
-
-                    if port_src_name not in instance_src.ports:
-                        raise ValueError(
-                            f"{port_src_name!r} not in {list(instance_src.ports.keys())} for"
-                            f" {instance_src_name!r} "
-                        )
-
-                    if port_dst_name not in instance_dst.ports:
-                        raise ValueError(
-                            f"{port_dst_name!r} not in {list(instance_dst.ports.keys())} for"
-                            f" {instance_dst_name!r}"
-                        )
-
-                    ports1.append(instance_src.ports[port_src_name])
-                    ports2.append(instance_dst.ports[port_dst_name])
-                    route_name = f"{port_src_string}:{port_dst_string}"
-                    route_names.append(route_name)
-
-            routing_function = routing_strategy[routing_strategy_name]
-            route_or_route_list = routing_function(
-                ports1=ports1,
-                ports2=ports2,
-                **settings,
+        route_groups = [
+            _get_route_group(
+                route_alias, routes_conf[route_alias], instances, routing_strategy
             )
+            for route_alias in routes_conf
+        ]
+        n_workers = routing_n_workers.get()
+        if (
+            n_workers > 1
+            and len(route_groups) > 1
+            and "fork" in multiprocessing.get_all_start_methods()
+        ):
+            routes_by_group = _get_routes_parallel(route_groups, n_workers)
+        else:
+            routes_by_group = [_get_routes(*args) for args in route_groups]
 
-            # FIXME, be more consistent
-            if isinstance(route_or_route_list, list):
-                for route_name, route_dict in zip(route_names, route_or_route_list):
-                    c.add(route_dict.references)
-                    routes[route_name] = route_dict.length
-            elif isinstance(route_or_route_list, Route):
-                c.add(route_or_route_list.references)
-                routes[route_name] = route_or_route_list.length
-            else:
-                raise ValueError(f"{route_or_route_list} needs to be a Route or a list")
+        for group_routes in routes_by_group:
+            for route_name, references, length in group_routes:
+                c.add(references)
+                routes[route_name] = length
 
     if ports_conf:
         if not hasattr(ports_conf, "items"):
@@ -526,7 +526,7 @@ def get_bundle_all_angle(
         kwargs: added for compatibility, but in general, kwargs will be ignored with a warning.
 
     Returns:
-        List of Routes between ports1 and ports2.
+        List of Routes between ports1 and ports2, one for each pair of ports.
 
     .. plot::
         :include-source:
@@ -593,6 +593,8 @@ def get_bundle_all_angle(
         if _points_approx_equal(port1.center, port2.center) and _angles_approx_opposing(
             port1.orientation, port2.orientation
         ):
+            # touching ports need no route
+            routes.append(Route(references=[], ports=(port1, port2), length=0))
             continue
         route_refs = []
         if (
@@ -1,8 +1,25 @@
+"""A* router on a rectilinear grid with an obstacle bitmap.
+
+The grid lines are the multiples of `resolution` plus the axis of every routed
+port, so ports are always on the grid. A grid node is an obstacle if it is
+closer than `distance` to a polygon in `avoid_layers` (or to the bounding box
+of a reference when `avoid_layers` is None). The references that the routed
+ports belong to are obstacles without the `distance` margin.
+
+The search state is (node, direction) so the cost of a route is its length plus
+`bend_penalty` for every bend.
+
+`get_routes_astar` routes many nets one after the other on the same grid and
+marks every route as an obstacle for the following nets.
+"""
 from __future__ import annotations
 
-from typing import Optional, List
+import heapq
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
 from warnings import warn
 
+import gdstk
 import numpy as np
 
 import gdsfactory as gf
@@ -13,16 +30,401 @@ from gdsfactory.routing import get_route_from_waypoints
 from gdsfactory.routing.manhattan import route_manhattan
 from gdsfactory.typings import CrossSectionSpec, LayerSpec, Route
 
+_TOL = 1e-4
+_DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+_ORIENTATION_TO_DIRECTION = {0: 0, 90: 1, 180: 2, 270: 3}
+
+FREE, OBSTACLE, RESERVED = 0, 1, 2
+
+
+class AStarGrid:
+    """Obstacle bitmap shared by all the nets routed with A*.
+
+    Args:
+        component: to route. Its references (or avoid_layers polygons) are obstacles.
+        resolution: grid spacing in um.
+        avoid_layers: list of layers to avoid. None avoids all references.
+        distance: minimum distance in um from the route center to obstacles.
+        ports: to route. Their axes are added to the grid lines.
+        straight_length: minimum straight length in um next to the ports.
+    """
+
+    def __init__(
+        self,
+        component: Component,
+        resolution: float = 1,
+        avoid_layers: Optional[List[LayerSpec]] = None,
+        distance: float = 1,
+        ports: Sequence[Port] = (),
+        straight_length: float = 0,
+    ) -> None:
+        self.resolution = resolution
+        self.distance = distance
+        self.straight_length = straight_length
+
+        (xmin, ymin), (xmax, ymax) = component.bbox
+        for port in ports:
+            xmin, xmax = min(xmin, port.x), max(xmax, port.x)
+            ymin, ymax = min(ymin, port.y), max(ymax, port.y)
+
+        margin = distance + straight_length + 2 * resolution
+        xs = [_lattice(xmin - margin, xmax + margin, resolution)]
+        ys = [_lattice(ymin - margin, ymax + margin, resolution)]
+        for port in ports:
+            direction = _get_direction(port)
+            if direction is None or direction % 2:
+                xs.append([port.x])
+            if direction is None or not direction % 2:
+                ys.append([port.y])
+        self.xs = np.unique(np.round(np.concatenate(xs), 3))
+        self.ys = np.unique(np.round(np.concatenate(ys), 3))
+        self.nx, self.ny = len(self.xs), len(self.ys)
+
+        # the search reads the bytearray while numpy writes through the view
+        self._data = bytearray(self.nx * self.ny)
+        self.bitmap = np.frombuffer(self._data, dtype=np.uint8).reshape(
+            self.nx, self.ny
+        )
+
+        # the routes connect to the references of the ports, so they only
+        # keep distance from the other references
+        port_references = {id(port.parent) for port in ports}
+        if avoid_layers is None:
+            for ref in component.references:
+                (x0, y0), (x1, y1) = ref.bbox
+                margin = 0 if id(ref) in port_references else distance
+                self.add_rectangle(x0, y0, x1, y1, margin=margin)
+            return
+
+        layers = {gf.get_layer(layer) for layer in avoid_layers}
+        instances = [(component, distance, 0)] + [
+            (ref, 0 if id(ref) in port_references else distance, None)
+            for ref in component.references
+        ]
+        for instance, margin, depth in instances:
+            for layer, polygons in instance.get_polygons(
+                by_spec=True, depth=depth
+            ).items():
+                if layer in layers:
+                    for points in polygons:
+                        self.add_polygon(points, margin=margin)
+
+    def _window(
+        self, x0: float, y0: float, x1: float, y1: float
+    ) -> Tuple[slice, slice]:
+        """Returns the grid nodes strictly inside a rectangle."""
+        return (
+            slice(
+                np.searchsorted(self.xs, x0, "right"),
+                np.searchsorted(self.xs, x1, "left"),
+            ),
+            slice(
+                np.searchsorted(self.ys, y0, "right"),
+                np.searchsorted(self.ys, y1, "left"),
+            ),
+        )
 
-class Node:
-    def __init__(self, parent=None, position: tuple = ()) -> None:
-        """Initializes a node. A node is a point on the grid."""
-        self.parent = parent  # parent node of current node
-        self.position = position  # position of current node
+    def add_rectangle(
+        self, x0: float, y0: float, x1: float, y1: float, margin: float = 0
+    ) -> None:
+        """Marks the nodes closer than margin to a rectangle as obstacles."""
+        window = self._window(x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+        self.bitmap[window] = OBSTACLE
+
+    def add_polygon(self, points: np.ndarray, margin: float = 0) -> None:
+        """Marks the nodes closer than margin to a polygon as obstacles."""
+        points = np.asarray(points)
+        if len(points) == 4 and np.all(
+            (points[:, 0] == np.roll(points[:, 0], 1))
+            | (points[:, 1] == np.roll(points[:, 1], 1))
+        ):
+            (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+            self.add_rectangle(x0, y0, x1, y1, margin=margin)
+            return
+
+        polygons = (
+            gdstk.offset(gdstk.Polygon(points), margin, join="round")
+            if margin
+            else [gdstk.Polygon(points)]
+        )
+        for polygon in polygons:
+            (x0, y0), (x1, y1) = polygon.bounding_box()
+            wx, wy = self._window(x0, y0, x1, y1)
+            x, y = np.meshgrid(self.xs[wx], self.ys[wy], indexing="ij")
+            if not x.size:
+                continue
+            inside = gdstk.inside(np.stack([x.ravel(), y.ravel()], axis=1), [polygon])
+            window = self.bitmap[wx, wy]
+            window[np.reshape(inside, x.shape)] = OBSTACLE
+
+    def add_route(self, points: Sequence[Tuple[float, float]], width: float) -> None:
+        """Marks a route as an obstacle for the following nets.
+
+        Args:
+            points: route waypoints.
+            width: route width in um.
+        """
+        margin = width / 2 + self.distance
+        for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+            self.add_rectangle(
+                min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1), margin=margin
+            )
+
+    def _access(self, port: Port) -> Tuple[int, Optional[int], List[int], List[int]]:
+        """Returns start node, direction, channel and straight nodes of a port.
+
+        The start node is at least resolution and straight_length from the port.
+        The channel goes from the port to `distance` beyond the start node
+        and is reserved for the port, so other nets keep clear of its entrance.
+        The straight nodes go from the port to the start node.
+        """
+        direction = _get_direction(port)
+        x, y = round(float(port.x), 3), round(float(port.y), 3)
+        if direction is None:
+            i = int(np.searchsorted(self.xs, x - _TOL))
+            j = int(np.searchsorted(self.ys, y - _TOL))
+            node = i * self.ny + j
+            return node, None, [node], [node]
+
+        horizontal = direction % 2 == 0
+        along, p = (self.xs, x) if horizontal else (self.ys, y)
+        length = max(self.resolution, self.straight_length)
+        if direction < 2:
+            k = int(np.searchsorted(along, p + length - _TOL))
+            lo = int(np.searchsorted(along, p - _TOL))
+            hi = int(np.searchsorted(along, along[k] + self.distance + _TOL))
+            straight = range(lo, k + 1)
+        else:
+            k = int(np.searchsorted(along, p - length + _TOL)) - 1
+            lo = int(np.searchsorted(along, along[k] - self.distance - _TOL))
+            hi = int(np.searchsorted(along, p + _TOL))
+            straight = range(k, hi)
+
+        if horizontal:
+            j = int(np.searchsorted(self.ys, y - _TOL))
+            channel = [i * self.ny + j for i in range(lo, hi)]
+            straight = [i * self.ny + j for i in straight]
+            node = k * self.ny + j
+        else:
+            i = int(np.searchsorted(self.xs, x - _TOL))
+            channel = [i * self.ny + j for j in range(lo, hi)]
+            straight = [i * self.ny + j for j in straight]
+            node = i * self.ny + k
+        return node, direction, channel, straight
+
+    def reserve(self, port: Port) -> None:
+        """Blocks the free channel in front of a port for all other nets."""
+        data = self._data
+        for node in self._access(port)[2]:
+            if data[node] == FREE:
+                data[node] = RESERVED
+
+    def find_path(
+        self, port1: Port, port2: Port, bend_penalty: float
+    ) -> Optional[List[Tuple[float, float]]]:
+        """Returns the waypoints of the cheapest route or None if there is none.
+
+        Args:
+            port1: input.
+            port2: output.
+            bend_penalty: cost of a bend in um of route length.
+        """
+        start, direction1, channel1, straight1 = self._access(port1)
+        end, direction2, channel2, straight2 = self._access(port2)
+        data = self._data
+        # only the reservations are lifted, obstacles in front of a port stay
+        for node in channel1 + channel2:
+            if data[node] == RESERVED:
+                data[node] = FREE
+        if any(data[node] for node in straight1 + straight2):
+            return None
+
+        xs, ys = self.xs.tolist(), self.ys.tolist()
+        nx, ny = self.nx, self.ny
+        xe, ye = xs[end // ny], ys[end % ny]
+        goal = -1
+
+        counter = itertools.count()
+        g: Dict[int, float] = {}
+        parent: Dict[int, int] = {}
+        closed = set()
+        heap = []
+
+        for d in range(4) if direction1 is None else [direction1]:
+            state = start * 4 + d
+            i, j = divmod(start, ny)
+            g[state] = 0
+            parent[state] = -2
+            heapq.heappush(
+                heap, (abs(xs[i] - xe) + abs(ys[j] - ye), next(counter), state)
+            )
+
+        while heap:
+            _, _, state = heapq.heappop(heap)
+            if state == goal:
+                break
+            if state in closed:
+                continue
+            closed.add(state)
+            cost = g[state]
+            node, d = divmod(state, 4)
+            i, j = divmod(node, ny)
+
+            if node == end:
+                # the route leaves the end node towards port2
+                if direction2 is None or d == (direction2 + 2) % 4:
+                    extra = 0
+                elif d != direction2:
+                    extra = bend_penalty
+                else:
+                    extra = None
+                if extra is not None and cost + extra < g.get(goal, np.inf):
+                    g[goal] = cost + extra
+                    parent[goal] = state
+                    heapq.heappush(heap, (cost + extra, next(counter), goal))
+
+            for nd, (di, dj) in enumerate(_DIRECTIONS):
+                if nd == (d + 2) % 4:
+                    continue
+                ni, nj = i + di, j + dj
+                if ni < 0 or nj < 0 or ni >= nx or nj >= ny:
+                    continue
+                next_node = ni * ny + nj
+                if data[next_node]:
+                    continue
+                next_state = next_node * 4 + nd
+                if next_state in closed:
+                    continue
+                next_cost = cost + abs(xs[ni] - xs[i]) + abs(ys[nj] - ys[j])
+                if nd != d:
+                    next_cost += bend_penalty
+                if next_cost < g.get(next_state, np.inf):
+                    g[next_state] = next_cost
+                    parent[next_state] = state
+                    heapq.heappush(
+                        heap,
+                        (
+                            next_cost + abs(xs[ni] - xe) + abs(ys[nj] - ye),
+                            next(counter),
+                            next_state,
+                        ),
+                    )
+
+        if goal not in parent:
+            return None
+
+        points = []
+        state = parent[goal]
+        while state != -2:
+            i, j = divmod(state // 4, ny)
+            points.append((xs[i], ys[j]))
+            state = parent[state]
+        points = [tuple(port1.center)] + points[::-1] + [tuple(port2.center)]
+        return _remove_collinear(points)
+
+
+def _lattice(vmin: float, vmax: float, resolution: float) -> np.ndarray:
+    return (
+        np.arange(np.floor(vmin / resolution), np.ceil(vmax / resolution) + 1)
+        * resolution
+    )
 
-        self.g = 0  # distance between current node and start node
-        self.h = 0  # distance between current node and end node
-        self.f = self.g + self.h  # cost of the node (sum of g and h)
+
+def _get_direction(port: Port) -> Optional[int]:
+    if port.orientation is None:
+        return None
+    orientation = int(round(port.orientation)) % 360
+    if orientation not in _ORIENTATION_TO_DIRECTION:
+        raise ValueError(
+            f"A* routing needs manhattan ports, got {port.name!r} "
+            f"orientation = {port.orientation}"
+        )
+    return _ORIENTATION_TO_DIRECTION[orientation]
+
+
+def _remove_collinear(points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Removes the points that are not corners."""
+    result = [points[0]]
+    for point, next_point in zip(points[1:-1], points[2:]):
+        x0, y0 = result[-1]
+        x1, y1 = point
+        x2, y2 = next_point
+        if not (
+            (abs(x0 - x1) < _TOL and abs(x1 - x2) < _TOL)
+            or (abs(y0 - y1) < _TOL and abs(y1 - y2) < _TOL)
+        ):
+            result.append(point)
+    result.append(points[-1])
+    return result
+
+
+def get_routes_astar(
+    component: Component,
+    ports1: Sequence[Port],
+    ports2: Sequence[Port],
+    resolution: float = 1,
+    avoid_layers: Optional[List[LayerSpec]] = None,
+    distance: float = 1,
+    cross_section: CrossSectionSpec = "strip",
+    bend_penalty: Optional[float] = None,
+    **kwargs,
+) -> List[Route]:
+    """A* routing of many nets. Routes ports1[i] to ports2[i] avoiding obstacles.
+
+    Nets are routed one after the other (shortest first) on a shared obstacle
+    bitmap, and each route becomes an obstacle for the following nets.
+
+    Args:
+        component: Component the routes, and ports belong to.
+        ports1: list of input ports.
+        ports2: list of output ports.
+        resolution: discretization resolution in um.
+        avoid_layers: list of layers to avoid.
+        distance: distance from obstacles in um.
+        cross_section: spec.
+        bend_penalty: cost of a bend in um of route length. Defaults to 2 * resolution.
+        kwargs: cross_section settings.
+    """
+    if len(ports1) != len(ports2):
+        raise ValueError(f"len(ports1) = {len(ports1)} != len(ports2) = {len(ports2)}")
+
+    cross_section = gf.get_cross_section(cross_section, **kwargs)
+    bend_penalty = 2 * resolution if bend_penalty is None else bend_penalty
+    ports = list(ports1) + list(ports2)
+    grid = AStarGrid(
+        component,
+        resolution=resolution,
+        avoid_layers=avoid_layers,
+        distance=distance,
+        ports=ports,
+        straight_length=cross_section.radius or 0,
+    )
+    for port in ports:
+        grid.reserve(port)
+
+    nets = sorted(
+        range(len(ports1)),
+        key=lambda i: np.abs(ports1[i].center - ports2[i].center).sum(),
+    )
+    routes: List[Optional[Route]] = [None] * len(ports1)
+    for i in nets:
+        port1, port2 = ports1[i], ports2[i]
+        points = grid.find_path(port1, port2, bend_penalty=bend_penalty)
+        if points is None:
+            warn(
+                "A* algorithm failed, resorting to Manhattan routing. Watch for overlaps."
+            )
+            routes[i] = route_manhattan(port1, port2, cross_section=cross_section)
+            continue
+
+        grid.add_route(points, width=cross_section.width)
+        if cross_section.radius:
+            routes[i] = get_route_from_waypoints(points, cross_section=cross_section)
+        else:
+            routes[i] = get_route_from_waypoints(
+                points, cross_section=cross_section, bend=wire_corner
+            )
+    return routes
 
 
 def get_route_astar(
@@ -33,6 +435,7 @@ def get_route_astar(
     avoid_layers: Optional[List[LayerSpec]] = None,
     distance: float = 1,
     cross_section: CrossSectionSpec = "strip",
+    bend_penalty: Optional[float] = None,
     **kwargs,
 ) -> Route:
     """A* routing function. Finds a route between two ports avoiding obstacles.
@@ -48,279 +451,23 @@ def get_route_astar(
         avoid_layers: list of layers to avoid.
         distance: distance from obstacles in um.
         cross_section: spec.
+        bend_penalty: cost of a bend in um of route length. Defaults to 2 * resolution.
         kwargs: cross_section settings.
     """
-    cross_section = gf.get_cross_section(cross_section, **kwargs)
-
-    grid, x, y = _generate_grid(component, resolution, avoid_layers, distance)
-
-    # Tell the algorithm which start and end directions to follow based on port orientation
-    input_orientation = {
-        0.0: (resolution, 0),
-        90.0: (0, resolution),
-        180.0: (-resolution, 0),
-        270.0: (0, -resolution),
-        None: (0, 0),
-    }[port1.orientation]
-
-    output_orientation = {
-        0.0: (resolution, 0),
-        90.0: (0, resolution),
-        180.0: (-resolution, 0),
-        270.0: (0, -resolution),
-        None: (0, 0),
-    }[port2.orientation]
-
-    # Instantiate nodes
-    start_node = Node(
-        None,
-        (
-            round(port1.x + input_orientation[0]),
-            round(port1.y + input_orientation[1]),
-        ),
-    )
-    start_node.g = start_node.h = start_node.f = 0
-
-    end_node = Node(
-        None,
-        (
-            round(port2.x + output_orientation[0]),
-            round(port2.y + output_orientation[1]),
-        ),
-    )
-    end_node.g = end_node.h = end_node.f = 0
-
-    # Add the start node
-    open_list = [start_node]
-    closed = []
-
-    while open_list:
-        # Current node
-        current_index = 0
-        for index in range(len(open_list)):
-            if open_list[index].f < open_list[current_index].f:
-                current_index = index
-
-        # Pop current off open_list list, add to closed list
-        current_node = open_list[current_index]
-        closed.append(open_list.pop(current_index))
-
-        # Reached end port
-        if (
-            current_node.position[0] == end_node.position[0]
-            and current_node.position[1] == end_node.position[1]
-        ):
-            points = []
-            current = current_node
-
-            # trace back path from end node to start node
-            while current is not None:
-                points.append(current.position)
-                current = current.parent
-            # reverse to get true path
-            points = points[::-1]
-
-            # add the start and end ports
-            points.insert(0, port1.center)
-            points.append(port2.center)
-
-            # return route from points
-            if cross_section.radius:
-                return get_route_from_waypoints(points, cross_section=cross_section)
-            else:
-                return get_route_from_waypoints(
-                    points, cross_section=cross_section, bend=wire_corner
-                )
-
-        # Generate neighbours
-        neighbours = _generate_neighbours(
-            grid=grid,
-            x=x,
-            y=y,
-            current_node=current_node,
-            resolution=resolution,
-        )
-
-        # Loop through neighbours
-        for neighbour in neighbours:
-            for closed_neighbour in closed:
-                if neighbour == closed_neighbour:
-                    continue
-
-            # Compute f, g, h
-            neighbour.g = current_node.g + resolution
-            # print(neighbour.g)
-            neighbour.h = np.sqrt(
-                (neighbour.position[0] - end_node.position[0]) ** 2
-            ) + ((neighbour.position[1] - end_node.position[1]) ** 2)
-            neighbour.f = neighbour.g + neighbour.h
-
-            if current_node.parent is not None and (
-                neighbour.position[0] - current_node.parent.position[0],
-                neighbour.position[1] - current_node.parent.position[1],
-            ) in [
-                (resolution, -resolution),
-                (-resolution, resolution),
-                (resolution, resolution),
-                (-resolution, -resolution),
-            ]:
-                neighbour.f *= 1.1  # penalize for turns
-
-            # neighbour is already in the open_list
-            for open_list_node in open_list:
-                if neighbour == open_list_node and neighbour.g > open_list_node.g:
-                    continue
-
-            # Add the neighbour to open_list
-            open_list.append(neighbour)
-
-    warn("A* algorithm failed, resorting to Manhattan routing. Watch for overlaps.")
-    return route_manhattan(port1, port2, cross_section=cross_section)
-
-
-def _extract_all_bbox(c: Component, avoid_layers: Optional[List[LayerSpec]] = None):
-    """Extract all polygons whose layer is in `avoid_layers`."""
-    return [c.get_polygons(layer) for layer in avoid_layers]
-
-
-def _generate_grid(
-    c: Component,
-    resolution: float = 0.5,
-    avoid_layers: Optional[List[LayerSpec]] = None,
-    distance: float = 1,
-) -> np.ndarray:
-    """Generate discretization grid that the algorithm will step through."""
-    bbox = c.bbox
-    x, y = np.meshgrid(
-        np.linspace(
-            bbox[0][0],
-            bbox[1][0],
-            int((bbox[1][0] - bbox[0][0]) / resolution),
-            endpoint=True,
-        ),
-        np.linspace(
-            bbox[0][1],
-            bbox[1][1],
-            int((bbox[1][1] - bbox[0][1]) / resolution),
-            endpoint=True,
-        ),
-    )  # discretize component space
-    x, y = x[0], y[:, 0]  # weed out copies
-    grid = np.zeros(
-        (len(x), len(y))
-    )  # mapping from gdsfactory's x-, y- coordinate to grid vertex
-
-    # assign 1 for obstacles
-    if avoid_layers is None:
-        for ref in c.references:
-            bbox = ref.bbox
-            xmin = np.abs(x - bbox[0][0] + distance).argmin()
-            xmax = np.abs(x - bbox[1][0] - distance).argmin()
-            ymin = np.abs(y - bbox[0][1] + distance).argmin()
-            ymax = np.abs(y - bbox[1][1] - distance).argmin()
-
-            grid[xmin:xmax, ymin:ymax] = 1
-    else:
-        all_refs = _extract_all_bbox(c, avoid_layers)
-        for layer in all_refs:
-            for bbox in layer:
-                xmin = np.abs(x - bbox[0][0] + distance).argmin()
-                xmax = np.abs(x - bbox[2][0] - distance).argmin()
-                ymin = np.abs(y - bbox[0][1] + distance).argmin()
-                ymax = np.abs(y - bbox[2][1] - distance).argmin()
-                grid[xmin:xmax, ymin:ymax] = 1
-
-    return np.ndarray.round(grid, 3), np.ndarray.round(x, 3), np.ndarray.round(y, 3)
-
-
-def _generate_neighbours(
-    current_node: Node,
-    grid,
-    x: np.ndarray,
-    y: np.ndarray,
-    resolution: float,
-) -> List[Node]:
-    """Generate neighbours of a node."""
-    neighbours = []
-
-    for new_position in [
-        (0, -resolution),
-        (0, resolution),
-        (-resolution, 0),
-        (resolution, 0),
-    ]:  # Adjacent nodes along Manhattan path
-        # Get node position
-        node_position = (
-            current_node.position[0] + new_position[0],
-            current_node.position[1] + new_position[1],
-        )
-
-        # Make sure within range and not in obstacle
-        if (
-            node_position[0] > x.max()
-            or node_position[0] < x.min()
-            or node_position[1] > y.max()
-            or node_position[1] < y.min()
-        ):
-            continue
-
-        if (
-            grid[
-                next(
-                    i
-                    for i, _ in enumerate(x)
-                    if np.isclose(_, node_position[0], atol=resolution)
-                )
-            ][
-                next(
-                    i
-                    for i, _ in enumerate(y)
-                    if np.isclose(_, node_position[1], atol=resolution)
-                )
-            ]
-            == 1.0
-        ):
-            continue
-
-        # Create new node
-        new_node = Node(current_node, node_position)
-
-        # Append
-        neighbours.append(new_node)
-
-    return neighbours
+    return get_routes_astar(
+        component=component,
+        ports1=[port1],
+        ports2=[port2],
+        resolution=resolution,
+        avoid_layers=avoid_layers,
+        distance=distance,
+        cross_section=cross_section,
+        bend_penalty=bend_penalty,
+        **kwargs,
+    )[0]
 
 
 if __name__ == "__main__":
-    # cross_section = gf.get_cross_section("metal1", width=3)
-
-    # c = gf.Component("get_route_astar")
-    # w = gf.components.straight(cross_section=cross_section)
-
-    # left = c << w
-    # right = c << w
-    # right.move((100, 80))
-
-    # obstacle = gf.components.rectangle(size=(100, 3), layer="M1")
-    # obstacle1 = c << obstacle
-    # obstacle2 = c << obstacle
-    # obstacle1.ymin = 40
-    # obstacle2.xmin = 25
-
-    # port1 = left.ports["e2"]
-    # port2 = right.ports["e2"]
-
-    # routes = get_route_astar(
-    #     component=c,
-    #     port1=port1,
-    #     port2=port2,
-    #     cross_section=cross_section,
-    #     resolution=5,
-    #     distance=6.5,
-    #     avoid_layers=("M1",),
-    # )
-    # c.add(routes.references)
-
     c = gf.Component("get_route_astar_avoid_layers")
     cross_section = gf.get_cross_section("metal1", width=3)
     w = gf.components.straight(cross_section=cross_section)
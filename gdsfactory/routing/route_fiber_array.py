@@ -255,7 +255,6 @@ def route_fiber_array(
     # - then east ports (bottom to top)
     # - then second half of the north ports (right to left)
 
-    ports = []
     north_ports = direction_ports["N"]
     north_start = north_ports[: len(north_ports) // 2]
     north_finish = north_ports[len(north_ports) // 2 :]
@@ -295,7 +294,6 @@ def route_fiber_array(
         ]
 
         io_gratings_lines += [io_gratings[:]]
-        ports += [grating.ports[gc_port_name] for grating in io_gratings]
 
     if optical_routing_type == 0:
         """Basic optical routing, typically fine for small components No
@@ -501,6 +499,12 @@ def route_fiber_array(
             )
         )
 
+    # gratings can move after they are placed, so their ports are read at the end
+    ports = [
+        grating.ports[gc_port_name]
+        for io_gratings in io_gratings_lines
+        for grating in io_gratings
+    ]
     return elements, io_gratings_lines, ports, ports_loopback, optical_ports
 
 
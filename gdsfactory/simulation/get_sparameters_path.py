@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import glob
+import hashlib
+import json
 import os
 import tempfile
-import hashlib
 import pathlib
 from copy import deepcopy
 from functools import partial
@@ -12,7 +14,9 @@ from typing import Optional
 import numpy as np
 
 import gdsfactory as gf
+from gdsfactory.config import logger
 from gdsfactory.generic_tech import LAYER_STACK
+from gdsfactory.component import _rnd
 from gdsfactory.name import clean_value
 from gdsfactory.pdk import get_sparameters_path
 from gdsfactory.typings import ComponentSpec
@@ -25,12 +29,80 @@ def get_kwargs_hash(**kwargs) -> str:
     return hashlib.md5(kwargs_string.encode()).hexdigest()
 
 
-def get_component_hash(component: gf.Component) -> str:
+def get_component_hash(component: gf.Component, precision: float = 1e-4) -> str:
+    """Returns a content hash of the component geometry and ports.
+
+    The hash is computed in memory from the hierarchical geometry hash and the
+    ports, so it does not depend on cell names or GDS timestamps. As the
+    geometry hash is hierarchical, the same polygons split into different
+    cells or references give a different hash.
+
+    Args:
+        component: to hash.
+        precision: rounding precision for polygons and port coordinates.
+    """
+    component_hash = hashlib.md5(component.hash_geometry(precision=precision).encode())
+    for name in sorted(component.ports):
+        port = component.ports[name]
+        orientation = None if port.orientation is None else port.orientation % 360
+        values = [*port.center, port.width, orientation or 0]
+        component_hash.update(
+            f"{name}_{port.layer}_{port.port_type}_{orientation is None}".encode()
+        )
+        component_hash.update(_rnd(np.array(values, dtype=float), precision).tobytes())
+    return component_hash.hexdigest()
+
+
+def get_component_hash_gds(component: gf.Component) -> str:
+    """Returns the md5 of the component GDS file.
+
+    Used by older versions to name the Sparameters files.
+    """
     with tempfile.NamedTemporaryFile() as file:
         path = os.path.abspath(file.name)
         component.write_gds(path)
-        hash = hashlib.md5(file.read()).hexdigest()
-        return hash
+        return hashlib.md5(file.read()).hexdigest()
+
+
+def _get_component_hash_legacy(
+    component: gf.Component, component_hash: str, dirpath: Path
+) -> str:
+    """Returns the GDS hash of a component, stored in dirpath by content hash.
+
+    The GDS is written once per component and directory, not for every
+    simulation setting.
+    """
+    filepath = dirpath / ".legacy_hashes.json"
+    hashes = json.loads(filepath.read_text()) if filepath.exists() else {}
+    if component_hash not in hashes:
+        hashes[component_hash] = get_component_hash_gds(component)
+        filepath_tmp = filepath.with_suffix(f".{os.getpid()}.tmp")
+        filepath_tmp.write_text(json.dumps(hashes, indent=2, sort_keys=True))
+        os.replace(filepath_tmp, filepath)
+    return hashes[component_hash]
+
+
+def _migrate_sparameters_path(
+    component: gf.Component, filepath: Path, component_hash: str, kwargs_hash: str
+) -> None:
+    """Renames a Sparameters file named with the GDS hash to filepath.
+
+    Legacy and new file names look alike, so the GDS hash is only looked up
+    when there are files for the component name, and is then stored in the
+    directory so the GDS is not written again for other settings.
+    """
+    pattern = f"{glob.escape(component.name)}_*.npz"
+    if filepath.exists() or not any(filepath.parent.glob(pattern)):
+        return
+
+    component_hash = _get_component_hash_legacy(
+        component, component_hash, filepath.parent
+    )
+    simulation_hash = hashlib.md5((component_hash + kwargs_hash).encode()).hexdigest()
+    filepath_legacy = filepath.parent / f"{component.name}_{simulation_hash}.npz"
+    if filepath_legacy.exists():
+        os.replace(filepath_legacy, filepath)
+        logger.info(f"Renamed {str(filepath_legacy)!r} to {str(filepath)!r}")
 
 
 def _get_sparameters_path(
@@ -63,7 +135,9 @@ def _get_sparameters_path(
     simulation_hash = hashlib.md5((component_hash + kwargs_hash).encode()).hexdigest()
 
     dirpath.mkdir(exist_ok=True, parents=True)
-    return dirpath / f"{component.name}_{simulation_hash}.npz"
+    filepath = dirpath / f"{component.name}_{simulation_hash}.npz"
+    _migrate_sparameters_path(component, filepath, component_hash, kwargs_hash)
+    return filepath
 
 
 def _get_sparameters_data(**kwargs) -> np.ndarray:
@@ -104,9 +178,9 @@ def test_get_sparameters_path(test: bool = True) -> None:
     p3 = get_sparameters_path_lumerical(c, material_name_to_lumerical=dict(si=3.6))
 
     if test:
-        name1 = "straight_1f90b7ca"
-        name2 = "straight_9b7c7e58"
-        name3 = "straight_c752dd0a"
+        name1 = "straight_1d264d2aefb3be9ffe0602d9e40e9199"
+        name2 = "straight_8ac4a3443a0da1893582f89639094a9b"
+        name3 = "straight_0ebac95855b80decbc53fa9f00788516"
 
         assert p1.stem == name1, p1.stem
         assert p2.stem == name2, p2.stem
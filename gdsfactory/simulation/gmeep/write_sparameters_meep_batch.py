@@ -2,30 +2,24 @@
 
 from __future__ import annotations
 
+import functools
 import multiprocessing
 import pathlib
 import shutil
-import time
 from pathlib import Path
-from pprint import pprint
 from typing import Dict, List, Optional
 
-import numpy as np
 import pydantic
-from tqdm.auto import tqdm
 
 import gdsfactory as gf
-from gdsfactory.component import Component
 from gdsfactory.config import logger, sparameters_path
 from gdsfactory.pdk import get_layer_stack
 from gdsfactory.simulation import port_symmetries
-from gdsfactory.simulation.get_sparameters_path import (
-    get_sparameters_path_meep as get_sparameters_path,
-)
-from gdsfactory.simulation.gmeep.write_sparameters_meep import remove_simulation_kwargs
 from gdsfactory.simulation.gmeep.write_sparameters_meep_mpi import (
-    write_sparameters_meep_mpi,
+    _mpi_command,
+    _write_mpi_script,
 )
+from gdsfactory.simulation.scheduler import Job, run_jobs
 from gdsfactory.technology import LayerStack
 
 core_materials = multiprocessing.cpu_count()
@@ -48,7 +42,13 @@ def write_sparameters_meep_batch(
 
     Given a list of write_sparameters_meep keyword arguments `jobs` launches them in
     different cores using MPI where each simulation runs with `cores_per_run` cores.
-    If there are more simulations than cores each batch runs sequentially.
+    If there are more simulations than cores, the next job starts as soon as
+    a running job finishes and frees its cores.
+    Each job can set its own `cores` and a `priority` (higher starts first).
+
+    Jobs with existing Sparameters are skipped unless overwrite is True,
+    so calling it again resumes an interrupted sweep.
+    Failed jobs are logged and their output is kept in temp_dir.
 
 
     Args
@@ -57,7 +57,7 @@ def write_sparameters_meep_batch(
         cores_per_run: number of processors to assign to each component simulation.
         total_cores: total number of cores to use.
         temp_dir: temporary directory to hold simulation files.
-        delete_temp_files: deletes temp_dir when done.
+        delete_temp_files: deletes temp_dir when all jobs succeed.
         dirpath: directory to store Sparameters.
         layer_stack: contains layer to thickness, zmin and material.
             Defaults to active pdk.layer_stack.
@@ -103,91 +103,47 @@ def write_sparameters_meep_batch(
 
     """
     layer_stack = layer_stack or get_layer_stack()
+    temp_dir = pathlib.Path(temp_dir)
 
-    # Parse jobs
+    filepaths = []
     jobs_to_run = []
-    for job in jobs:
-        component = job["component"]
-        component = gf.get_component(component)
-        assert isinstance(component, Component)
-        settings = remove_simulation_kwargs(kwargs)
-        filepath = job.get(
-            "filepath",
-            get_sparameters_path(
-                component=component,
-                dirpath=dirpath,
-                layer_stack=layer_stack,
-                **settings,
-            ),
+    for i, job in enumerate(jobs):
+        job = {**kwargs, **job}
+        cores = job.pop("cores", cores_per_run)
+        priority = job.pop("priority", 0)
+        job.setdefault("dirpath", dirpath)
+        job.setdefault("layer_stack", layer_stack)
+        temp_file_str = f"write_sparameters_meep_mpi_{i}"
+        filepath, script_file = _write_mpi_script(
+            temp_dir=temp_dir, temp_file_str=temp_file_str, **job
         )
-        if filepath.exists():
-            job.update(**kwargs)
-            if job.get("overwrite", kwargs.get("overwrite", False)):
-                pathlib.Path.unlink(filepath)
-                logger.info(
-                    f"Simulation {filepath!r} found and overwrite is True. "
-                    "Deleting file and adding it to the queue."
-                )
-                jobs_to_run.append(job)
-            else:
-                logger.info(
-                    f"Simulation {filepath!r} found exists and "
-                    "overwrite is False. Removing it from the queue."
-                )
-        else:
-            logger.info(f"Simulation {filepath!r} not found. Adding it to the queue")
-            jobs_to_run.append(job)
-
-    jobs = jobs_to_run
-
-    batches = int(np.ceil(cores_per_run * len(jobs) / total_cores))
-    jobs_per_batch = int(np.floor(total_cores / cores_per_run))
-    njobs = len(jobs)
-    logger.info(f"Running {njobs} simulations")
-    logger.info(f"total_cores = {total_cores} with cores_per_run = {cores_per_run}")
-    logger.info(f"Running {batches} batches with up to {jobs_per_batch} jobs each.")
-
-    i = 0
-    # For each batch in the pool
-    for j in tqdm(range(batches)):
-        filepaths = []
-
-        # For each job in the batch
-        for k in range(jobs_per_batch):
-            if i >= njobs:
-                continue
-            logger.info(f"Task {k} of batch {j} is job {i}")
-
-            # Obtain current job
-            simulations_settings = jobs[i]
-
-            pprint(simulations_settings)
-
-            filepath = write_sparameters_meep_mpi(
-                cores=cores_per_run,
-                temp_dir=temp_dir,
-                temp_file_str=f"write_sparameters_meep_mpi_{i}",
-                wait_to_finish=False,
-                **simulations_settings,
+        filepaths.append(filepath)
+        if script_file is None:
+            continue
+
+        logger.info(f"Simulation {filepath!r} not found. Adding it to the queue")
+        jobs_to_run.append(
+            Job(
+                command=functools.partial(_mpi_command, script_file=script_file),
+                cores=cores,
+                priority=priority,
+                filepath=filepath,
+                log_path=temp_dir / f"{temp_file_str}.log",
+                name=filepath.stem,
             )
-            filepaths.append(filepath)
-
-            # Increment task number
-            i += 1
-
-        # Wait for batch to end
-        done = False
-        num_pool_jobs = len(filepaths)
-        while not done:
-            # Check if all jobs finished
-            jobs_done = sum(1 for filepath in filepaths if filepath.exists())
-            if jobs_done == num_pool_jobs:
-                done = True
-            else:
-                time.sleep(1)
+        )
 
-    temp_dir = pathlib.Path(temp_dir)
-    if temp_dir.exists() and delete_temp_files:
+    logger.info(f"Running {len(jobs_to_run)} simulations")
+    logger.info(f"total_cores = {total_cores} with cores_per_run = {cores_per_run}")
+    failed = run_jobs(jobs_to_run, total_cores=total_cores)
+
+    if failed:
+        names = [job.name for job in failed]
+        logger.error(
+            f"{len(failed)} of {len(jobs_to_run)} simulations failed: {names}. "
+            f"Logs in {str(temp_dir)!r}"
+        )
+    elif temp_dir.exists() and delete_temp_files:
         shutil.rmtree(temp_dir)
     return filepaths
 
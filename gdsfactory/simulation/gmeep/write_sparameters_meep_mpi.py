@@ -9,7 +9,7 @@ import subprocess
 import sys
 import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 import pydantic
 
@@ -39,6 +39,91 @@ def _python() -> str:
     return sys.executable
 
 
+def _mpi_command(cores: int, script_file: Path) -> List[str]:
+    """Returns the mpirun command that runs a simulation script."""
+    return ["mpirun", "-np", str(cores), _python(), str(script_file)]
+
+
+def _write_mpi_script(
+    component: ComponentSpec,
+    layer_stack: Optional[LayerStack] = None,
+    filepath: Optional[PathType] = None,
+    dirpath: Optional[PathType] = None,
+    temp_dir: Path = temp_dir_default,
+    temp_file_str: str = "write_sparameters_meep_mpi",
+    overwrite: bool = False,
+    **kwargs,
+) -> Tuple[Path, Optional[Path]]:
+    """Writes the simulation files and returns Sparameters filepath and script.
+
+    The script is None if the Sparameters exist and overwrite is False.
+    """
+    for setting in kwargs:
+        if setting not in settings_write_sparameters_meep:
+            raise ValueError(f"{setting!r} not in {settings_write_sparameters_meep}")
+
+    component = gf.get_component(component)
+    assert isinstance(component, Component)
+
+    layer_stack = layer_stack or get_layer_stack()
+
+    settings = remove_simulation_kwargs(kwargs)
+    filepath = filepath or get_sparameters_path(
+        component=component,
+        dirpath=dirpath,
+        layer_stack=layer_stack,
+        **settings,
+    )
+    filepath = pathlib.Path(filepath)
+    if filepath.exists() and not overwrite:
+        logger.info(f"Simulation {filepath!r} already exists")
+        return filepath, None
+
+    if filepath.exists() and overwrite:
+        filepath.unlink()
+
+    # Save all the simulation arguments for later retrieval
+    temp_dir.mkdir(exist_ok=True, parents=True)
+    tempfile = temp_dir / temp_file_str
+    filepath_json = tempfile.with_suffix(".json")
+    logger.info(f"Write {filepath_json!r}")
+
+    layer_stack_json = layer_stack.json()
+    filepath_json.write_text(layer_stack_json)
+
+    parameters_file = tempfile.with_suffix(".pkl")
+    with open(parameters_file, "wb") as outp:
+        pickle.dump(settings, outp, pickle.HIGHEST_PROTOCOL)
+
+    # Save component to disk through gds for gdstk compatibility
+    component_file = tempfile.with_suffix(".gds")
+    component.write_gds_with_metadata(component_file)
+
+    # Write execution file
+    script_lines = [
+        "import pathlib\n",
+        "import pickle\n",
+        "from gdsfactory.simulation.gmeep import write_sparameters_meep\n\n",
+        "from gdsfactory.read import import_gds\n",
+        "from gdsfactory.technology import LayerStack\n\n",
+        "if __name__ == '__main__':\n",
+        f"\twith open(\"{parameters_file}\", 'rb') as inp:\n",
+        "\t\tparameters_dict = pickle.load(inp)\n\n",
+        f"\tcomponent = import_gds({str(component_file)!r}, read_metadata=True)\n",
+        f"\tfilepath_json = pathlib.Path({str(filepath_json)!r})\n",
+        "\tlayer_stack = LayerStack.parse_raw(filepath_json.read_text())\n",
+        f"\twrite_sparameters_meep(component=component, overwrite={overwrite}, "
+        f"layer_stack=layer_stack, filepath={str(filepath)!r},",
+    ]
+    script_lines.extend(f'\t\t{key} = parameters_dict["{key}"],\n' for key in settings)
+    script_lines.append("\t)")
+
+    script_file = tempfile.with_suffix(".py")
+    with open(script_file, "w") as script_file_obj:
+        script_file_obj.writelines(script_lines)
+    return filepath, script_file
+
+
 @pydantic.validate_arguments
 def write_sparameters_meep_mpi(
     component: ComponentSpec,
@@ -128,70 +213,20 @@ def write_sparameters_meep_mpi(
         write stdout to file, maybe simulation logs too.
 
     """
-    for setting in kwargs:
-        if setting not in settings_write_sparameters_meep:
-            raise ValueError(f"{setting!r} not in {settings_write_sparameters_meep}")
-
-    component = gf.get_component(component)
-    assert isinstance(component, Component)
-
-    layer_stack = layer_stack or get_layer_stack()
-
-    settings = remove_simulation_kwargs(kwargs)
-    filepath = filepath or get_sparameters_path(
+    filepath, script_file = _write_mpi_script(
         component=component,
-        dirpath=dirpath,
         layer_stack=layer_stack,
-        **settings,
+        filepath=filepath,
+        dirpath=dirpath,
+        temp_dir=temp_dir,
+        temp_file_str=temp_file_str,
+        overwrite=overwrite,
+        **kwargs,
     )
-    filepath = pathlib.Path(filepath)
-    if filepath.exists() and not overwrite:
-        logger.info(f"Simulation {filepath!r} already exists")
+    if script_file is None:
         return filepath
 
-    if filepath.exists() and overwrite:
-        filepath.unlink()
-
-    # Save all the simulation arguments for later retrieval
-    temp_dir.mkdir(exist_ok=True, parents=True)
-    tempfile = temp_dir / temp_file_str
-    filepath_json = tempfile.with_suffix(".json")
-    logger.info(f"Write {filepath_json!r}")
-
-    layer_stack_json = layer_stack.json()
-    filepath_json.write_text(layer_stack_json)
-
-    parameters_file = tempfile.with_suffix(".pkl")
-    with open(parameters_file, "wb") as outp:
-        pickle.dump(settings, outp, pickle.HIGHEST_PROTOCOL)
-
-    # Save component to disk through gds for gdstk compatibility
-    component_file = tempfile.with_suffix(".gds")
-    component.write_gds_with_metadata(component_file)
-
-    # Write execution file
-    script_lines = [
-        "import pathlib\n",
-        "import pickle\n",
-        "from gdsfactory.simulation.gmeep import write_sparameters_meep\n\n",
-        "from gdsfactory.read import import_gds\n",
-        "from gdsfactory.technology import LayerStack\n\n",
-        "if __name__ == '__main__':\n",
-        f"\twith open(\"{parameters_file}\", 'rb') as inp:\n",
-        "\t\tparameters_dict = pickle.load(inp)\n\n",
-        f"\tcomponent = import_gds({str(component_file)!r}, read_metadata=True)\n",
-        f"\tfilepath_json = pathlib.Path({str(filepath_json)!r})\n",
-        "\tlayer_stack = LayerStack.parse_raw(filepath_json.read_text())\n",
-        f"\twrite_sparameters_meep(component=component, overwrite={overwrite}, "
-        f"layer_stack=layer_stack, filepath={str(filepath)!r},",
-    ]
-    script_lines.extend(f'\t\t{key} = parameters_dict["{key}"],\n' for key in settings)
-    script_lines.append("\t)")
-
-    script_file = tempfile.with_suffix(".py")
-    with open(script_file, "w") as script_file_obj:
-        script_file_obj.writelines(script_lines)
-    command = f"mpirun -np {cores} {_python()} {script_file}"
+    command = " ".join(_mpi_command(cores, script_file))
     logger.info(command)
     logger.info(str(filepath))
 
@@ -1,37 +1,121 @@
-"""Like Gmsh OCC kernel BooleanFragments, but (1) uses a meshorder to avoid generation of new surfaces, which (2) allows keeping track of physicals."""
+"""Like Gmsh OCC kernel BooleanFragments, but (1) uses a meshorder to avoid generation of new surfaces, which (2) allows keeping track of physicals.
+
+Only the lines with overlapping bounding boxes are intersected, using a shapely STRtree.
+"""
 from collections import OrderedDict
+from typing import List, Sequence
 
+import numpy as np
 from shapely.geometry import LineString, MultiLineString, MultiPolygon, Polygon
-from shapely.ops import linemerge, split
+from shapely.ops import linemerge
+from shapely.strtree import STRtree
+
+from gdsfactory.simulation.gmsh.parse_gds import query_indices, tile_shapes
+
+
+def get_lines(shape) -> List[LineString]:
+    """Returns the exterior and interior lines of a polygon, or the line itself."""
+    if shape.geom_type == "Polygon":
+        return [LineString(shape.exterior)] + [
+            LineString(interior) for interior in shape.interiors
+        ]
+    return [shape]
 
-from gdsfactory.simulation.gmsh.parse_gds import tile_shapes
-import numpy as np
+
+def get_break_points(intersection) -> List:
+    """Returns the points where a line has to be broken for an intersection.
+
+    These are the intersection points and the ends of the overlapping segments.
+    """
+    if intersection.is_empty:
+        return []
+    if intersection.geom_type == "Point":
+        return [intersection]
+    if intersection.geom_type == "LineString":
+        return list(intersection.boundary.geoms)
+    if intersection.geom_type == "MultiLineString":
+        return list(linemerge(intersection).boundary.geoms)
+    return [
+        point for geometry in intersection.geoms for point in get_break_points(geometry)
+    ]
 
 
 def break_line(line, other_line):
-    initial_settings = np.seterr()
-    np.seterr(invalid="ignore")
-    intersections = line.intersection(other_line)
-    np.seterr(**initial_settings)
-    if not intersections.is_empty:
-        for intersection in (
-            intersections.geoms if hasattr(intersections, "geoms") else [intersections]
+    """Returns line with vertices added where other_line intersects it."""
+    return break_line_multiple(line, [other_line])
+
+
+def break_line_multiple(line, other_lines: Sequence, atol: float = 1e-9):
+    """Returns line with vertices added where any of other_lines intersects it.
+
+    All the intersection points are inserted in one pass, at their distance along line.
+
+    Args:
+        line: shapely LineString.
+        other_lines: shapely lines.
+        atol: points farther from line or closer to its vertices are not added.
+    """
+    with np.errstate(invalid="ignore"):
+        points = [
+            point
+            for other_line in other_lines
+            for point in get_break_points(line.intersection(other_line))
+        ]
+    coords = np.asarray(line.coords)
+    vertices = set(map(tuple, coords.tolist()))
+    points = {
+        point.coords[0]: point for point in points if point.coords[0] not in vertices
+    }
+    if not points:
+        return line
+
+    cumulative_length = np.concatenate(
+        [[0], np.cumsum(np.linalg.norm(np.diff(coords, axis=0), axis=1))]
+    )
+    new_points = []
+    for xy, point in points.items():
+        distance = line.project(point)
+        index = int(np.searchsorted(cumulative_length, distance))
+        if (
+            0 < index < len(coords)
+            and distance - cumulative_length[index - 1] > atol
+            and cumulative_length[index] - distance > atol
+            and line.distance(point) <= atol
         ):
-            if intersection.geom_type == "Point":
-                line = linemerge(split(line, intersection))
-            else:
-                new_coords_start, new_coords_end = intersection.boundary.geoms
-                line = linemerge(split(line, new_coords_start))
-                line = linemerge(split(line, new_coords_end))
+            new_points.append((distance, index, xy))
+    if not new_points:
+        return line
+
+    new_points.sort()
+    _, indices, xys = zip(*new_points)
+    return LineString(np.insert(coords, indices, xys, axis=0))
 
-    return line
+
+class _LineIndex:
+    """Spatial index of the lines of all the layers."""
+
+    def __init__(self, shapes_tiled_dict) -> None:
+        self.lines = []
+        self.names = []
+        for name, shapes in shapes_tiled_dict.items():
+            for shape in shapes.geoms if hasattr(shapes, "geoms") else [shapes]:
+                for line in get_lines(shape):
+                    self.lines.append(line)
+                    self.names.append(name)
+        self.tree = STRtree(self.lines)
+
+    def query(self, line, name: str) -> List:
+        """Returns the lines of other layers with bounding boxes overlapping line."""
+        return [
+            self.lines[i]
+            for i in query_indices(self.tree, self.lines, line)
+            if self.names[i] != name
+        ]
 
 
 def break_geometry(shapes_dict: OrderedDict):
     """Break up lines and polygon edges so that plane is tiled with no partially overlapping line segments.
 
-    TODO: breakup in smaller functions.
-
     Args:
         shapes_dict: arbitrary dict of shapely polygons and lines, with ordering setting mesh priority
 
@@ -41,94 +125,26 @@ def break_geometry(shapes_dict: OrderedDict):
     """
     # Break up shapes in order so that plane is tiled with non-overlapping layers
     shapes_tiled_dict = tile_shapes(shapes_dict)
+    line_index = _LineIndex(shapes_tiled_dict)
 
     polygons_broken_dict = OrderedDict()
     lines_broken_dict = OrderedDict()
-    for _first_index, (first_name, _init_first_shapes) in enumerate(
-        shapes_dict.items()
-    ):
+    for first_name in shapes_dict:
         first_shapes = shapes_tiled_dict[first_name]
         broken_shapes = []
         for first_shape in (
             first_shapes.geoms if hasattr(first_shapes, "geoms") else [first_shapes]
         ):
-            # First line exterior
-            first_exterior_line = (
-                LineString(first_shape.exterior)
-                if first_shape.geom_type == "Polygon"
-                else first_shape
-            )
-            for second_name, second_shapes in shapes_dict.items():
-                # Do not compare to itself
-                if second_name != first_name:
-                    second_shapes = shapes_tiled_dict[second_name]
-                    for second_shape in (
-                        second_shapes.geoms
-                        if hasattr(second_shapes, "geoms")
-                        else [second_shapes]
-                    ):
-                        # Second line exterior
-                        second_exterior_line = (
-                            LineString(second_shape.exterior)
-                            if second_shape.geom_type == "Polygon"
-                            else second_shape
-                        )
-                        first_exterior_line = break_line(
-                            first_exterior_line, second_exterior_line
-                        )
-                        # Second line interiors
-                        for second_interior_line in (
-                            second_shape.interiors
-                            if second_shape.geom_type == "Polygon"
-                            else []
-                        ):
-                            second_interior_line = LineString(second_interior_line)
-                            first_exterior_line = break_line(
-                                first_exterior_line, second_interior_line
-                            )
-            # First line interiors
-            if first_shape.geom_type in ["Polygon", "MultiPolygon"]:
-                first_shape_interiors = []
-                for first_interior_line in first_shape.interiors:
-                    first_interior_line = LineString(first_interior_line)
-                    for second_name, second_shapes in shapes_dict.items():
-                        if second_name != first_name:
-                            second_shapes = shapes_tiled_dict[second_name]
-                            for second_shape in (
-                                second_shapes.geoms
-                                if hasattr(second_shapes, "geoms")
-                                else [second_shapes]
-                            ):
-                                # Exterior
-                                second_exterior_line = (
-                                    LineString(second_shape.exterior)
-                                    if second_shape.geom_type == "Polygon"
-                                    else second_shape
-                                )
-                                first_interior_line = break_line(
-                                    first_interior_line, second_exterior_line
-                                )
-                                # Interiors
-                                for second_interior_line in (
-                                    second_shape.interiors
-                                    if second_shape.geom_type == "Polygon"
-                                    else []
-                                ):
-                                    second_interior_line = LineString(
-                                        second_interior_line
-                                    )
-                                    first_interior_line = break_line(
-                                        first_interior_line, second_interior_line
-                                    )
-                    first_shape_interiors.append(first_interior_line)
-            if first_shape.geom_type in ["Polygon", "MultiPolygon"]:
-                broken_shapes.append(
-                    Polygon(first_exterior_line, holes=first_shape_interiors)
-                )
+            first_lines = [
+                break_line_multiple(line, line_index.query(line, first_name))
+                for line in get_lines(first_shape)
+            ]
+            if first_shape.geom_type == "Polygon":
+                broken_shapes.append(Polygon(first_lines[0], holes=first_lines[1:]))
             else:
-                broken_shapes.append(LineString(first_exterior_line))
+                broken_shapes.append(LineString(first_lines[0]))
         if broken_shapes:
-            if first_shape.geom_type in ["Polygon", "MultiPolygon"]:
+            if first_shape.geom_type == "Polygon":
                 polygons_broken_dict[first_name] = (
                     MultiPolygon(broken_shapes)
                     if len(broken_shapes) > 1
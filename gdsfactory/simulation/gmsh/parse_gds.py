@@ -1,9 +1,14 @@
 """Preprocessing involving mostly the GDS polygons."""
 from __future__ import annotations
 
-import gdsfactory as gf
+from typing import List
+
+import numpy as np
 import shapely
 from shapely.geometry import LineString, MultiLineString, MultiPolygon, Polygon
+from shapely.strtree import STRtree
+
+import gdsfactory as gf
 
 
 def round_coordinates(geom, ndigits=4):
@@ -78,35 +83,48 @@ def to_lines(geometries):
             yield from geometry.geoms
 
 
+def query_indices(tree: STRtree, geometries, geometry) -> List[int]:
+    """Returns the sorted indices of the geometries of tree with bounding boxes overlapping geometry."""
+    hits = tree.query(geometry)
+    # shapely<2 returns the geometries instead of their indices
+    if len(hits) and not isinstance(hits[0], (int, np.integer)):
+        index = {id(geometry): i for i, geometry in enumerate(geometries)}
+        hits = [index[id(hit)] for hit in hits]
+    return sorted(int(i) for i in hits)
+
+
 def tile_shapes(shapes_dict):
-    """Break up shapes in order so that plane is tiled with non-overlapping layers."""
+    """Break up shapes in order so that plane is tiled with non-overlapping layers.
+
+    Each shape is only cut by the union of the higher shapes that overlap its bounding box.
+    """
     shapes_tiled_dict = {}
-    for lower_index, (lower_name, lower_shapes) in reversed(
-        list(enumerate(shapes_dict.items()))
-    ):
-        tiled_lower_shapes = []
-        for lower_shape in (
-            lower_shapes.geoms if hasattr(lower_shapes, "geoms") else [lower_shapes]
-        ):
-            diff_shape = lower_shape
-            for _higher_index, (_higher_name, higher_shapes) in reversed(
-                list(enumerate(shapes_dict.items()))[:lower_index]
-            ):
-                for higher_shape in (
-                    higher_shapes.geoms
-                    if hasattr(higher_shapes, "geoms")
-                    else [higher_shapes]
-                ):
-                    diff_shape = diff_shape.difference(higher_shape)
-            tiled_lower_shapes.append(diff_shape)
-        if tiled_lower_shapes and tiled_lower_shapes[0].geom_type in [
-            "Polygon",
-            "MultiPolygon",
-        ]:
-            shapes_tiled_dict[lower_name] = MultiPolygon(
-                to_polygons(tiled_lower_shapes)
+    higher_shapes = []
+    for name, shapes in shapes_dict.items():
+        shapes = list(shapes.geoms) if hasattr(shapes, "geoms") else [shapes]
+        tree = STRtree(higher_shapes) if higher_shapes else None
+        tiled_shapes = []
+        for shape in shapes:
+            overlapping = (
+                [
+                    higher_shapes[i]
+                    for i in query_indices(tree, higher_shapes, shape)
+                    if higher_shapes[i].intersects(shape)
+                ]
+                if tree
+                else []
             )
+            if len(overlapping) == 1:
+                shape = shape.difference(overlapping[0])
+            elif overlapping:
+                shape = shape.difference(shapely.ops.unary_union(overlapping))
+            tiled_shapes.append(shape)
+        higher_shapes.extend(shapes)
+
+        if tiled_shapes and tiled_shapes[0].geom_type in ["Polygon", "MultiPolygon"]:
+            shapes_tiled_dict[name] = MultiPolygon(to_polygons(tiled_shapes))
         else:
-            shapes_tiled_dict[lower_name] = MultiLineString(tiled_lower_shapes)
+            shapes_tiled_dict[name] = MultiLineString(tiled_shapes)
 
-    return shapes_tiled_dict
+    # lowest priority first
+    return dict(reversed(shapes_tiled_dict.items()))
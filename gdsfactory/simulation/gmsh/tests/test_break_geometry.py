@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from shapely.geometry import LineString, Polygon, box
+
+import gdsfactory as gf
+from gdsfactory.simulation.gmsh.break_geometry import break_geometry
+from gdsfactory.simulation.gmsh.parse_gds import fuse_polygons, tile_shapes
+
+
+def get_grating_shapes(n_periods: int = 20) -> OrderedDict:
+    c = gf.components.grating_coupler_elliptical(n_periods=n_periods)
+    shapes = OrderedDict(
+        core=fuse_polygons(c, "core", (1, 0)),
+        clad=fuse_polygons(c, "clad", (2, 0)),
+    )
+    shapes["box"] = box(*c.bbox.flatten()).buffer(2, join_style=2)
+    return shapes
+
+
+def test_break_geometry_line() -> None:
+    shapes = OrderedDict(
+        line=LineString([(-1, 0.5), (3, 0.5)]),
+        left=box(0, 0, 1, 1),
+        right=box(1, 0, 2, 2),
+    )
+    polygons, lines = break_geometry(shapes)
+
+    assert list(lines["line"].coords) == [
+        (-1, 0.5),
+        (0, 0.5),
+        (1, 0.5),
+        (2, 0.5),
+        (3, 0.5),
+    ]
+    # the right box gets the corners of the left box on its shared edge
+    assert {(1.0, 0.0), (1.0, 1.0), (1.0, 0.5)} <= set(
+        polygons["right"].exterior.coords
+    )
+    assert polygons["left"].equals(shapes["left"])
+
+
+def test_break_geometry_grating() -> None:
+    shapes = get_grating_shapes()
+    tiled = tile_shapes(shapes)
+    polygons, lines = break_geometry(shapes)
+
+    assert not lines
+    for name in shapes:
+        assert polygons[name].symmetric_difference(tiled[name]).area < 1e-9
+
+    # the teeth have the same vertices as the holes they leave in the other layers
+    vertices = {
+        xy
+        for name in ["clad", "box"]
+        for ring in [polygons[name].exterior, *polygons[name].interiors]
+        for xy in ring.coords
+    }
+    for tooth in polygons["core"].geoms:
+        assert isinstance(tooth, Polygon)
+        assert set(tooth.exterior.coords) <= vertices
+
+
+if __name__ == "__main__":
+    for n_periods in [100, 300]:
+        shapes = get_grating_shapes(n_periods)
+        t0 = time.perf_counter()
+        break_geometry(shapes)
+        print(f"{n_periods} teeth {time.perf_counter() - t0:.2f} s")
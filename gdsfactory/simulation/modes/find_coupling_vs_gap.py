@@ -7,10 +7,11 @@ import meep as mp
 import numpy as np
 import pandas as pd
 import pydantic
-from tqdm.auto import tqdm
 
+from gdsfactory.pdk import get_modes_path
 from gdsfactory.simulation.modes.find_modes import find_modes_coupler
-from gdsfactory.typings import Optional, PathType
+from gdsfactory.simulation.sweep import get_sweep_path, sweep
+from gdsfactory.typings import Dict, Optional, PathType
 
 
 def coupling_length(
@@ -57,6 +58,24 @@ def find_coupling(
     )
 
 
+def _find_coupling(
+    gap: float,
+    wavelength: float,
+    guess: Optional[Dict[str, float]] = None,
+    **kwargs,
+) -> Dict[str, float]:
+    modes = find_modes_coupler(
+        gaps=(gap,),
+        wavelength=wavelength,
+        neff_guess=[guess["ne"], guess["no"]] if guess else None,
+        **kwargs,
+    )
+    n1 = modes[1].neff
+    n2 = modes[2].neff
+    lc = coupling_length(n1, n2, wavelength=wavelength)
+    return dict(ne=n1, no=n2, lc=lc, dn=n1 - n2)
+
+
 @pydantic.validate_arguments
 def find_coupling_vs_gap(
     gap1: float = 0.2,
@@ -67,10 +86,15 @@ def find_coupling_vs_gap(
     parity=mp.NO_PARITY,
     filepath: Optional[PathType] = None,
     overwrite: bool = False,
+    cache: Optional[bool] = True,
+    n_workers: int = 1,
     **kwargs,
 ) -> pd.DataFrame:
     """Returns coupling vs gap pandas DataFrame.
 
+    Each gap is solved with the effective indices of the previous gap
+    as initial guess.
+
     Args:
         gap1: starting gap in um.
         gap2: end gap in um.
@@ -80,6 +104,9 @@ def find_coupling_vs_gap(
         parity: for symmetries.
         filepath: optional filepath to cache results on disk.
         overwrite: overwrites results even if found on disk.
+        cache: stores the sweep in the modes path and only solves the gaps
+            that are not stored yet, so you can extend the sweep range.
+        n_workers: number of processes to split the gaps.
 
     Keyword Args:
         core_width: core_width (um) for the symmetric case.
@@ -103,27 +130,24 @@ def find_coupling_vs_gap(
         return pd.read_csv(filepath)
 
     gaps = np.linspace(gap1, gap2, steps)
-    ne = []
-    no = []
-    dn = []
-    lc = []
-
-    for gap in tqdm(gaps):
-        modes = find_modes_coupler(gaps=(gap,), **kwargs)
-        n1 = modes[1].neff
-        n2 = modes[2].neff
-        coupling = coupling_length(n1, n2)
-
-        ne.append(n1)
-        no.append(n2)
-        dn.append(n1 - n2)
-        lc.append(coupling)
-
-    df = pd.DataFrame(dict(gap=gaps, ne=ne, no=no, lc=lc, dn=dn))
+    settings = dict(nmodes=nmodes, wavelength=wavelength, parity=parity, **kwargs)
+    sweep_path = None
+    if cache and get_modes_path():
+        sweep_path = get_sweep_path("coupling_vs_gap", get_modes_path(), **settings)
+        if overwrite and sweep_path.exists():
+            sweep_path.unlink()
+
+    df = sweep(
+        _find_coupling,
+        points=dict(gap=gaps),
+        filepath=sweep_path,
+        n_workers=n_workers,
+        cache=False,
+        **settings,
+    )
     if filepath:
         filepath = pathlib.Path(filepath)
-        cache = filepath.parent
-        cache.mkdir(exist_ok=True, parents=True)
+        filepath.parent.mkdir(exist_ok=True, parents=True)
         df.to_csv(filepath, index=False)
     return df
 
@@ -41,6 +41,7 @@ def find_mode_dispersion(
         cache: path to save the modes.
         polarization: prefix when saving the modes.
         parity: symmetries mp.ODD_Y mp.EVEN_X for TE, mp.EVEN_Y for TM.
+        neff_guess: initial guess for the effective index at the center wavelength.
 
     """
     w0 = wavelength - wavelength_step
@@ -50,18 +51,20 @@ def find_mode_dispersion(
     core_material = partial(get_index, name=core)
     clad_material = partial(get_index, name=clad)
 
-    m0 = find_modes_waveguide(
-        wavelength=w0,
-        core_material=core_material(w0),
-        clad_material=clad_material(w0),
-        **kwargs,
-    )
     mc = find_modes_waveguide(
         wavelength=wc,
         core_material=core_material(wc),
         clad_material=clad_material(wc),
         **kwargs,
     )
+    # the center modes are close to the modes at the neighbouring wavelengths
+    kwargs.update(neff_guess=[mode.neff for _, mode in sorted(mc.items())])
+    m0 = find_modes_waveguide(
+        wavelength=w0,
+        core_material=core_material(w0),
+        clad_material=clad_material(w0),
+        **kwargs,
+    )
     m1 = find_modes_waveguide(
         wavelength=w1,
         core_material=core_material(w1),
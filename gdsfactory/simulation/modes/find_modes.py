@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import pickle
 from functools import partial
-from typing import Dict
+from typing import Dict, List, Optional, Union
 
 import meep as mp
 import numpy as np
@@ -38,6 +38,7 @@ def find_modes_waveguide(
     cache: bool = True,
     overwrite: bool = False,
     single_waveguide: bool = True,
+    neff_guess: Optional[Union[float, List[float]]] = None,
     **kwargs,
 ) -> Dict[int, Mode]:
     """Computes mode effective and group index for a rectangular waveguide.
@@ -93,6 +94,9 @@ def find_modes_waveguide(
         parity: mp.ODD_Y mp.EVEN_X for TE, mp.EVEN_Y for TM.
         cache: directory path to cache modes. None disables the file cache.
         overwrite: forces simulating again.
+        single_waveguide: if False computes the modes of a coupler.
+        neff_guess: initial guess for the effective index of each mode,
+            for example from a neighbouring point of a sweep. Defaults to 2.02.
         kwargs: waveguide settings.
 
     Keyword Args:
@@ -165,6 +169,13 @@ def find_modes_waveguide(
                 modes[i] = mode
             return modes
 
+    if neff_guess is None:
+        kmag_guess = omega * 2.02
+    else:
+        neff_guess = list(np.atleast_1d(neff_guess))
+        neff_guess += neff_guess[-1:] * (nmodes + 1 - len(neff_guess))
+        kmag_guess = [omega * neff for neff in neff_guess[: nmodes + 1]]
+
     # Output the x component of the Poynting vector for mode_number bands at omega
     disable_print()
     k = mode_solver.find_k(
@@ -174,7 +185,7 @@ def find_modes_waveguide(
         mode_number + nmodes,
         mp.Vector3(1),
         tol,
-        omega * 2.02,
+        kmag_guess,
         omega * 0.01,
         omega * 10,
         # mpb.output_poynting_x,
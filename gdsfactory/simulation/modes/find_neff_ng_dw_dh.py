@@ -17,7 +17,10 @@ import pydantic
 from scipy.interpolate import interp2d
 
 from gdsfactory.config import PATH
+from gdsfactory.pdk import get_modes_path
 from gdsfactory.simulation.modes.find_mode_dispersion import find_mode_dispersion
+from gdsfactory.simulation.sweep import get_sweep_path, sweep
+from gdsfactory.typings import Dict, Optional
 
 PATH.modes = pathlib.Path.cwd() / "data"
 
@@ -26,6 +29,23 @@ width0 = 465 * nm
 thickness0 = 215 * nm
 
 
+def _find_neff_ng(
+    dw: float,
+    dh: float,
+    width: float,
+    thickness: float,
+    guess: Optional[Dict[str, float]] = None,
+    **kwargs,
+) -> Dict[str, float]:
+    m = find_mode_dispersion(
+        core_width=width + dw,
+        core_thickness=thickness + dh,
+        neff_guess=guess["neff"] if guess else None,
+        **kwargs,
+    )
+    return dict(neff=m.neff, ng=m.ng)
+
+
 @pydantic.validate_arguments
 def find_neff_ng_dw_dh(
     width: float = width0,
@@ -37,10 +57,16 @@ def find_neff_ng_dw_dh(
     mode_number: int = 1,
     core: str = "Si",
     clad: str = "SiO2",
+    cache: Optional[bool] = True,
+    overwrite: bool = False,
+    n_workers: int = 1,
     **kwargs,
 ) -> pd.DataFrame:
     """Computes group and effective index for different widths and heights.
 
+    Each point is solved with the effective index of the previous point
+    as initial guess.
+
     Args:
         width: nominal waveguide width in um.
         thickness: nominal waveguide thickness in um.
@@ -51,6 +77,10 @@ def find_neff_ng_dw_dh(
         mode_number: mode index to compute (1: fundamental mode).
         core: core material name.
         clad: clad material name.
+        cache: stores the sweep in the modes path and only solves the points
+            that are not stored yet, so you can extend the sweep range.
+        overwrite: solves all the points even if they are stored.
+        n_workers: number of processes to split the points.
 
     Keyword Args:
         core_thickness: wg height (um).
@@ -62,7 +92,6 @@ def find_neff_ng_dw_dh(
         plot: if True plots mode.
         logscale: plots in logscale.
         plotH: plot magnetic field.
-        cache: path to save the modes.
         polarization: prefix when saving the modes.
         parity: symmetries mp.ODD_Y mp.EVEN_X for TE, mp.EVEN_Y for TM.
 
@@ -70,28 +99,30 @@ def find_neff_ng_dw_dh(
     dw = np.linspace(-delta_width, delta_width, steps)
     dh = np.linspace(-delta_thickness, delta_thickness, steps)
 
-    neffs = []
-    ngs = []
-    dhs = []
-    dws = []
-
-    for dwi in dw:
-        for dhi in dh:
-            m = find_mode_dispersion(
-                core=core,
-                clad=clad,
-                core_width=width + dwi,
-                core_thickness=thickness + dhi,
-                wavelength=wavelength,
-                mode_number=mode_number,
-                **kwargs,
-            )
-            neffs.append(m.neff)
-            ngs.append(m.ng)
-            dws.append(dwi)
-            dhs.append(dhi)
-
-    return pd.DataFrame(dict(dw=dws, dh=dhs, neff=neffs, ng=ngs))
+    dws, dhs = (a.ravel() for a in np.meshgrid(dw, dh, indexing="ij"))
+    settings = dict(
+        width=width,
+        thickness=thickness,
+        core=core,
+        clad=clad,
+        wavelength=wavelength,
+        mode_number=mode_number,
+        **kwargs,
+    )
+    sweep_path = None
+    if cache and get_modes_path():
+        sweep_path = get_sweep_path("neff_ng_dw_dh", get_modes_path(), **settings)
+        if overwrite and sweep_path.exists():
+            sweep_path.unlink()
+
+    return sweep(
+        _find_neff_ng,
+        points=dict(dw=dws, dh=dhs),
+        filepath=sweep_path,
+        n_workers=n_workers,
+        cache=False,
+        **settings,
+    )
 
 
 def plot_neff_ng_dw_dh(
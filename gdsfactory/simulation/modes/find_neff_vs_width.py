@@ -7,10 +7,23 @@ import meep as mp
 import numpy as np
 import pandas as pd
 import pydantic
-from tqdm.auto import tqdm
 
+from gdsfactory.pdk import get_modes_path
 from gdsfactory.simulation.modes.find_modes import find_modes_waveguide
-from gdsfactory.typings import Optional, PathType
+from gdsfactory.simulation.sweep import get_sweep_path, sweep
+from gdsfactory.typings import Dict, Optional, PathType
+
+
+def _find_neff(
+    core_width: float, nmodes: int, guess: Optional[Dict[str, float]] = None, **kwargs
+) -> Dict[str, float]:
+    modes = find_modes_waveguide(
+        core_width=core_width,
+        nmodes=nmodes,
+        neff_guess=list(guess.values()) if guess else None,
+        **kwargs,
+    )
+    return {str(i): modes[i].neff for i in range(1, nmodes + 1)}
 
 
 @pydantic.validate_arguments
@@ -23,10 +36,15 @@ def find_neff_vs_width(
     parity=mp.NO_PARITY,
     filepath: Optional[PathType] = None,
     overwrite: bool = False,
+    cache: Optional[bool] = True,
+    n_workers: int = 1,
     **kwargs,
 ) -> pd.DataFrame:
     """Sweep waveguide width and compute effective index.
 
+    Each width is solved with the effective indices of the previous width
+    as initial guess.
+
     Args:
         width1: starting waveguide width in um.
         width2: end waveguide width in um.
@@ -36,7 +54,9 @@ def find_neff_vs_width(
         parity: mp.ODD_Y mp.EVEN_X for TE, mp.EVEN_Y for TM.
         filepath: Optional filepath to store the results.
         overwrite: overwrite file even if exists on disk.
-
+        cache: stores the sweep in the modes path and only solves the widths
+            that are not stored yet, so you can extend the sweep range.
+        n_workers: number of processes to split the widths.
 
     Keyword Args:
         slab_thickness: thickness for the waveguide slab in um.
@@ -51,25 +71,26 @@ def find_neff_vs_width(
         return pd.read_csv(filepath)
 
     width = np.linspace(width1, width2, steps)
-    neff = {mode_number: [] for mode_number in range(1, nmodes + 1)}
-    for core_width in tqdm(width):
-        modes = find_modes_waveguide(
-            wavelength=wavelength,
-            parity=parity,
-            nmodes=nmodes,
-            core_width=core_width,
-            **kwargs,
-        )
-        for mode_number in range(1, nmodes + 1):
-            mode = modes[mode_number]
-            neff[mode_number].append(mode.neff)
-
-    df = pd.DataFrame(neff)
+    settings = dict(nmodes=nmodes, wavelength=wavelength, parity=parity, **kwargs)
+    sweep_path = None
+    if cache and get_modes_path():
+        sweep_path = get_sweep_path("neff_vs_width", get_modes_path(), **settings)
+        if overwrite and sweep_path.exists():
+            sweep_path.unlink()
+
+    df = sweep(
+        _find_neff,
+        points=dict(core_width=width),
+        filepath=sweep_path,
+        n_workers=n_workers,
+        cache=False,
+        **settings,
+    )
+    df = df.drop(columns="core_width").rename(columns=int)
     df["width"] = width
     if filepath:
         filepath = pathlib.Path(filepath)
-        cache = filepath.parent
-        cache.mkdir(exist_ok=True, parents=True)
+        filepath.parent.mkdir(exist_ok=True, parents=True)
         df.to_csv(filepath, index=False)
     return df
 
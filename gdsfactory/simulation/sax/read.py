@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import pathlib
-from typing import Union
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 import jax
 import jax.numpy as jnp
@@ -25,6 +25,146 @@ PathType = Union[str, pathlib.Path]
 Simulator = Literal["lumerical", "meep", "tidy3d"]
 
 
+def _interp(wl: Float, x: jnp.ndarray, y: jnp.ndarray) -> jnp.ndarray:
+    """Returns y linearly interpolated at wl along its last axis.
+
+    Same as jnp.interp for each entry of y, but all the entries share
+    the same interpolation indices and weights.
+    """
+    wl = jnp.asarray(wl)
+    i = jnp.clip(jnp.searchsorted(x, wl, side="right"), 1, len(x) - 1)
+    x0 = x[i - 1]
+    x1 = x[i]
+    t = jnp.clip(jnp.where(x1 > x0, (wl - x0) / (x1 - x0), 0), 0, 1)
+    return y[..., i - 1] * (1 - t) + y[..., i] * t
+
+
+def _model_from_array(
+    x: np.ndarray,
+    y: np.ndarray,
+    ports: List[str],
+    pairs: List[Tuple[str, str]],
+    polar: bool = False,
+) -> Model:
+    """Returns a SAX Model that interpolates a stacked Sparameters array.
+
+    Args:
+        x: sorted wavelengths (um).
+        y: (ports, ports, wavelengths) complex Sparameters or
+            (2, ports, ports, wavelengths) magnitude and angle if polar.
+        ports: port names.
+        pairs: port pairs for the SDict.
+        polar: interpolates magnitude and angle instead of the complex values.
+    """
+    x = jnp.asarray(x)
+    y = jnp.asarray(y)
+    index = {port: i for i, port in enumerate(ports)}
+    rows = np.array([index[port0] for port0, _ in pairs], dtype=int)
+    cols = np.array([index[port1] for _, port1 in pairs], dtype=int)
+
+    @jax.jit
+    def model(wl: Float = wl_cband):
+        s = _interp(wl, x, y)
+        if polar:
+            s = s[0] * jnp.exp(1j * s[1])
+        s = s[rows, cols]
+        return {pair: s[i] for i, pair in enumerate(pairs)}
+
+    return model
+
+
+def _read_npz(
+    sp: Dict[str, np.ndarray], xkey: str, xunits: float
+) -> Tuple[np.ndarray, np.ndarray, List[str], List[Tuple[str, str]]]:
+    """Returns sorted wavelengths, stacked Sparameters, ports and pairs in a npz."""
+    keys = list(sp.keys())
+
+    if xkey not in keys:
+        raise ValueError(f"{xkey!r} not in {keys}")
+
+    ports: Dict[str, int] = {}
+    pairs: Dict[Tuple[str, str], str] = {}
+    for key in keys:
+        if key == xkey or key.startswith("wav"):
+            continue
+        port_mode0, port_mode1 = key.split(",")
+        port0, _ = port_mode0.split("@")
+        port1, _ = port_mode1.split("@")
+        ports.setdefault(port0, len(ports))
+        ports.setdefault(port1, len(ports))
+        pairs[(port0, port1)] = key
+
+    x = np.asarray(sp[xkey]) * xunits
+    y = np.zeros((len(ports), len(ports), len(x)), dtype=complex)
+    for (port0, port1), key in pairs.items():
+        y[ports[port0], ports[port1]] = sp[key]
+
+    # make sure x is sorted from low to high
+    idxs = np.argsort(x)
+    return x[idxs], y[..., idxs], list(ports), list(pairs)
+
+
+def _read_csv(
+    df: pd.DataFrame, xkey: str, xunits: float, prefix: str
+) -> Tuple[np.ndarray, np.ndarray, List[str], List[Tuple[str, str]]]:
+    """Returns sorted wavelengths, stacked magnitude and angle, ports and pairs in a CSV."""
+    df = df.reset_index()  # maybe there is useful info in the index...
+    keys = list(df.columns)
+
+    if xkey not in keys:
+        raise ValueError(f"{xkey!r} not in {keys}")
+
+    nsparameters = (len(keys) - 1) // 2
+    nports = int(nsparameters**0.5)
+    ports = [f"o{i}" for i in range(1, nports + 1)]
+
+    x = df[xkey].values * xunits
+    y = np.zeros((2, nports, nports, len(x)))
+    for i in range(1, nports + 1):
+        for j in range(1, nports + 1):
+            for k, suffix in enumerate("ma"):
+                key = f"{prefix}{i}{j}{suffix}"
+                if key in df:
+                    y[k, i - 1, j - 1] = df[key].values
+
+    # make sure x is sorted from low to high
+    idxs = np.argsort(x)
+    pairs = [(port0, port1) for port0 in ports for port1 in ports]
+    return x[idxs], y[..., idxs], ports, pairs
+
+
+_models: Dict[Tuple[Any, ...], Tuple[int, Model]] = {}
+
+
+def _get_cached_model(build: Callable[..., Model], filepath: PathType, **kwargs):
+    """Returns the model for a file, rebuilding it only when the file changes."""
+    filepath = pathlib.Path(filepath).resolve()
+    mtime = filepath.stat().st_mtime_ns
+    key = (build, str(filepath), *sorted(kwargs.items()))
+    cached = _models.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = _models[key] = (mtime, build(filepath, **kwargs))
+    return cached[1]
+
+
+def clear_model_cache() -> None:
+    """Clears the models loaded from Sparameters files."""
+    _models.clear()
+
+
+def _model_from_npz(filepath, xkey: str, xunits: float) -> Model:
+    sp = np.load(filepath) if isinstance(filepath, (pathlib.Path, str)) else filepath
+    x, y, ports, pairs = _read_npz(sp, xkey=xkey, xunits=xunits)
+    return _model_from_array(x, y, ports, pairs)
+
+
+def _model_from_csv(filepath, xkey: str, xunits: float, prefix: str) -> Model:
+    df = filepath if isinstance(filepath, pd.DataFrame) else pd.read_csv(filepath)
+    assert isinstance(df, pd.DataFrame)
+    x, y, ports, pairs = _read_csv(df, xkey=xkey, xunits=xunits, prefix=prefix)
+    return _model_from_array(x, y, ports, pairs, polar=True)
+
+
 def model_from_npz(
     filepath: Union[PathType, np.ndarray],
     xkey: str = "wavelengths",
@@ -34,6 +174,9 @@ def model_from_npz(
     """Returns a SAX Sparameters Model from a npz file.
 
     The SAX Model is a function that returns a SAX SDict interpolated over wavelength.
+    All the Sparameters are stacked in one array and interpolated together.
+    Models are cached by file path and modification time, so loading the same
+    file again returns the same compiled model.
 
     Args:
         filepath: CSV Sparameters path or pandas DataFrame.
@@ -43,35 +186,11 @@ def model_from_npz(
         prefix: for the sparameters column names in file.
 
     """
-    sp = np.load(filepath) if isinstance(filepath, (pathlib.Path, str)) else filepath
-    keys = list(sp.keys())
-
-    if xkey not in keys:
-        raise ValueError(f"{xkey!r} not in {keys}")
-
-    x = jnp.asarray(sp[xkey] * xunits)
-    wl = jnp.asarray(wl_cband)
-
-    # make sure x is sorted from low to high
-    idxs = jnp.argsort(x)
-    x = x[idxs]
-    sp = {k: v[idxs] for k, v in sp.items()}
-
-    @jax.jit
-    def model(wl: Float = wl):
-        S = {}
-        zero = jnp.zeros_like(x)
-
-        for key in sp:
-            if not key.startswith("wav"):
-                port_mode0, port_mode1 = key.split(",")
-                port0, mode0 = port_mode0.split("@")
-                port1, mode1 = port_mode1.split("@")
-                S[(port0, port1)] = jnp.interp(wl, x, sp.get(key, zero))
-
-        return S
-
-    return model
+    if isinstance(filepath, (pathlib.Path, str)):
+        return _get_cached_model(
+            _model_from_npz, filepath=filepath, xkey=xkey, xunits=xunits
+        )
+    return _model_from_npz(filepath, xkey=xkey, xunits=xunits)
 
 
 def model_from_csv(
@@ -83,6 +202,9 @@ def model_from_csv(
     """Returns a SAX Sparameters Model from a CSV file.
 
     The SAX Model is a function that returns a SAX SDict interpolated over wavelength.
+    All the Sparameters are stacked in one array and interpolated together.
+    Models are cached by file path and modification time, so loading the same
+    file again returns the same compiled model.
 
     Args:
         filepath: CSV Sparameters path or pandas DataFrame.
@@ -91,39 +213,11 @@ def model_from_csv(
         xunits: x units in um from the loaded file (um). 1 means 1um.
         prefix: for the sparameters column names in file.
     """
-    df = filepath if isinstance(filepath, pd.DataFrame) else pd.read_csv(filepath)
-    assert isinstance(df, pd.DataFrame)
-    df = df.reset_index()  # maybe there is useful info in the index...
-    dic = dict(zip(df.columns, jnp.asarray(df.values.T)))
-    keys = list(dic.keys())
-
-    if xkey not in keys:
-        raise ValueError(f"{xkey!r} not in {keys}")
-
-    nsparameters = (len(keys) - 1) // 2
-    nports = int(nsparameters**0.5)
-
-    x = jnp.asarray(dic[xkey] * xunits)
-    wl = jnp.asarray(wl_cband)
-
-    # make sure x is sorted from low to high
-    idxs = jnp.argsort(x)
-    x = x[idxs]
-    dic = {k: v[idxs] for k, v in dic.items()}
-
-    @jax.jit
-    def model(wl: Float = wl):
-        S = {}
-        zero = jnp.zeros_like(x)
-        for i in range(1, nports + 1):
-            for j in range(1, nports + 1):
-                m = jnp.interp(wl, x, dic.get(f"{prefix}{i}{j}m", zero))
-                a = jnp.interp(wl, x, dic.get(f"{prefix}{i}{j}a", zero))
-                S[f"o{i}", f"o{j}"] = m * jnp.exp(1j * a)
-
-        return S
-
-    return model
+    if isinstance(filepath, (pathlib.Path, str)):
+        return _get_cached_model(
+            _model_from_csv, filepath=filepath, xkey=xkey, xunits=xunits, prefix=prefix
+        )
+    return _model_from_csv(filepath, xkey=xkey, xunits=xunits, prefix=prefix)
 
 
 def _demo_mmi_lumerical_csv() -> None:
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import time
+
+import jax.numpy as jnp
+import numpy as np
+import pandas as pd
+import sax
+
+from gdsfactory.simulation.sax.read import (
+    clear_model_cache,
+    model_from_csv,
+    model_from_npz,
+)
+
+
+def _write_npz(filepath, nports: int = 4, nwavelengths: int = 50, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    sp = {"wavelengths": np.linspace(1.6, 1.5, nwavelengths)}
+    for i in range(1, nports + 1):
+        for j in range(1, nports + 1):
+            sp[f"o{i}@0,o{j}@0"] = rng.normal(size=nwavelengths) + 1j * rng.normal(
+                size=nwavelengths
+            )
+    np.savez(filepath, **sp)
+    return sp
+
+
+def test_model_from_npz(tmp_path) -> None:
+    filepath = tmp_path / "device.npz"
+    sp = _write_npz(filepath)
+    model = model_from_npz(filepath)
+    wl = jnp.linspace(1.45, 1.65, 30)
+    S = model(wl)
+
+    x = sp.pop("wavelengths")[::-1]
+    assert len(S) == len(sp)
+    for key, values in sp.items():
+        port0, port1 = (port_mode.split("@")[0] for port_mode in key.split(","))
+        expected = jnp.interp(wl, x, values[::-1])
+        np.testing.assert_allclose(S[port0, port1], expected, rtol=1e-5, atol=1e-6)
+
+
+def test_model_from_csv() -> None:
+    rng = np.random.default_rng(0)
+    x = np.linspace(1.5, 1.6, 20)
+    df = pd.DataFrame({"wavelengths": x})
+    for key in ["s11", "s12", "s21", "s22"]:
+        df[f"{key}m"] = rng.random(20)
+        df[f"{key}a"] = rng.random(20)
+    S = model_from_csv(df)(1.55)
+
+    s12 = np.interp(1.55, x, df.s12m) * np.exp(1j * np.interp(1.55, x, df.s12a))
+    assert set(S) == {("o1", "o1"), ("o1", "o2"), ("o2", "o1"), ("o2", "o2")}
+    np.testing.assert_allclose(S["o1", "o2"], s12, rtol=1e-5)
+
+
+def test_model_cache(tmp_path) -> None:
+    clear_model_cache()
+    filepath = tmp_path / "device.npz"
+    _write_npz(filepath, seed=0)
+    model = model_from_npz(filepath)
+    assert model_from_npz(str(filepath)) is model
+
+    _write_npz(filepath, seed=1)
+    stat = filepath.stat()
+    os.utime(filepath, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert model_from_npz(filepath) is not model
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    nports = 64
+    dirpath = tempfile.mkdtemp()
+    filepath = f"{dirpath}/device64.npz"
+    _write_npz(filepath, nports=nports, nwavelengths=200)
+    wl = jnp.linspace(1.5, 1.6, 128)
+
+    model = model_from_npz(filepath)
+    model(wl)[("o1", "o1")].block_until_ready()
+    t0 = time.perf_counter()
+    for _ in range(10):
+        S = model(wl)
+    S[("o1", "o1")].block_until_ready()
+    print(f"{nports}-port model {(time.perf_counter() - t0) / 10 * 1e3:.2f} ms")
+
+    t0 = time.perf_counter()
+    for _ in range(100):
+        model_from_npz(filepath)
+    print(f"cached model_from_npz {(time.perf_counter() - t0) / 100 * 1e6:.1f} us")
+
+    half = nports // 2
+    netlist = {
+        "instances": {
+            "a": {"component": "device"},
+            "b": {"component": "device"},
+        },
+        "connections": {f"a,o{i + half}": f"b,o{i}" for i in range(1, half + 1)},
+        "ports": {
+            **{f"in{i}": f"a,o{i}" for i in range(1, half + 1)},
+            **{f"out{i}": f"b,o{i + half}" for i in range(1, half + 1)},
+        },
+    }
+    circuit, _ = sax.circuit(
+        netlist=netlist, models={"device": lambda wl=wl: model(wl)}
+    )
+    circuit(wl=wl)[("in1", "out1")].block_until_ready()
+    t0 = time.perf_counter()
+    for _ in range(10):
+        S = circuit(wl=wl)
+    S[("in1", "out1")].block_until_ready()
+    print(f"{nports}-port circuit {(time.perf_counter() - t0) / 10 * 1e3:.2f} ms")
@@ -0,0 +1,150 @@
+"""Local scheduler for simulation jobs that run as subprocesses (for example mpirun).
+
+Jobs are launched as soon as enough cores are free instead of in fixed batches,
+so a slow simulation does not keep the other cores idle.
+Jobs with a higher priority start first. Jobs start in order, so a job that waits
+for cores is not delayed by the smaller jobs behind it.
+Jobs whose result file already exists are skipped, so running the same jobs
+again resumes an interrupted sweep.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import pathlib
+import subprocess
+import time
+from typing import IO, Callable, List, Optional, Sequence, Union
+
+from gdsfactory.config import logger
+
+
+@dataclasses.dataclass
+class Job:
+    """Command to run with the number of cores it uses.
+
+    Args:
+        command: program and arguments, or a function that returns them
+            for the number of cores the job runs with.
+        cores: number of cores the command uses.
+        priority: jobs with higher priority start first.
+        filepath: result file. The job is skipped if it exists and fails if
+            the command does not write it.
+        log_path: file for the command stdout and stderr.
+        name: for the logs. Defaults to the filepath or the command.
+    """
+
+    command: Union[List[str], Callable[[int], List[str]]]
+    cores: int = 1
+    priority: int = 0
+    filepath: Optional[pathlib.Path] = None
+    log_path: Optional[pathlib.Path] = None
+    name: str = ""
+    returncode: Optional[int] = None
+    duration: Optional[float] = None
+
+    @property
+    def failed(self) -> bool:
+        if self.returncode is None:
+            return False
+        if self.returncode != 0:
+            return True
+        return self.filepath is not None and not self.filepath.exists()
+
+
+def run_jobs(
+    jobs: Sequence[Job],
+    total_cores: int,
+    poll_interval: float = 0.5,
+) -> List[Job]:
+    """Runs jobs as subprocesses using up to total_cores and returns the failed jobs.
+
+    Updates the returncode and duration of each job.
+    Jobs that use more than total_cores run with total_cores if their command is
+    a function of the number of cores.
+    Stops the running jobs if interrupted.
+
+    Args:
+        jobs: to run.
+        total_cores: maximum number of cores used by the running jobs.
+        poll_interval: seconds between checks for finished jobs.
+    """
+    pending = []
+    for index, job in enumerate(jobs):
+        if job.filepath is not None and job.filepath.exists():
+            job.name = job.name or str(job.filepath)
+            logger.info(f"Skip {job.name!r}: result exists")
+            continue
+        if job.cores > total_cores and not callable(job.command):
+            raise ValueError(
+                f"{job.name or ' '.join(job.command)!r} uses {job.cores} cores "
+                f"> total_cores = {total_cores}"
+            )
+        cores = min(job.cores, total_cores)
+        if callable(job.command):
+            job.command = job.command(cores)
+        job.name = job.name or str(job.filepath or " ".join(job.command))
+        if cores < job.cores:
+            logger.warning(
+                f"{job.name!r} uses {job.cores} cores > total_cores = {total_cores}. "
+                f"Running it with all {total_cores} cores available"
+            )
+            job.cores = cores
+        pending.append((-job.priority, index, job))
+    pending.sort(key=lambda item: item[:2])
+
+    running: List[tuple] = []
+    free_cores = total_cores
+    failed = []
+
+    try:
+        while pending or running:
+            # without run times, starting a job behind a waiting one could delay it
+            while pending and pending[0][2].cores <= free_cores:
+                job = pending.pop(0)[2]
+                proc, log = _launch(job)
+                running.append((job, proc, log, job.cores, time.perf_counter()))
+                free_cores -= job.cores
+
+            time.sleep(poll_interval)
+            for item in list(running):
+                job, proc, log, cores, t0 = item
+                returncode = proc.poll()
+                if returncode is None:
+                    continue
+                running.remove(item)
+                free_cores += cores
+                if log:
+                    log.close()
+                job.returncode = returncode
+                job.duration = time.perf_counter() - t0
+                if job.failed:
+                    failed.append(job)
+                    logger.error(
+                        f"{job.name!r} failed with exit code {returncode}"
+                        + (f", see {str(job.log_path)!r}" if job.log_path else "")
+                    )
+                else:
+                    logger.info(f"{job.name!r} finished in {job.duration:.1f}s")
+    finally:
+        for job, proc, log, _, _ in running:
+            logger.warning(f"Stop {job.name!r}")
+            proc.terminate()
+            proc.wait()
+            if log:
+                log.close()
+
+    return failed
+
+
+def _launch(job: Job) -> tuple[subprocess.Popen, Optional[IO]]:
+    logger.info(f"Start {job.name!r}: {' '.join(job.command)}")
+    if job.log_path is None:
+        proc = subprocess.Popen(
+            job.command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        return proc, None
+    job.log_path.parent.mkdir(parents=True, exist_ok=True)
+    log = open(job.log_path, "w")
+    proc = subprocess.Popen(job.command, stdout=log, stderr=subprocess.STDOUT)
+    return proc, log
@@ -0,0 +1,170 @@
+"""Parameter sweeps over a process pool with warm starts and a columnar cache.
+
+Each sweep point is solved with the result of the previous point as initial
+guess, so mode solvers converge in fewer iterations.
+The points are split in contiguous chunks, one per worker, so each worker
+keeps walking along the sweep.
+
+Results are stored in one compressed npz file with a column per parameter and
+result. Points that are already in the file are loaded instead of solved,
+so extending the sweep range only solves the new points.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import multiprocessing
+import os
+import pathlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from gdsfactory.config import logger
+from gdsfactory.simulation.get_sparameters_path import get_kwargs_hash
+from gdsfactory.typings import PathType
+
+Result = Dict[str, float]
+_settings_key = "_settings"
+
+
+def _get_key(values: Sequence[float]) -> Tuple[float, ...]:
+    return tuple(np.round(np.asarray(values, dtype=float), 9).tolist())
+
+
+def get_sweep_path(name: str, dirpath: PathType, **kwargs) -> pathlib.Path:
+    """Returns a sweep filepath that hashes the fixed sweep settings.
+
+    Args:
+        name: prefix for the file name.
+        dirpath: directory for the sweep files.
+        kwargs: fixed sweep settings.
+    """
+    return pathlib.Path(dirpath) / f"{name}_{get_kwargs_hash(**kwargs)}.npz"
+
+
+def _run_chunk(
+    function: Callable[..., Result],
+    points: List[Dict[str, float]],
+    guess: Optional[Result],
+    kwargs: Dict[str, Any],
+) -> List[Result]:
+    results = []
+    for point in points:
+        guess = function(guess=guess, **point, **kwargs)
+        results.append(guess)
+    return results
+
+
+def load_sweep(
+    filepath: PathType, parameters: Sequence[str], settings_hash: str
+) -> Dict[Tuple[float, ...], Result]:
+    """Returns results of a sweep file indexed by the rounded parameter values.
+
+    Args:
+        filepath: compressed npz sweep file.
+        parameters: names of the swept parameters.
+        settings_hash: hash of the fixed settings. Files with other settings are ignored.
+    """
+    filepath = pathlib.Path(filepath)
+    if not filepath.exists():
+        return {}
+
+    with np.load(filepath) as data:
+        columns = {name: data[name] for name in data.files}
+    if str(columns.pop(_settings_key, "")) != settings_hash:
+        logger.warning(f"Ignore {str(filepath)!r} computed with other settings")
+        return {}
+    if any(name not in columns for name in parameters):
+        return {}
+
+    names = [name for name in columns if name not in parameters]
+    keys = zip(*(np.round(columns[name], 9).tolist() for name in parameters))
+    return {
+        key: {name: columns[name][i] for name in names} for i, key in enumerate(keys)
+    }
+
+
+def write_sweep(
+    filepath: PathType,
+    parameters: Sequence[str],
+    results: Dict[Tuple[float, ...], Result],
+    settings_hash: str,
+) -> None:
+    """Writes sweep results sorted by parameter values to a compressed npz file."""
+    filepath = pathlib.Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    keys = sorted(results)
+    columns = {
+        name: np.array([key[i] for key in keys]) for i, name in enumerate(parameters)
+    }
+    for name in results[keys[0]]:
+        columns[name] = np.array([results[key][name] for key in keys])
+    columns[_settings_key] = np.array(settings_hash)
+
+    filepath_tmp = filepath.with_name(f"{filepath.name}.{os.getpid()}.tmp")
+    with open(filepath_tmp, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(filepath_tmp, filepath)
+
+
+def sweep(
+    function: Callable[..., Result],
+    points: Dict[str, Sequence[float]],
+    filepath: Optional[PathType] = None,
+    n_workers: int = 1,
+    **kwargs,
+) -> pd.DataFrame:
+    """Returns a DataFrame with the parameters and results for each sweep point.
+
+    Args:
+        function: called as function(guess=previous_result, **point, **kwargs)
+            and returns a dict of scalar results. guess is None for the first point
+            of each chunk unless the previous point is in filepath.
+        points: parameter name to values. All values have the same length.
+        filepath: optional compressed npz file to load and store results.
+        n_workers: number of processes. 1 solves the points in this process.
+        kwargs: fixed settings for all the points.
+    """
+    parameters = list(points)
+    rows = [dict(zip(parameters, values)) for values in zip(*points.values())]
+    keys = [_get_key(list(row.values())) for row in rows]
+
+    settings_hash = get_kwargs_hash(function=function, **kwargs)
+    results = load_sweep(filepath, parameters, settings_hash) if filepath else {}
+    missing_keys = dict.fromkeys(key for key in keys if key not in results)
+    missing = [keys.index(key) for key in missing_keys]
+
+    if missing:
+        n_workers = max(1, min(n_workers, len(missing)))
+        chunks = [chunk.tolist() for chunk in np.array_split(missing, n_workers)]
+        args = [
+            (
+                function,
+                [rows[i] for i in chunk],
+                results.get(keys[chunk[0] - 1]) if chunk[0] > 0 else None,
+                kwargs,
+            )
+            for chunk in chunks
+        ]
+        logger.info(f"Solve {len(missing)} of {len(keys)} sweep points")
+        if n_workers == 1:
+            chunk_results = [_run_chunk(*args[0])]
+        else:
+            context = multiprocessing.get_context("fork")
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=n_workers, mp_context=context
+            ) as pool:
+                chunk_results = list(pool.map(_run_chunk, *zip(*args)))
+
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            for i, result in zip(chunk, chunk_result):
+                results[keys[i]] = result
+        if filepath:
+            write_sweep(filepath, parameters, results, settings_hash)
+
+    df = pd.DataFrame(rows, columns=parameters)
+    for name in results[keys[0]] if keys else []:
+        df[name] = [results[key][name] for key in keys]
+    return df
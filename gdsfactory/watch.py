@@ -6,27 +6,103 @@ import importlib
 import logging
 import pathlib
 import sys
+import threading
 import time
 import traceback
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional, Set
 
+import yaml
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 
 from gdsfactory.config import cwd
 from gdsfactory.pdk import get_active_pdk
+from gdsfactory.typings import PathType
+
+
+def _get_cell_name(filepath: PathType) -> str:
+    return pathlib.Path(filepath).stem.split(".")[0]
+
+
+def get_instance_cells(filepath: PathType) -> Set[str]:
+    """Returns the names of the cells instantiated in a YAML file."""
+    conf = yaml.safe_load(pathlib.Path(filepath).read_text()) or {}
+    cells = set()
+    for instance in (conf.get("instances") or {}).values():
+        component = instance.get("component") if isinstance(instance, dict) else None
+        if isinstance(component, dict):
+            component = component.get("component") or component.get("function")
+        if isinstance(component, str):
+            cells.add(component)
+    return cells
 
 
 class YamlEventHandler(FileSystemEventHandler):
-    """Captures pic.yml file change events."""
+    """Captures pic.yml file change events.
+
+    Keeps a graph of the YAML cells that instantiate each cell, so a change
+    only rebuilds the cell and the cells that depend on it.
+    Events for the same file within debounce seconds are handled once.
+
+    Args:
+        logger: for the events.
+        path: directory with the YAML cells.
+        debounce: seconds to wait for more events before rebuilding.
+    """
 
-    def __init__(self, logger=None, path: Optional[str] = None) -> None:
+    def __init__(
+        self, logger=None, path: Optional[str] = None, debounce: float = 0.2
+    ) -> None:
         """Initialize the YAML event handler."""
         super().__init__()
 
         self.logger = logger or logging.root
+        self.debounce = debounce
+        self.dependents: Dict[str, Set[str]] = {}
+        self.instances: Dict[str, Set[str]] = {}
+        self._pending: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
         pdk = get_active_pdk()
         pdk.register_cells_yaml(dirpath=path, update=True)
+        if path:
+            for filepath in pathlib.Path(path).glob("*/**/*.pic.yml"):
+                self.update_dependencies(filepath)
+
+    def update_dependencies(self, filepath) -> None:
+        """Updates the cells instantiated by a YAML file."""
+        cell_name = _get_cell_name(filepath)
+        for child in self.instances.pop(cell_name, set()):
+            self.dependents[child].discard(cell_name)
+
+        try:
+            children = get_instance_cells(filepath)
+        except (OSError, yaml.YAMLError, AttributeError):
+            children = set()
+        self.instances[cell_name] = children
+        for child in children:
+            self.dependents.setdefault(child, set()).add(cell_name)
+
+    def get_dependents(self, cell_name: str) -> List[str]:
+        """Returns the YAML cells that instantiate a cell directly or indirectly."""
+        dependents: Dict[str, None] = {}
+        stack = list(self.dependents.get(cell_name, ()))
+        while stack:
+            name = stack.pop()
+            if name not in dependents and name != cell_name:
+                dependents[name] = None
+                stack.extend(self.dependents.get(name, ()))
+        return list(dependents)
+
+    def invalidate(self, cell_name: str) -> List[str]:
+        """Removes a cell and every cell that depends on it from CACHE.
+
+        Returns the names of the removed cells.
+        """
+        from gdsfactory.cell import CACHE
+
+        return CACHE.invalidate([cell_name, *self.get_dependents(cell_name)])
 
     def update_cell(self, src_path, update: bool = False) -> Callable:
         """Parses a YAML file to a cell function and registers into active pdk.
@@ -38,14 +114,12 @@ class YamlEventHandler(FileSystemEventHandler):
             The cell function parsed from the yaml file.
 
         """
-        from gdsfactory.cell import CACHE
-
         pdk = get_active_pdk()
         print(f"Active PDK: {pdk.name}")
         filepath = pathlib.Path(src_path)
-        cell_name = filepath.stem.split(".")[0]
-        if cell_name in CACHE:
-            CACHE.pop(cell_name)
+        cell_name = _get_cell_name(filepath)
+        self.update_dependencies(filepath)
+        self.invalidate(cell_name)
         parser = pdk.circuit_yaml_parser
         function = parser(filepath, name=cell_name)
         try:
@@ -54,14 +128,37 @@ class YamlEventHandler(FileSystemEventHandler):
             print(e)
         return function
 
+    def schedule(self, src_path) -> None:
+        """Handles a changed file after debounce seconds without more events."""
+        with self._lock:
+            self._pending[str(src_path)] = None
+            if self._timer:
+                self._timer.cancel()
+            if self.debounce <= 0:
+                self._timer = None
+            else:
+                self._timer = threading.Timer(self.debounce, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if self.debounce <= 0:
+            self.flush()
+
+    def flush(self) -> None:
+        """Handles the pending changed files."""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+            self._timer = None
+        for src_path in pending:
+            self.get_component(src_path)
+
     def on_moved(self, event) -> None:
         super().on_moved(event)
 
         what = "directory" if event.is_directory else "file"
         if what == "file" and event.dest_path.endswith(".pic.yml"):
             self.logger.info("Moved %s: %s", what, event.src_path)
-            self.update_cell(event.dest_path)
-            self.get_component(event.src_path)
+            self.schedule(event.dest_path)
 
     def on_created(self, event) -> None:
         super().on_created(event)
@@ -69,8 +166,7 @@ class YamlEventHandler(FileSystemEventHandler):
         what = "directory" if event.is_directory else "file"
         if what == "file" and event.src_path.endswith(".pic.yml"):
             self.logger.info("Created %s: %s", what, event.src_path)
-            self.update_cell(event.src_path)
-            self.get_component(event.src_path)
+            self.schedule(event.src_path)
 
     def on_deleted(self, event) -> None:
         super().on_deleted(event)
@@ -79,9 +175,13 @@ class YamlEventHandler(FileSystemEventHandler):
 
         if what == "file" and event.src_path.endswith(".pic.yml"):
             self.logger.info("Deleted %s: %s", what, event.src_path)
+            with self._lock:
+                self._pending.pop(event.src_path, None)
             pdk = get_active_pdk()
             filepath = pathlib.Path(event.src_path)
-            cell_name = filepath.stem.split(".")[0]
+            cell_name = _get_cell_name(filepath)
+            self.invalidate(cell_name)
+            self.update_dependencies(filepath)
             pdk.remove_cell(cell_name)
 
     def on_modified(self, event) -> None:
@@ -94,15 +194,29 @@ class YamlEventHandler(FileSystemEventHandler):
             or event.src_path.endswith(".py")
         ):
             self.logger.info("Modified %s: %s", what, event.src_path)
-            self.get_component(event.src_path)
+            self.schedule(event.src_path)
 
     def get_component(self, filepath):
+        """Rebuilds and shows the cell of a changed file.
+
+        For YAML files it also rebuilds the YAML cells that depend on it.
+        """
         try:
             filepath = pathlib.Path(filepath)
             if filepath.exists():
                 if str(filepath).endswith(".pic.yml"):
+                    t0 = time.perf_counter()
                     cell_func = self.update_cell(filepath, update=True)
                     c = cell_func()
+                    pdk = get_active_pdk()
+                    dependents = self.get_dependents(_get_cell_name(filepath))
+                    for name in dependents:
+                        if name in pdk.cells:
+                            pdk.get_component(name)
+                    self.logger.info(
+                        f"Rebuilt {c.name!r} and {len(dependents)} dependent cells "
+                        f"in {time.perf_counter() - t0:.3f} s"
+                    )
                     c.show(show_ports=True)
                     # on_yaml_cell_modified.fire(c)
                     return c
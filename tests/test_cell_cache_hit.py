@@ -0,0 +1,76 @@
+"""@cell returns cached Components without computing the cell name again."""
+from __future__ import annotations
+
+import timeit
+
+import gdsfactory as gf
+from gdsfactory.cell import cache_info, wg
+
+
+def test_cell_cache_hit() -> None:
+    gf.clear_cache()
+    c1 = gf.components.straight(length=3)
+    c2 = gf.components.straight(length=3)
+    assert c1 is c2
+
+    gf.clear_cache()
+    c3 = gf.components.straight(length=3)
+    assert c3 is not c1
+    assert gf.components.straight(length=3) is c3
+
+
+def test_cell_cache_hit_types() -> None:
+    """3 and 3.0 give different names, so they can not share a cache entry."""
+    c1 = wg(length=3)
+    c2 = wg(length=3.0)
+    assert c1.name != c2.name
+    assert wg(length=3) is c1
+    assert wg(length=3.0) is c2
+
+
+def test_cell_cache_hit_stats() -> None:
+    gf.clear_cache()
+    gf.components.bend_euler(radius=7)
+    info = cache_info()
+    hits = info.hits
+    gf.components.bend_euler(radius=7)
+    gf.components.bend_euler(radius=7, cross_section="strip")
+    assert cache_info().hits == hits + 2
+
+
+def test_cell_cache_hit_settings() -> None:
+    settings = gf.get_active_pdk().cell_decorator_settings
+    c1 = gf.components.straight(length=5)
+    settings.with_hash = True
+    try:
+        c2 = gf.components.straight(length=5)
+        assert c2.name != c1.name
+    finally:
+        settings.with_hash = False
+    assert gf.components.straight(length=5) is c1
+
+
+def test_cell_invalid_argument() -> None:
+    wg(length=5)
+    try:
+        wg(length=5, invalid_argument=1)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("invalid argument not detected")
+
+
+if __name__ == "__main__":
+    cross_section = gf.partial(gf.cross_section.strip, width=0.6)
+    calls = {
+        "straight()": lambda: gf.components.straight(),
+        "straight(length=10)": lambda: gf.components.straight(length=10),
+        "bend_euler(cross_section)": lambda: gf.components.bend_euler(
+            cross_section=cross_section
+        ),
+    }
+    for label, call in calls.items():
+        call()
+        n = 10000
+        t = min(timeit.repeat(call, number=n, repeat=5)) / n
+        print(f"{label:30s} {t * 1e6:.2f} us per cache hit")
@@ -0,0 +1,98 @@
+"""Bounded @cell cache evicts least recently used cells that nothing references."""
+from __future__ import annotations
+
+import gc
+
+import gdsfactory as gf
+from gdsfactory.cell import CACHE, set_cache_maxsize
+
+
+@gf.cell
+def _cell(i: int) -> gf.Component:
+    c = gf.Component()
+    c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+    return c
+
+
+@gf.cell
+def _tree(i: int, depth: int) -> gf.Component:
+    c = gf.Component()
+    if depth == 0:
+        c << _cell(i)
+    else:
+        for j in range(2):
+            c << _tree(i * 2 + j, depth - 1)
+    return c
+
+
+def _with_maxsize(maxsize, test) -> None:
+    maxsize_default = CACHE.maxsize
+    gf.clear_cache()
+    CACHE.reset_stats()
+    set_cache_maxsize(maxsize)
+    try:
+        test()
+    finally:
+        gf.clear_cache()
+        set_cache_maxsize(maxsize_default)
+
+
+def test_cache_lru() -> None:
+    def test() -> None:
+        c0 = _cell(0)
+        _cell(1)
+        assert _cell(0) is c0
+        _cell(2)
+        assert list(CACHE) == ["_cell_i0", "_cell_i2"]
+        assert CACHE.info().evictions == 1
+
+    _with_maxsize(2, test)
+
+
+def test_cache_pinned_by_cached_parent() -> None:
+    def test() -> None:
+        top = _tree(0, depth=4)
+        assert len(CACHE) == 2**5 - 1 + 2**4
+        assert CACHE.info().evictions == 0
+        # pinned cells are not in the eviction order, so evictions do not scan them
+        assert list(CACHE._evictable) == [top.name]
+
+    _with_maxsize(4, test)
+
+
+def test_cache_pinned_by_component() -> None:
+    """Cells referenced by an uncached Component are not built again."""
+
+    def test() -> None:
+        c = gf.Component()
+        c0 = _cell(0)
+        c << c0
+        for i in range(1, 10):
+            _cell(i)
+        assert _cell(0) is c0
+        assert set(CACHE) == {"_cell_i0", "_cell_i9"}
+
+        del c
+        gc.collect()
+        for i in range(10, 12):
+            _cell(i)
+        assert "_cell_i0" not in CACHE
+
+    _with_maxsize(2, test)
+
+
+def test_cache_pins_bounded() -> None:
+    """Pins of collected components are released, unbounded caches keep none."""
+
+    def test() -> None:
+        for _ in range(100):
+            c = gf.Component()
+            c.add_ref(_cell(0))
+        del c
+        gc.collect()
+        _cell(1)
+        assert not CACHE._holders
+        assert not CACHE._released
+
+    for maxsize in [None, 2]:
+        _with_maxsize(maxsize, test)
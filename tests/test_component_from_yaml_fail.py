@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 import gdsfactory as gf
 
 yaml_fail = """
@@ -54,15 +56,11 @@ placements:
         dy: 20
 """
 
-# import pytest
-
 
-# def test_circular_import_fail():
-#     """Circular dependency should raise an error
-#     FIXME: this should raise an error
-#     """
-#     with pytest.raises(ValueError):
-#         gf.read.from_yaml(yaml_fail)
+def test_circular_import_fail() -> None:
+    """Circular dependency should raise an error."""
+    with pytest.raises(ValueError, match="circular reference in placement"):
+        gf.read.from_yaml(yaml_fail)
 
 
 def test_circular_import_pass() -> None:
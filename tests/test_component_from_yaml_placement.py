@@ -0,0 +1,63 @@
+"""from_yaml places instances in dependency order without recursion."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.read.from_yaml import get_placement_order
+
+
+def chain(n: int, connections: bool = True) -> dict:
+    """Returns a netlist with n straights placed one after another."""
+    conf = {
+        "instances": {
+            f"s{i}": {"component": "straight", "settings": {"length": 1}}
+            for i in range(n)
+        }
+    }
+    if connections:
+        conf["connections"] = {f"s{i},o1": f"s{i-1},o2" for i in range(1, n)}
+    else:
+        conf["placements"] = {"s0": {"x": 0}}
+        conf["placements"].update(
+            {f"s{i}": {"x": f"s{i-1},o2", "port": "o1"} for i in range(1, n)}
+        )
+    return conf
+
+
+def test_placement_order() -> None:
+    n = 100_000
+    placements = {f"s{i}": {"x": f"s{i+1},o2"} for i in range(n)}
+    connections = {"s0": {"instance_dst_name": "s1"}}
+    order = get_placement_order(placements, connections)
+    assert order == [f"s{i}" for i in reversed(range(n))]
+
+
+def test_placement_order_loop() -> None:
+    placements = {"a": {"x": "b,o1"}, "b": {"y": "c,o1"}, "c": {"ymin": "a,o1"}}
+    with pytest.raises(ValueError, match="a -> b -> c -> a"):
+        get_placement_order(placements, {})
+
+
+def test_placement_order_self_reference() -> None:
+    assert get_placement_order({"a": {"x": "a,o1"}}, {}) == ["a"]
+
+
+@pytest.mark.parametrize("connections", [True, False])
+def test_from_yaml_long_chain(connections: bool) -> None:
+    n = 2000
+    c = gf.read.from_yaml(chain(n, connections=connections))
+    assert c.named_references[f"s{n-1}"].ports["o2"].center[0] == n
+
+
+if __name__ == "__main__":
+    for n in [1000, 10_000]:
+        for connections in [True, False]:
+            conf = chain(n, connections=connections)
+            gf.clear_cache()
+            t0 = time.perf_counter()
+            gf.read.from_yaml(conf)
+            dt = time.perf_counter() - t0
+            print(f"n={n} connections={connections}: {dt:.2f} s")
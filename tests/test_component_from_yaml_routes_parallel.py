@@ -0,0 +1,118 @@
+"""from_yaml(n_workers) computes the route groups in worker processes."""
+from __future__ import annotations
+
+import multiprocessing
+import time
+
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.typings import Route
+from gdsfactory.routing.factories import routing_strategy as routing_strategy_default
+
+
+def pad_arrays(n: int) -> dict:
+    """Returns a netlist with n independent bundles of electrical routes."""
+    conf = {"instances": {}, "placements": {}, "routes": {}}
+    for i in range(n):
+        conf["instances"][f"t{i}"] = {
+            "component": "pad_array",
+            "settings": {"columns": 6, "orientation": 270},
+        }
+        conf["instances"][f"b{i}"] = {
+            "component": "pad_array",
+            "settings": {"columns": 6, "orientation": 90},
+        }
+        conf["placements"][f"t{i}"] = {"x": i * 1000, "y": 800}
+        conf["placements"][f"b{i}"] = {"x": i * 1000 + 100, "y": 0}
+        conf["routes"][f"bundle{i}"] = {
+            "routing_strategy": "get_bundle_electrical",
+            "links": {f"t{i},e1:1:6": f"b{i},e1:1:6"},
+            "settings": {"separation": 20},
+        }
+    return conf
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_from_yaml_routes_parallel(tmp_path) -> None:
+    gf.clear_cache()
+    c1 = gf.read.from_yaml(pad_arrays(3))
+    references1 = [(r.parent.name, tuple(r.origin), r.rotation) for r in c1.references]
+    gf.clear_cache()
+    c2 = gf.read.from_yaml(pad_arrays(3), n_workers=2)
+    references2 = [(r.parent.name, tuple(r.origin), r.rotation) for r in c2.references]
+
+    assert c1.name == c2.name
+    assert references1 == references2
+    assert c1.routes == c2.routes
+    assert c1.hash_geometry() == c2.hash_geometry()
+    assert c2.write_gds(gdspath=tmp_path / "c2.gds").exists()
+
+
+def _get_routes_array(ports1, ports2, **kwargs):
+    straight = gf.components.straight()
+    return [
+        Route(
+            references=[
+                gf.ComponentReference(straight, columns=3, rows=2, spacing=(20, 10))
+            ],
+            ports=ports,
+            length=1,
+        )
+        for ports in zip(ports1, ports2)
+    ]
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork"
+)
+def test_from_yaml_routes_parallel_arrays() -> None:
+    """Arrayed route references keep their repetition from worker processes."""
+    routing_strategy = dict(routing_strategy_default, array=_get_routes_array)
+    conf = pad_arrays(2)
+    for route in conf["routes"].values():
+        route["routing_strategy"] = "array"
+        route.pop("settings")
+    gf.clear_cache()
+    c = gf.read.from_yaml(conf, routing_strategy=routing_strategy, n_workers=2)
+    arrays = [ref for ref in c.references if ref.parent.name.startswith("straight")]
+    assert len(arrays) == 12
+    assert all((ref.columns, ref.rows) == (3, 2) for ref in arrays)
+    assert all(tuple(ref.spacing) == (20, 10) for ref in arrays)
+
+
+def _get_route_single(ports1, ports2, **kwargs):
+    return gf.routing.get_route(ports1[-1], ports2[-1], **kwargs)
+
+
+def test_from_yaml_routes_single_route() -> None:
+    """A routing function returning one Route stores it under the last name."""
+    routing_strategy = dict(routing_strategy_default, single=_get_route_single)
+    conf = pad_arrays(1)
+    conf["routes"]["bundle0"] = {
+        "routing_strategy": "single",
+        "links": {"t0,e1:1:2": "b0,e1:1:2"},
+    }
+    gf.clear_cache()
+    c = gf.read.from_yaml(conf, routing_strategy=routing_strategy)
+    assert list(c.routes) == ["t0,e12:b0,e12"]
+
+
+def test_from_yaml_routes_names_mismatch() -> None:
+    routing_strategy = dict(routing_strategy_default, single=lambda **kwargs: [])
+    conf = pad_arrays(1)
+    conf["routes"]["bundle0"]["routing_strategy"] = "single"
+    gf.clear_cache()
+    with pytest.raises(ValueError):
+        gf.read.from_yaml(conf, routing_strategy=routing_strategy)
+
+
+if __name__ == "__main__":
+    conf = pad_arrays(32)
+    for n_workers in [1, 2, 4, 8]:
+        gf.clear_cache()
+        t0 = time.perf_counter()
+        gf.read.from_yaml(conf, n_workers=n_workers)
+        print(f"n_workers={n_workers}: {time.perf_counter() - t0:.2f} s")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+import gdsfactory as gf
+
+
+def test_reference_ports_cached() -> None:
+    c = gf.Component("test_reference_ports_cached")
+    ref = c << gf.components.mmi1x2()
+    ports = ref._get_local_ports()
+    port = ref["o2"]
+    assert ref._get_local_ports() is ports
+    assert ref["o2"] is not port
+
+    center = port.center.copy()
+    ref.movex(10)
+    assert np.allclose(ref["o2"].center, center + (10, 0))
+
+    ref.rotate(90)
+    assert ref["o2"].orientation == 90
+    ref.mirror()
+    center, _ = ref._transform_port(
+        ref.parent["o2"].center,
+        ref.parent["o2"].orientation,
+        ref.origin,
+        ref.rotation,
+        ref.x_reflection,
+    )
+    assert np.allclose(ref["o2"].center, center)
+
+
+def test_reference_ports_copy() -> None:
+    c = gf.Component("test_reference_ports_copy")
+    ref = c << gf.components.mmi1x2()
+    center = ref["o2"].center.copy()
+
+    ports = ref.ports
+    ports["o2"].center = (100, 100)
+    ports["o2"].name = "o4"
+    ports.pop("o1")
+    ref["o3"].width = 10
+
+    assert np.allclose(ref["o2"].center, center)
+    assert ref["o2"].name == "o2"
+    assert ref["o3"].width == ref.parent["o3"].width
+    assert list(ref.ports) == ["o1", "o2", "o3"]
+    assert ref["o2"].reference is ref
+    assert ref["o2"].parent is ref
+
+
+def test_reference_ports_no_orientation() -> None:
+    c = gf.Component("test_reference_ports_no_orientation")
+    pad = gf.components.pad()
+    ref = c << pad
+    ref.rotate(90)
+    ref.movex(5)
+    for name, port in ref.ports.items():
+        center, orientation = ref._transform_port(
+            pad.ports[name].center,
+            pad.ports[name].orientation,
+            ref.origin,
+            ref.rotation,
+            ref.x_reflection,
+        )
+        assert np.allclose(port.center, center)
+        if orientation is None:
+            assert port.orientation is None
+        else:
+            assert np.isclose(port.orientation, orientation % 360)
+
+
+if __name__ == "__main__":
+    c = gf.Component("many_references")
+    mmi = gf.components.mmi2x2()
+    refs = [c.add_ref(mmi).movex(i * 20).rotate(90 * (i % 4)) for i in range(20000)]
+
+    t0 = time.perf_counter()
+    for _ in range(5):
+        for ref in refs:
+            ref["o1"]
+    print(f"100k reference port lookups {time.perf_counter() - t0:.3f} s")
@@ -0,0 +1,119 @@
+"""CrossSections from factories are immutable, so the same settings share one instance."""
+from __future__ import annotations
+
+import time
+
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.cross_section import (
+    clear_cross_section_cache,
+    cross_section_cache_info,
+)
+
+
+def test_cross_section_interned() -> None:
+    clear_cross_section_cache()
+    xs1 = gf.cross_section.rib(width=0.6)
+    xs2 = gf.cross_section.rib(width=0.6)
+    assert xs1 is xs2
+    assert xs1 is not gf.cross_section.rib(width=0.7)
+    assert xs1.info["settings"]["width"] == 0.6
+    assert xs1.info["function_name"] == "cross_section"
+
+    info = cross_section_cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+    assert info.currsize == 2
+
+
+def test_cross_section_frozen() -> None:
+    xs = gf.cross_section.strip()
+    with pytest.raises(TypeError):
+        xs.width = 1
+    assert hash(xs) == hash(xs.copy(width=1).copy(width=xs.width))
+
+
+def test_cross_section_frozen_info_and_sections() -> None:
+    xs = gf.cross_section.pn()
+    with pytest.raises(TypeError):
+        xs.info["settings"]["width"] = 1
+    with pytest.raises(TypeError):
+        xs.sections.append(xs.sections[0])
+    with pytest.raises(TypeError):
+        xs.sections[0].offset = 1
+    assert xs is gf.cross_section.pn()
+
+
+def test_cross_section_copy() -> None:
+    xs = gf.cross_section.pn()
+    xs2 = xs.copy(width=2)
+    assert xs2.width == 2
+    assert xs.width != 2
+    assert xs2 is not xs.copy(width=2)
+    assert xs2.add_pins is xs.add_pins
+    assert xs.copy(add_pins=None).add_pins is None
+
+    xs2.width = 3
+    xs2.info["settings"]["width"] = 3
+    xs2.sections[0].offset = 1
+    xs2.sections.append(xs2.sections[0])
+    assert xs.info["settings"]["width"] != 3
+    assert xs.sections[0].offset != 1
+    assert len(xs.sections) == len(xs2.sections) - 1
+
+
+def test_nested_factory_info() -> None:
+    """A factory returning another factory CrossSection does not change its info."""
+    xs = gf.cross_section.strip_heater_metal()
+    xs_strip = gf.cross_section.strip(
+        width=0.5,
+        layer="WG",
+        sections=[
+            gf.Section(
+                layer="HEATER",
+                width=2.5,
+                port_names=gf.cross_section.port_names_electrical,
+                port_types=gf.cross_section.port_types_electrical,
+            )
+        ],
+    )
+    assert xs_strip.sections == xs.sections
+    assert xs.info["function_name"] == "strip_heater_metal"
+    assert xs_strip.info["function_name"] == "cross_section"
+
+
+def test_get_cross_section() -> None:
+    xs = gf.cross_section.strip()
+    assert gf.get_cross_section(xs) is xs
+    assert gf.get_cross_section("strip") is gf.get_cross_section("strip")
+    assert gf.get_cross_section("strip", width=2).width == 2
+    assert gf.get_cross_section(xs, width=2) is gf.get_cross_section(xs, width=2)
+    assert gf.get_cross_section(xs.copy()) is not xs
+
+
+def test_mirror_does_not_change_sections() -> None:
+    xs = gf.cross_section.pn(mirror=False)
+    xs_mirror = gf.cross_section.pn(mirror=True)
+    offsets = [s.offset for s in xs.sections]
+    assert [s.offset for s in xs_mirror.sections] == [-offset for offset in offsets]
+    assert [s.offset for s in gf.cross_section.pn(mirror=False).sections] == offsets
+
+
+if __name__ == "__main__":
+    n = 10_000
+    for name in ["strip", "pn"]:
+        factory = getattr(gf.cross_section, name)
+        clear_cross_section_cache()
+        t0 = time.perf_counter()
+        for _ in range(n):
+            clear_cross_section_cache()
+            factory()
+        t1 = time.perf_counter()
+        for _ in range(n):
+            factory()
+        t2 = time.perf_counter()
+        print(
+            f"{name}: {(t1 - t0) / n * 1e6:.1f} us uncached, "
+            f"{(t2 - t1) / n * 1e6:.1f} us cached, {cross_section_cache_info()}"
+        )
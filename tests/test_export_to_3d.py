@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import trimesh
+
+import gdsfactory as gf
+from gdsfactory.export import to_3d, to_glb, to_stl
+from gdsfactory.export.to_3d import get_cells
+from gdsfactory.pdk import get_layer_stack
+
+
+def _get_array() -> gf.Component:
+    c = gf.Component("array_3d")
+    c << gf.components.array(
+        gf.components.straight(length=5), columns=10, rows=4, spacing=(10, 10)
+    )
+    pad = c << gf.components.rectangle(size=(4, 2), layer=(1, 0))
+    pad.movey(-10)
+    return c
+
+
+def test_to_3d_instances() -> None:
+    c = _get_array()
+    scene = to_3d(c)
+    assert len(scene.geometry) == 2
+    assert len(scene.graph.nodes_geometry) == 41
+    np.testing.assert_allclose(scene.bounds[:, :2], c.bbox)
+    mesh = trimesh.util.concatenate(scene.dump())
+    assert np.isclose(mesh.volume, (40 * 5 * 0.5 + 4 * 2) * 0.22)
+
+
+def test_to_3d_rotation_reflection() -> None:
+    c = gf.Component("rotated_3d")
+    ref = c << gf.components.straight(length=5)
+    ref.rotate(30)
+    ref.mirror()
+    ref.move((3, 4))
+    scene = to_3d(c)
+    np.testing.assert_allclose(scene.bounds[:, :2], c.bbox, atol=1e-3)
+
+
+def test_to_3d_etch_flattens() -> None:
+    layer_stack = get_layer_stack()
+    c = gf.Component("etched_3d")
+    core = c << gf.components.rectangle(size=(10, 10), layer=(1, 0))
+    c.add_polygon([(2, 2), (4, 2), (4, 4), (2, 4)], layer=(2, 6))
+    far = c << gf.components.rectangle(size=(2, 2), layer=(1, 0))
+    far.movex(20)
+    cells = get_cells(c, layer_stack)
+
+    # the core is etched by the shallow etch of its parent and is flattened
+    polygons, instances = cells[c.name]
+    assert (1, 0) in polygons and (2, 0) in polygons
+    assert [name for name, _ in instances] == [far.parent.name]
+    assert core.parent.name not in cells
+
+
+def test_to_stl(tmp_path) -> None:
+    c = _get_array()
+    to_stl(c, filepath=tmp_path / "c.stl")
+    mesh = trimesh.load(tmp_path / "c_1_0.stl")
+    assert len(mesh.faces) == 40 * 12 + 12
+    np.testing.assert_allclose(mesh.bounds[:, :2], c.bbox)
+    assert np.isclose(mesh.volume, (40 * 5 * 0.5 + 4 * 2) * 0.22)
+
+    to_stl(c, filepath=tmp_path / "s.stl", scale=2)
+    mesh = trimesh.load(tmp_path / "s_1_0.stl")
+    np.testing.assert_allclose(mesh.bounds[:, :2], 2 * c.bbox)
+
+
+def test_to_glb(tmp_path) -> None:
+    c = _get_array()
+    to_glb(c, tmp_path / "c.glb")
+    scene = trimesh.load(tmp_path / "c.glb")
+    assert len(scene.geometry) == 2
+    np.testing.assert_allclose(scene.bounds[:, :2], c.bbox, atol=1e-6)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import concurrent.futures
+import importlib
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.export import to_np, to_np_layers, to_np_tiles
+
+to_np_module = importlib.import_module("gdsfactory.export.to_np")
+
+
+def test_to_np() -> None:
+    c = gf.components.straight(length=10)
+    img = to_np(c, nm_per_pixel=20, values=[2])
+    assert img.shape == (502, 52)
+    assert set(np.unique(img)) == {0, 2}
+    # pixels with centers on the edges are included, up to the image size
+    assert (img == 2).sum() == 500 * 26
+
+
+def test_to_np_layers_tiles() -> None:
+    c = gf.components.mzi()
+    layers = ((1, 0), (1, 10))
+    img = to_np_layers(c, layers=layers, tile_size=4096)
+    assert img.dtype == bool
+    assert img.shape[0] == 2
+    assert img[0].any() and img[1].any()
+
+    np.testing.assert_array_equal(to_np_layers(c, layers=layers, tile_size=37), img)
+    np.testing.assert_array_equal(
+        to_np_layers(c, layers=layers, tile_size=100, n_workers=2), img
+    )
+    assert (to_np(c, layers=layers, values=[1, 2]) == 1).sum() <= img[0].sum()
+
+    tiles = list(to_np_tiles(c, layers=layers, tile_size=100, dtype=np.uint8))
+    assert len(tiles) > 1
+    for (rows, columns), tile in tiles:
+        assert tile.dtype == np.uint8
+        np.testing.assert_array_equal(tile, img[:, 1:-1, 1:-1][:, rows, columns])
+
+
+def test_to_np_tiles_window(monkeypatch) -> None:
+    """Workers render a bounded number of tiles ahead of the consumer."""
+    submit = concurrent.futures.ProcessPoolExecutor.submit
+    submitted = []
+
+    def submit_counted(self, *args, **kwargs):
+        submitted.append(args)
+        return submit(self, *args, **kwargs)
+
+    monkeypatch.setattr(
+        concurrent.futures.ProcessPoolExecutor, "submit", submit_counted
+    )
+    tiles = to_np_tiles(gf.components.mzi(), tile_size=37, n_workers=2)
+    next(tiles)
+    assert len(submitted) == 4
+    assert len(list(tiles)) > 4
+
+
+def test_to_np_layers_memmap(tmp_path) -> None:
+    c = gf.components.bend_circular()
+    filepath = tmp_path / "bend.npy"
+    img = to_np_layers(c, filepath=filepath, dtype=np.uint8, pad_width=0)
+    assert isinstance(img, np.memmap)
+    np.testing.assert_array_equal(np.load(filepath), to_np_layers(c, pad_width=0))
+
+
+def test_to_np_reuses_instances() -> None:
+    pad = gf.components.rectangle(size=(10, 10), layer=(1, 0))
+    c = gf.components.array(pad, columns=20, rows=10, spacing=(20.3, 20.1))
+    rasterizer = to_np_module._get_rasterizer(
+        c, nm_per_pixel=20, layers=((1, 0),), dtype=bool, tile_size=1024
+    )
+    assert len(rasterizer.stamps) < 20 * 10
+    assert not rasterizer.polygons
+
+    img = to_np_layers(c)[0]
+    assert img.sum() == 200 * 501 * 501
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.fill import (
+    _fill_mask,
+    _mask_to_rectangles,
+    _mask_to_runs,
+    fill_rectangle,
+)
+
+
+def test_fill_mask_margin() -> None:
+    square = np.array([(10, 10), (20, 10), (20, 20), (10, 20)], dtype=float)
+    mask = _fill_mask(
+        exclude_polys=[square],
+        include_polys=[],
+        bbox=((0, 0), (30, 30)),
+        spacing=(5, 5),
+        margin=2,
+    )
+    assert mask.shape == (6, 6)
+    # cells closer than margin to the square are blocked
+    assert not mask[1:5, 1:5].any()
+    assert mask[0].all() and mask[5].all()
+    assert mask[:, 0].all() and mask[:, 5].all()
+
+
+def test_fill_mask_tiles_and_workers() -> None:
+    c = gf.components.mzi()
+    polygons = [p.points for p in c.get_polygons(as_array=False)]
+    kwargs = dict(
+        exclude_polys=polygons,
+        include_polys=[],
+        bbox=c.bbox,
+        spacing=(1.0, 1.0),
+        margin=2,
+    )
+    mask = _fill_mask(**kwargs, tile_size=(1e6, 1e6))
+    assert np.array_equal(mask, _fill_mask(**kwargs, tile_size=(7, 3)))
+    assert np.array_equal(mask, _fill_mask(**kwargs, tile_size=(20, 20), n_workers=2))
+
+
+def test_mask_to_rectangles() -> None:
+    mask = np.ones((4, 6), dtype=bool)
+    assert _mask_to_rectangles(mask) == [(0, 0, 4, 6)]
+
+    mask[1, 2] = False
+    rectangles = _mask_to_rectangles(mask)
+    covered = np.zeros_like(mask)
+    for i, j, rows, columns in rectangles:
+        assert not covered[i : i + rows, j : j + columns].any()
+        covered[i : i + rows, j : j + columns] = True
+    assert np.array_equal(covered, mask)
+
+    assert _mask_to_runs(mask) == [
+        (0, 0, 1, 6),
+        (1, 0, 1, 2),
+        (1, 3, 1, 3),
+        (2, 0, 1, 6),
+        (3, 0, 1, 6),
+    ]
+
+
+def test_fill_engines() -> None:
+    c = gf.components.mzi()
+    kwargs = dict(fill_layers=((2, 0),), fill_densities=(0.5,), avoid_layers=((1, 0),))
+    raster = fill_rectangle(c, **kwargs)
+    geometry = fill_rectangle(c, engine="geometry", **kwargs)
+    # the raster engine keeps one CellArray per run of free cells in a row
+    assert all(ref.rows == 1 for ref in raster.references)
+    assert len(geometry.references) < len(raster.references)
+
+
+def test_fill_include_layers() -> None:
+    c = gf.Component("test_fill_include_layers")
+    c.add_polygon([(0, 0), (50, 0), (50, 50), (0, 50)], layer=(1, 0))
+    c.add_polygon([(10, 10), (40, 10), (40, 40), (10, 40)], layer=(3, 0))
+    kwargs = dict(
+        fill_layers=((2, 0),),
+        fill_densities=(0.5,),
+        fill_size=(5, 5),
+        margin=0,
+        engine="geometry",
+    )
+    assert fill_rectangle(c, avoid_layers=((1, 0),), **kwargs).area() == 0
+    fill = fill_rectangle(c, avoid_layers=((1, 0),), include_layers=((3, 0),), **kwargs)
+    assert np.isclose(fill.area(), 30 * 30 * 0.5)
+
+
+def test_fill_density_target() -> None:
+    c = gf.Component("test_fill_density_target")
+    c.add_polygon([(0, 0), (100, 0), (100, 100), (0, 100)], layer=(99, 0))
+    c.add_polygon([(0, 0), (20, 0), (20, 100), (0, 100)], layer=(2, 0))
+    fill = fill_rectangle(
+        c,
+        fill_layers=((2, 0),),
+        fill_densities=(1.0,),
+        fill_size=(5, 5),
+        avoid_layers=((2, 0),),
+        margin=0,
+        density_target=0.5,
+        density_window=(100, 100),
+        engine="geometry",
+    )
+    density = (fill.area() + 20 * 100) / 100**2
+    assert 0.5 <= density < 0.5 + 25 / 100**2
+
+
+if __name__ == "__main__":
+    c = gf.Component("reticle")
+    for i in range(20):
+        for j in range(20):
+            c.add_ref(gf.components.mzi()).move((i * 500, j * 500))
+
+    for n_workers in [1, 4]:
+        gf.clear_cache()
+        t0 = time.perf_counter()
+        fill = fill_rectangle(
+            c,
+            fill_layers=((2, 0),),
+            fill_densities=(0.5,),
+            fill_size=(1.0, 1.0),
+            avoid_layers=((1, 0),),
+            margin=2,
+            engine="geometry",
+            n_workers=n_workers,
+        )
+        print(
+            f"n_workers={n_workers} {time.perf_counter() - t0:.2f} s "
+            f"{len(fill.references)} arrays"
+        )
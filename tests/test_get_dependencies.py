@@ -0,0 +1,64 @@
+"""A DAG with two references per level has 2**depth instance paths.
+
+Walking every instance path makes writing GDS exponential in depth,
+while visiting each unique cell once keeps it linear.
+"""
+from __future__ import annotations
+
+import time
+
+import gdsfactory as gf
+
+
+@gf.cell
+def binary_tree(depth: int = 3) -> gf.Component:
+    c = gf.Component()
+    if depth == 0:
+        c.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(1, 0))
+        return c
+    child = binary_tree(depth=depth - 1)
+    c.add_ref(child)
+    c.add_ref(child).movex(child.xsize + 1)
+    return c
+
+
+def test_get_dependencies_deep_hierarchy() -> None:
+    c = binary_tree(depth=40)
+    dependencies = c.get_dependencies(recursive=True)
+    assert len(dependencies) == 40
+    assert [d.name for d in dependencies][0] == binary_tree(depth=0).name
+
+
+def test_get_dependencies_order() -> None:
+    c = gf.components.mzi()
+    dependencies = c.get_dependencies(recursive=True)
+    index = {id(d): i for i, d in enumerate(dependencies)}
+    for d in dependencies:
+        for child in d.get_dependencies():
+            assert index[id(child)] < index[id(d)]
+
+
+def test_get_dependencies_unlocked() -> None:
+    c = gf.Component("test_get_dependencies_unlocked")
+    c << gf.components.straight()
+    assert len(c.get_dependencies(recursive=True)) == 1
+    c << gf.components.bend_euler()
+    assert len(c.get_dependencies(recursive=True)) == 2
+
+
+def test_write_deep_hierarchy(tmp_path) -> None:
+    c = binary_tree(depth=40)
+    gdspath = c.write_gds(gdspath=tmp_path / "binary_tree.gds")
+    assert gdspath.exists()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    dirpath = tempfile.mkdtemp()
+    for depth in [10, 20, 40, 80, 160]:
+        gf.clear_cache()
+        c = binary_tree(depth=depth)
+        t0 = time.perf_counter()
+        c.write_gds(gdspath=f"{dirpath}/binary_tree_{depth}.gds", logging=False)
+        print(f"depth={depth:4d} write_gds {time.perf_counter() - t0:.4f} s")
@@ -113,6 +113,25 @@ def test_get_netlist_close_enough_fails() -> gf.Component:
     return c
 
 
+@gf.cell
+def test_get_netlist_close_enough_grid_boundary() -> gf.Component:
+    """Ports 1nm apart on both sides of a 5nm grid line."""
+    c = gf.Component()
+    i1 = c.add_ref(gf.components.straight(), "i1")
+    i2 = c.add_ref(gf.components.straight(), "i2")
+    i1.movex(0.002)
+    i2.move("o2", destination=i1.ports["o1"])
+    i2.movex(0.001)
+    netlist = c.get_netlist(tolerance=5)
+    connections = netlist["connections"]
+    assert len(connections) == 1
+    cpairs = list(connections.items())
+    extracted_port_pair = set(cpairs[0])
+    expected_port_pair = {"i2,o2", "i1,o1"}
+    assert extracted_port_pair == expected_port_pair
+    return c
+
+
 @gf.cell
 def test_get_netlist_close_enough_orthogonal() -> gf.Component:
     c = gf.Component()
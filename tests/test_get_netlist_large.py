@@ -0,0 +1,35 @@
+"""Netlist extraction for circuits with many ports."""
+from __future__ import annotations
+
+import time
+
+import gdsfactory as gf
+
+
+@gf.cell
+def straight_chain(n: int = 10) -> gf.Component:
+    """Returns n straights placed end to end, some of them 1nm apart."""
+    c = gf.Component()
+    s = gf.components.straight(length=10)
+    for i in range(n):
+        ref = c.add_ref(s, f"s{i}")
+        ref.movex(i * 10 + 0.001 * (i % 2))
+    return c
+
+
+def test_get_netlist_large() -> None:
+    c = straight_chain(n=2000)
+    netlist = c.get_netlist()
+    assert len(netlist["connections"]) == 1999
+    assert netlist["connections"]["s0,o2"] == "s1,o1"
+
+
+if __name__ == "__main__":
+    for n in [1000, 5000, 25000]:
+        c = straight_chain(n=n)
+        t0 = time.perf_counter()
+        netlist = c.get_netlist()
+        print(
+            f"{2 * n:6d} ports {len(netlist['connections']):6d} connections "
+            f"{time.perf_counter() - t0:.3f} s"
+        )
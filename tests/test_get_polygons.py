@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import numpy as np
+
+import gdsfactory as gf
+
+
+def test_get_polygons_by_spec() -> None:
+    c = gf.components.mzi()
+    polygons = c.get_polygons(by_spec=True, as_array=False)
+    assert set(polygons) == c.get_layers()
+    for layer, layer_polygons in polygons.items():
+        expected = c.get_polygons(by_spec=layer)
+        assert len(layer_polygons) == len(expected)
+        for p1, p2 in zip(layer_polygons, expected):
+            np.testing.assert_allclose(p1.points, p2)
+
+
+def test_get_polygons_buffers() -> None:
+    c = gf.components.mzi()
+    polygons = c.get_polygons(by_spec=True)
+    buffers = c.get_polygons_buffers()
+    assert set(buffers) == c.get_layers()
+    for layer, (points, offsets) in buffers.items():
+        assert len(offsets) == len(polygons[layer]) + 1
+        for i, polygon in enumerate(polygons[layer]):
+            np.testing.assert_allclose(points[offsets[i] : offsets[i + 1]], polygon)
+
+
+if __name__ == "__main__":
+    import time
+
+    c = gf.components.grating_coupler_elliptical_arbitrary()
+    c = gf.components.array(c, columns=50, rows=50)
+    t0 = time.perf_counter()
+    c.get_polygons(by_spec=True)
+    print(f"get_polygons(by_spec=True) {time.perf_counter() - t0:.4f} s")
+    t0 = time.perf_counter()
+    c.get_polygons_buffers()
+    print(f"get_polygons_buffers {time.perf_counter() - t0:.4f} s")
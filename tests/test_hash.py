@@ -20,6 +20,41 @@ def test_hash_geometry() -> None:
     assert h1 != h2
 
 
+def test_hash_geometry_hierarchical() -> None:
+    c = gf.components.mzi()
+    assert c.hash_geometry() == c.hash_geometry()
+    assert c.hash_geometry() != c.hash_geometry(flat=True)
+    assert c.flatten().hash_geometry() == c.hash_geometry(flat=True)
+
+    straight = gf.components.straight()
+    assert straight.hash_geometry() == straight.hash_geometry(flat=True)
+
+
+def test_hash_geometry_references() -> None:
+    straight = gf.components.straight()
+    c1 = gf.Component("test_hash_geometry_references1")
+    c1.add_ref(straight)
+    c1.add_ref(straight).movey(10)
+    c2 = gf.Component("test_hash_geometry_references2")
+    c2.add_ref(straight).movey(10)
+    c2.add_ref(straight)
+    assert c1.hash_geometry() == c2.hash_geometry()
+
+    c2.references[0].movey(1)
+    assert c1.hash_geometry() != c2.hash_geometry()
+    assert c1.hash_geometry(flat=True) != c2.hash_geometry(flat=True)
+
+
+def test_hash_geometry_cached() -> None:
+    c = gf.components.mzi()
+    h = c.hash_geometry()
+    assert c._get_cached("hash_geometry_0.0001") == h
+    c.unlock()
+    c.references[0].movex(1)
+    c.lock()
+    assert c.hash_geometry() != h
+
+
 def _test_hash_array_file() -> None:
     """Test hash of a component with an array of references."""
     c = gf.Component("array")
@@ -41,6 +76,13 @@ def _test_hash_file() -> None:
 
 
 if __name__ == "__main__":
+    import time
+
+    c = gf.components.array(gf.components.mzi(), columns=30, rows=30)
+    for flat in [False, True]:
+        t0 = time.perf_counter()
+        c.hash_geometry(flat=flat)
+        print(f"flat={flat} {time.perf_counter() - t0:.3f} s")
     # test_hash_geometry()
     _test_hash_file()
     # _test_hash_array_file()
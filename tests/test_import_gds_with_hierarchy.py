@@ -15,7 +15,7 @@ def test_read_gds_hash2() -> gf.Component:
     c = gf.import_gds(gdspath)
 
     h = "2300f7a05e32689af867fb6aa7c6928a711ad474"
-    assert c.hash_geometry() == h, f"h = {c.hash_geometry()!r}"
+    assert c.hash_geometry(flat=True) == h, f"h = {c.hash_geometry(flat=True)!r}"
     return c
 
 
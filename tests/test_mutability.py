@@ -16,6 +16,27 @@ def test_mutability() -> gf.Component:
     return c
 
 
+def test_cached_bbox_and_layers() -> None:
+    c = gf.components.mzi()
+    assert c.bbox is not c.bbox
+    assert c.layers == {(1, 0), (1, 10)}
+    assert c._get_cached("bbox") is not None
+    assert c._get_cached("layers") is not None
+
+    c2 = gf.Component("test_cached_bbox_and_layers")
+    ref = c2 << gf.components.straight(length=10)
+    c2.lock()
+    assert c2.xsize == 10
+    ref.movex(5)
+    assert c2.xmin == 5, "moving a reference invalidates the cached bbox"
+
+    c2.unlock()
+    c2.add_polygon([(0, 0), (1, 0), (1, 1)], layer=(2, 0))
+    c2.lock()
+    assert c2.layers == ref.parent.layers | {(2, 0)}
+    assert c2.xmin == 0
+
+
 if __name__ == "__main__":
     c = test_mutability()
     c.show(show_ports=True)
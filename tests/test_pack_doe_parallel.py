@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+import gdsfactory as gf
+from gdsfactory.components.pack_doe import generate_doe, parallel_doe
+
+settings = dict(length_mmi=[2, 3, 4], width_mmi=[3, 4])
+
+
+def _ports(component: gf.Component) -> dict:
+    return {
+        name: (port.to_dict(), port.cross_section)
+        for name, port in component.ports.items()
+    }
+
+
+@pytest.mark.parametrize("pack", ["pack_doe", "pack_doe_grid"])
+def test_pack_doe_parallel(pack: str) -> None:
+    function = getattr(gf.components, pack)
+    kwargs = dict(doe="mmi1x2", settings=settings, do_permutations=True)
+
+    gf.clear_cache()
+    c1 = function(**kwargs)
+    gf.clear_cache()
+    with parallel_doe(n_workers=2):
+        c2 = function(**kwargs)
+    gf.clear_cache()
+
+    assert c1.name == c2.name
+    assert getattr(c1, "doe_names", None) == getattr(c2, "doe_names", None)
+    assert c1.hash_geometry() == c2.hash_geometry()
+
+
+def test_generate_doe_parallel() -> None:
+    gf.clear_cache()
+    mmi = gf.components.mmi1x2(length_mmi=3, width_mmi=4)
+    components, settings_list = generate_doe(
+        "mmi1x2", settings, do_permutations=True, n_workers=2
+    )
+    assert len(components) == len(settings_list) == 6
+    # cells already in the cache are reused
+    assert components[3] is mmi
+
+    # the parallel build gives the same cells as a serial build
+    gf.clear_cache()
+    components_serial = [gf.components.mmi1x2(**s) for s in settings_list]
+    assert [c.name for c in components] == [c.name for c in components_serial]
+    assert [_ports(c) for c in components] == [_ports(c) for c in components_serial]
+    gf.clear_cache()
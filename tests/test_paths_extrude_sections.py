@@ -0,0 +1,81 @@
+"""All the sections of a CrossSection are extruded in one vectorized pass."""
+from __future__ import annotations
+
+import time
+
+import gdstk
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.path import _centerpoint_offset_curves
+
+
+def test_centerpoint_offset_curves() -> None:
+    p = gf.path.euler(radius=10, angle=90)
+    offsets = np.array([[-1.0], [0.5], [2.0]]) * np.ones(len(p.points))
+    curves = _centerpoint_offset_curves(p.points, offsets, p.start_angle, p.end_angle)
+    for offset, curve in zip(offsets, curves):
+        expected = p._centerpoint_offset_curve(
+            p.points, offset, p.start_angle, p.end_angle
+        )
+        np.testing.assert_array_equal(curve, expected)
+
+
+def test_extrude_sections_port_order() -> None:
+    """Sections with their own centerline keep the CrossSection port order."""
+    xs = gf.CrossSection(
+        width=0.5,
+        layer=(1, 0),
+        port_names=("o1", "o2"),
+        sections=[
+            gf.Section(
+                width=1,
+                offset=lambda t: 2 + t,
+                layer=(2, 0),
+                port_names=("e1", "e2"),
+            ),
+            gf.Section(width=1, offset=-2, layer=(3, 0), port_names=("e3", "e4")),
+        ],
+    )
+    c = gf.path.extrude(gf.path.straight(length=10, npoints=20), cross_section=xs)
+    assert list(c.ports) == ["e1", "e2", "e3", "e4", "o1", "o2"]
+    assert c.ports["e2"].center[1] == -3
+
+
+def test_extrude_flexpath() -> None:
+    xs = gf.cross_section.pn()
+    p = gf.path.arc(radius=20, angle=180)
+    c1 = gf.path.extrude(p, cross_section=xs)
+    c2 = gf.path.extrude_flexpath(p, cross_section=xs)
+    assert len(c2.paths) == 1
+    assert list(c1.ports) == list(c2.ports)
+
+    polygons1 = c1.get_polygons(by_spec=True)
+    polygons2 = c2.get_polygons(by_spec=True)
+    assert set(polygons1) == set(polygons2)
+    for layer, polygons in polygons1.items():
+        xor = gdstk.boolean(polygons, polygons2[layer], "xor")
+        assert sum(polygon.area() for polygon in xor) < 1e-2
+
+
+if __name__ == "__main__":
+    n = 20
+    p = gf.path.spiral_archimedean(
+        min_bend_radius=20, separation=20, number_of_loops=10, npoints=5000
+    )
+    for name in ["pn", "strip_heater_doped"]:
+        xs = gf.get_cross_section(name)
+        for flexpath in [False, True]:
+            t0 = time.perf_counter()
+            for _ in range(n):
+                gf.clear_cache()
+                p.extrude(cross_section=xs, flexpath=flexpath)
+            dt = (time.perf_counter() - t0) / n
+            print(f"{name} {len(xs.sections)} sections flexpath={flexpath}: {dt:.4f} s")
+
+    t0 = time.perf_counter()
+    for _ in range(n):
+        gf.clear_cache()
+        gf.components.spiral_racetrack_heater_doped()
+    dt = (time.perf_counter() - t0) / n
+    print(f"spiral_racetrack_heater_doped: {dt:.4f} s")
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import gc
+
+import matplotlib
+import numpy as np
+
+import gdsfactory as gf
+from gdsfactory.quickplotter import LodRenderer, quickplot
+
+matplotlib.use("Agg")
+
+
+def _sorted_polygons(polygons):
+    return sorted(
+        tuple(sorted(map(tuple, np.round(polygon, 3)))) for polygon in polygons
+    )
+
+
+def _get_component() -> gf.Component:
+    c = gf.Component("lod")
+    mmi = c << gf.components.mmi1x2()
+    mmi.rotate(37)
+    mmi.mirror()
+    mmi.move((5, 7))
+    array = c << gf.components.array(
+        gf.components.straight(length=3), columns=3, rows=2, spacing=(10, 10)
+    )
+    array.rotate(90)
+    array.movex(-50)
+    return c
+
+
+def test_lod_renderer_all_polygons() -> None:
+    c = _get_component()
+    buffers, boxes = LodRenderer(c, min_pixels=0).render((-1e3, -1e3, 1e3, 1e3), 1)
+    assert not len(boxes)
+    for layer, polygons in c.get_polygons(by_spec=True).items():
+        points, lengths = buffers[layer]
+        rendered = np.split(points, np.cumsum(lengths)[:-1])
+        assert _sorted_polygons(rendered) == _sorted_polygons(polygons)
+
+
+def test_lod_renderer_window_and_boxes() -> None:
+    c = _get_component()
+    renderer = LodRenderer(c, min_pixels=2)
+    # only the mmi is in the window
+    buffers, boxes = renderer.render((0, 0, 30, 30), 0.01)
+    assert not len(boxes)
+    assert len(buffers[(1, 0)][1]) == 4
+
+    # the 3 um long straights are boxes and the mmi is not
+    buffers, boxes = renderer.render((-1e3, -1e3, 1e3, 1e3), 4)
+    assert boxes.shape == (6, 4, 2)
+    assert len(buffers[(1, 0)][1]) == 4
+
+
+def test_quickplot_redraws_on_zoom() -> None:
+    c = gf.components.array(
+        gf.components.straight(length=10), columns=20, rows=20, spacing=(20, 20)
+    )
+    fig = quickplot(c, show_ports=False, show_subports=False, min_pixels=20)
+    ax = fig.axes[0]
+    assert len(ax.collections) == 1
+    assert not ax.patches
+
+    ax.set_xlim(0, 30)
+    ax.set_ylim(0, 30)
+    assert not ax.collections
+    assert len(ax.patches) == 2
+    fig.canvas.draw()
+
+
+def test_quickplot_new_window_redraws_on_zoom() -> None:
+    """Earlier windows keep redrawing on zoom after later quickplot calls."""
+    c = gf.components.array(
+        gf.components.straight(length=10), columns=20, rows=20, spacing=(20, 20)
+    )
+    kwargs = dict(show_ports=False, show_subports=False, min_pixels=20)
+    fig1 = quickplot(c, new_window=True, **kwargs)
+    fig2 = quickplot(c, new_window=True, **kwargs)
+    gc.collect()
+
+    for fig in [fig1, fig2]:
+        ax = fig.axes[0]
+        ax.set_xlim(0, 30)
+        ax.set_ylim(0, 30)
+        assert len(ax.patches) == 2
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import hashlib
+
+import gdsfactory as gf
+from gdsfactory.simulation.get_sparameters_path import (
+    get_component_hash,
+    get_component_hash_gds,
+    get_kwargs_hash,
+    get_sparameters_path_meep,
+)
+
+
+def test_component_hash_ignores_names() -> None:
+    c1 = gf.components.straight(length=3)
+    c2 = gf.Component("renamed_straight")
+    c2.add_ref(gf.components.straight(length=3))
+    c2.add_ports(c1.ports)
+    c3 = gf.Component("straight_other_name")
+    c3.add_ref(gf.components.straight(length=3))
+    c3.add_ports(c1.ports)
+    assert get_component_hash(c2) == get_component_hash(c3)
+
+
+def test_component_hash_geometry_and_ports() -> None:
+    c1 = gf.components.straight(length=3)
+    c2 = gf.components.straight(length=4)
+    assert get_component_hash(c1) == get_component_hash(c1)
+    assert get_component_hash(c1) != get_component_hash(c2)
+
+    c3 = gf.Component("straight_extra_port")
+    c3.add_ref(c1)
+    c3.add_ports(c1.ports)
+    c4 = gf.Component("straight_renamed_port")
+    c4.add_ref(c1)
+    c4.add_ports(c1.ports, prefix="in_")
+    assert get_component_hash(c3) != get_component_hash(c4)
+
+
+def test_sparameters_path_migration(tmp_path) -> None:
+    c = gf.components.straight(length=5)
+    kwargs = dict(resolution=20)
+    component_hash = get_component_hash_gds(c)
+    simulation_hash = hashlib.md5(
+        (component_hash + get_kwargs_hash(tool="meep", **kwargs)).encode()
+    ).hexdigest()
+    filepath_legacy = tmp_path / f"{c.name}_{simulation_hash}.npz"
+    filepath_legacy.write_bytes(b"legacy")
+
+    filepath = get_sparameters_path_meep(c, dirpath=tmp_path, **kwargs)
+    assert filepath != filepath_legacy
+    assert not filepath_legacy.exists()
+    assert filepath.read_bytes() == b"legacy"
+    assert get_sparameters_path_meep(c, dirpath=tmp_path, **kwargs) == filepath
+
+
+def test_sparameters_path_migration_writes_gds_once(tmp_path, monkeypatch) -> None:
+    from gdsfactory.simulation import get_sparameters_path
+
+    c = gf.components.straight(length=6)
+    calls = []
+
+    def _get_component_hash_gds(component):
+        calls.append(component.name)
+        return get_component_hash_gds(component)
+
+    monkeypatch.setattr(
+        get_sparameters_path, "get_component_hash_gds", _get_component_hash_gds
+    )
+    # a previous simulation of the component in the new format
+    get_sparameters_path_meep(c, dirpath=tmp_path, resolution=10).write_bytes(b"")
+    for resolution in [20, 30, 40]:
+        get_sparameters_path_meep(c, dirpath=tmp_path, resolution=resolution)
+    assert calls == [c.name]
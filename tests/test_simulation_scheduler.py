@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import sys
+
+import pytest
+
+from gdsfactory.simulation.scheduler import Job, run_jobs
+
+
+def _write_file_job(filepath, seconds: float = 0.0, **kwargs) -> Job:
+    code = f"import time, pathlib; time.sleep({seconds}); pathlib.Path({str(filepath)!r}).write_text('done')"
+    return Job(command=[sys.executable, "-c", code], filepath=filepath, **kwargs)
+
+
+def test_run_jobs_starts_jobs_when_cores_free(tmp_path) -> None:
+    """A slow job does not block the cores of the other jobs."""
+    jobs = [_write_file_job(tmp_path / "slow", seconds=1.5)] + [
+        _write_file_job(tmp_path / f"fast_{i}", seconds=0.1) for i in range(3)
+    ]
+    failed = run_jobs(jobs, total_cores=2, poll_interval=0.05)
+
+    assert not failed
+    assert all(job.returncode == 0 for job in jobs)
+    # with fixed batches of 2 jobs the last fast job would wait for the slow one
+    slow, *fast = (job.filepath.stat().st_mtime for job in jobs)
+    assert max(fast) < slow
+
+
+def test_run_jobs_reports_failures(tmp_path) -> None:
+    exit_code = Job(
+        command=[sys.executable, "-c", "import sys; sys.exit(3)"],
+        log_path=tmp_path / "exit.log",
+    )
+    missing_result = Job(
+        command=[sys.executable, "-c", "print('no result')"],
+        filepath=tmp_path / "missing",
+        log_path=tmp_path / "missing.log",
+    )
+    ok = _write_file_job(tmp_path / "ok")
+    failed = run_jobs(
+        [exit_code, missing_result, ok], total_cores=4, poll_interval=0.05
+    )
+
+    assert len(failed) == 2
+    assert exit_code in failed and missing_result in failed
+    assert exit_code.returncode == 3
+    assert missing_result.returncode == 0
+    assert "no result" in missing_result.log_path.read_text()
+    assert ok.filepath.exists()
+
+
+def test_run_jobs_priority_and_resume(tmp_path) -> None:
+    order = tmp_path / "order"
+    code = "import sys; open(sys.argv[1], 'a').write(sys.argv[2] + ' ')"
+    jobs = [
+        Job(command=[sys.executable, "-c", code, str(order), str(i)], priority=i)
+        for i in range(3)
+    ]
+    done = tmp_path / "done"
+    done.write_text("done")
+    jobs.append(
+        Job(command=[sys.executable, "-c", "raise SystemExit(1)"], filepath=done)
+    )
+
+    failed = run_jobs(jobs, total_cores=1, poll_interval=0.05)
+    assert not failed
+    assert order.read_text().split() == ["2", "1", "0"]
+    assert jobs[-1].returncode is None
+
+
+def test_run_jobs_cores(tmp_path) -> None:
+    """Jobs that need more cores than available run with all the cores."""
+    filepath = tmp_path / "big"
+    code = "import sys, pathlib; pathlib.Path(sys.argv[1]).write_text(sys.argv[2])"
+
+    def command(cores: int) -> list:
+        return [sys.executable, "-c", code, str(filepath), str(cores)]
+
+    jobs = [Job(command=command, cores=8, filepath=filepath)]
+    assert not run_jobs(jobs, total_cores=2, poll_interval=0.05)
+    assert filepath.read_text() == "2"
+    assert jobs[0].cores == 2
+
+    with pytest.raises(ValueError):
+        run_jobs([_write_file_job(tmp_path / "fixed", cores=8)], total_cores=2)
+
+
+def test_run_jobs_no_starvation(tmp_path) -> None:
+    """Small jobs do not keep starting ahead of a large job waiting for cores."""
+    order = tmp_path / "order"
+    code = (
+        "import sys, time; open(sys.argv[1], 'a').write(sys.argv[2] + ' '); "
+        "time.sleep(float(sys.argv[3]))"
+    )
+
+    def job(name: str, seconds: float, **kwargs) -> Job:
+        command = [sys.executable, "-c", code, str(order), name, str(seconds)]
+        return Job(command=command, **kwargs)
+
+    jobs = [job("first", 0.3, priority=2), job("big", 0, cores=4, priority=1)]
+    jobs += [job(f"small{i}", 0.1) for i in range(8)]
+    assert not run_jobs(jobs, total_cores=4, poll_interval=0.05)
+    assert order.read_text().split()[:2] == ["first", "big"]
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+from gdsfactory.simulation.sweep import get_sweep_path, sweep
+
+calls = []
+
+
+def _solve(x: float, y: float = 0.0, scale: float = 1.0, guess=None):
+    calls.append((x, y))
+    return dict(z=scale * (x**2 + y), guess=np.nan if guess is None else guess["z"])
+
+
+def test_sweep_warm_start() -> None:
+    calls.clear()
+    df = sweep(_solve, points=dict(x=[1, 2, 3]), scale=2)
+    assert list(df.columns) == ["x", "z", "guess"]
+    assert df.z.tolist() == [2, 8, 18]
+    assert np.isnan(df.guess[0])
+    assert df.guess[1:].tolist() == [2, 8]
+    assert calls == [(1, 0), (2, 0), (3, 0)]
+
+
+def test_sweep_extend_range(tmp_path) -> None:
+    filepath = get_sweep_path("solve", tmp_path, scale=1)
+    calls.clear()
+    sweep(_solve, points=dict(x=np.linspace(0, 1, 3)), filepath=filepath)
+    assert len(calls) == 3
+
+    calls.clear()
+    df = sweep(_solve, points=dict(x=np.linspace(0, 2, 5)), filepath=filepath)
+    assert calls == [(1.5, 0), (2.0, 0)]
+    assert df.z.tolist() == [0, 0.25, 1, 2.25, 4]
+    # the first new point is seeded with the stored result of the previous point
+    assert df.guess[3] == 1
+
+    calls.clear()
+    sweep(_solve, points=dict(x=[2.0, 0.5]), filepath=filepath)
+    assert not calls
+
+    # other fixed settings do not reuse the stored results
+    sweep(_solve, points=dict(x=[2.0]), filepath=filepath, scale=3)
+    assert calls == [(2.0, 0)]
+
+
+def test_sweep_n_workers(tmp_path) -> None:
+    x, y = (a.ravel() for a in np.meshgrid([0, 1, 2], [0, 10], indexing="ij"))
+    df1 = sweep(_solve, points=dict(x=x, y=y))
+    df2 = sweep(_solve, points=dict(x=x, y=y), n_workers=2)
+    assert df1.z.tolist() == df2.z.tolist() == [0, 10, 1, 11, 4, 14]
+    # each worker starts a new chain
+    assert np.isnan(df2.guess[3])
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import time
+
+from watchdog.events import FileModifiedEvent
+
+import gdsfactory as gf
+from gdsfactory.cell import CACHE
+from gdsfactory.watch import YamlEventHandler
+
+child_yaml = """
+instances:
+  s:
+    component: straight
+    settings:
+      length: {length}
+ports:
+  o1: s,o1
+  o2: s,o2
+"""
+
+parent_yaml = """
+instances:
+  c1:
+    component: watch_child
+  c2:
+    component: watch_child
+placements:
+  c2:
+    x: c1,o2
+"""
+
+
+def _write_cells(dirpath, length: float = 10):
+    cells = dirpath / "cells"
+    cells.mkdir(exist_ok=True)
+    child = cells / "watch_child.pic.yml"
+    child.write_text(child_yaml.format(length=length))
+    (cells / "watch_parent.pic.yml").write_text(parent_yaml)
+    return child
+
+
+def test_watch_rebuilds_dependents(tmp_path) -> None:
+    pdk = gf.get_active_pdk()
+    child = _write_cells(tmp_path)
+    handler = YamlEventHandler(path=str(tmp_path), debounce=0)
+    try:
+        assert handler.get_dependents("watch_child") == ["watch_parent"]
+        assert handler.get_dependents("straight") == ["watch_child", "watch_parent"]
+
+        parent = pdk.get_component("watch_parent")
+        unrelated = gf.components.mmi1x2()
+        assert parent.xsize == 20
+
+        child.write_text(child_yaml.format(length=30))
+        handler.on_modified(FileModifiedEvent(str(child)))
+
+        # the parent was rebuilt with the new child when the file changed
+        assert CACHE["watch_parent"] is not parent
+        assert pdk.get_component("watch_parent") is CACHE["watch_parent"]
+        assert CACHE["watch_parent"].xsize == 60
+        assert gf.components.mmi1x2() is unrelated
+    finally:
+        for name in ["watch_child", "watch_parent"]:
+            pdk.cells.pop(name, None)
+        gf.clear_cache()
+
+
+def test_watch_debounce(tmp_path) -> None:
+    pdk = gf.get_active_pdk()
+    child = _write_cells(tmp_path)
+    handler = YamlEventHandler(path=str(tmp_path), debounce=0.1)
+    changed = []
+    handler.get_component = changed.append
+    try:
+        for _ in range(5):
+            handler.on_modified(FileModifiedEvent(str(child)))
+        assert not changed
+        time.sleep(0.5)
+        assert changed == [str(child)]
+    finally:
+        for name in ["watch_child", "watch_parent"]:
+            pdk.cells.pop(name, None)
+
+
+def test_cache_invalidate() -> None:
+    gf.clear_cache()
+    mzi = gf.components.mzi()
+    bend = gf.components.bend_euler()
+    straight = gf.components.straight(length=3)
+    name = CACHE.get_cache_key(bend)
+    removed = CACHE.invalidate([name])
+    assert name in removed
+    assert CACHE.get_cache_key(mzi) is None
+    assert CACHE.get_cache_key(straight) is not None
+    gf.clear_cache()